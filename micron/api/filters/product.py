@@ -1,21 +1,22 @@
+from django.utils.translation import get_language
 from django_filters.rest_framework import FilterSet, filters
 
 from products.models.product import Product
 from products.models.category import Category
+from products.utils.search import search_queryset
 from taggit.models import Tag
 
 
 class ProductFilter(FilterSet):
     name = filters.CharFilter(
-        field_name="translations__name",
-        lookup_expr="icontains",
+        method="filter_name",
         label="Product Name",
-        help_text="Search products by name",
+        help_text="Full-text search over product name, tags and description",
     )
     price = filters.RangeFilter(
-        field_name="price",
+        field_name="effective_price",
         label="Price Range",
-        help_text="Filter products within a price range",
+        help_text="Filter products within a price range (discounted price while on discount)",
     )
     available = filters.BooleanFilter(
         field_name="available",
@@ -33,6 +34,12 @@ class ProductFilter(FilterSet):
         label="Discounted",
         help_text="Filter products on discount",
     )
+    rating = filters.NumberFilter(
+        field_name="rating_average",
+        lookup_expr="gte",
+        label="Minimum Rating",
+        help_text="Filter products with an average rating of at least this many stars",
+    )
     tags = filters.ModelMultipleChoiceFilter(
         queryset=Tag.objects.all(),
         field_name="tags",
@@ -48,5 +55,13 @@ class ProductFilter(FilterSet):
             "available",
             "category",
             "discount",
+            "rating",
             "tags",
         ]
+
+    def filter_name(self, queryset, name, value):
+        if not value:
+            return queryset
+        language = getattr(self.request, "LANGUAGE_CODE", None) or get_language()
+        ranked = "ordering" not in self.request.query_params
+        return search_queryset(queryset, value, language, ranked=ranked)
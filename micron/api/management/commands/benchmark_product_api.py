@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.serializers.product import ProductSerializer
+from api.views import ProductModelViewSet
+
+
+class FullProductViewSet(ProductModelViewSet):
+    """The list endpoint as it was: every product in the full ProductSerializer representation."""
+
+    def get_serializer_class(self):
+        return ProductSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare response size and query count of the product list endpoint: "
+        "full representation with embedded reviews vs. the default slim one."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--pages", type=int, default=5, help="Number of pages to walk per variant")
+        parser.add_argument("--limit", type=int, default=50, help="Page size")
+        parser.add_argument("--username", help="User to authenticate as (defaults to the first superuser)")
+
+    def handle(self, *args, **options) -> None:
+        user_model = get_user_model()
+        if options["username"]:
+            user = user_model.objects.filter(username=options["username"]).first()
+        else:
+            user = user_model.objects.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError("No user to authenticate the benchmark requests as.")
+
+        variants = {
+            # Reviews were prefetched for every row before the slim representation.
+            "full (before)": (FullProductViewSet, {"expand": "reviews"}),
+            "slim (after)": (ProductModelViewSet, {}),
+        }
+        self.stdout.write(f"{'variant':<16}{'pages':>7}{'bytes/page':>14}{'queries/page':>15}")
+        for label, (viewset, params) in variants.items():
+            pages, total_bytes, total_queries = self.walk(viewset, user, params, options["pages"], options["limit"])
+            if not pages:
+                self.stdout.write(f"{label:<16}{0:>7}")
+                continue
+            self.stdout.write(
+                f"{label:<16}{pages:>7}{total_bytes // pages:>14}{total_queries / pages:>15.1f}"
+            )
+
+    def walk(self, viewset, user, params: dict, max_pages: int, limit: int) -> tuple[int, int, int]:
+        factory = APIRequestFactory()
+        view = viewset.as_view({"get": "list"})
+        cursor = None
+        pages = total_bytes = total_queries = 0
+
+        while pages < max_pages:
+            query = {**params, "limit": limit}
+            if cursor:
+                query["cursor"] = cursor
+            request = factory.get("/api/v1/products/", query)
+            force_authenticate(request, user=user)
+
+            with CaptureQueriesContext(connection) as queries:
+                response = view(request, version="v1")
+                response.render()
+
+            pages += 1
+            total_bytes += len(response.content)
+            total_queries += len(queries)
+
+            next_url = response.data.get("next")
+            if not next_url:
+                break
+            cursor = next_url.split("cursor=", 1)[1].split("&", 1)[0]
+        return pages, total_bytes, total_queries
@@ -0,0 +1,73 @@
+from collections import OrderedDict
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from common.pagination import InvalidCursor, estimate_count, paginate_keyset
+from products.utils.pagination import SEARCH_PRODUCT_ORDERING
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """
+    Cursor pagination over a composite (column, id) key.
+
+    Views declare `cursor_orderings`, a map of `?ordering=` values to keyset
+    columns, and `default_cursor_ordering`; ranked full-text results are paged
+    by relevance. Requests whose ordering has no keyset equivalent (e.g.
+    translated names) keep limit/offset paging. The total is a planner
+    estimate rather than an exact COUNT(*).
+    """
+
+    cursor_query_param = "cursor"
+    ordering_query_param = "ordering"
+
+    def get_keyset_ordering(self, queryset, request, view) -> tuple[str, ...] | None:
+        orderings = getattr(view, "cursor_orderings", {})
+        requested = request.query_params.get(self.ordering_query_param)
+        if requested:
+            return orderings.get(requested)
+        if "search_rank" in queryset.query.annotations:
+            return SEARCH_PRODUCT_ORDERING
+        return getattr(view, "default_cursor_ordering", None)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_ordering = self.get_keyset_ordering(queryset, request, view)
+        if self.keyset_ordering is None:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        try:
+            self.page = paginate_keyset(queryset, self.keyset_ordering, cursor, self.limit)
+        except InvalidCursor:
+            raise NotFound("Invalid cursor")
+        self.estimated_count = estimate_count(queryset)
+        return self.page.object_list
+
+    def get_cursor_link(self, cursor: str | None) -> str | None:
+        if cursor is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        if self.keyset_ordering is None:
+            return super().get_paginated_response(data)
+
+        return Response(OrderedDict([
+            ("estimated_count", self.estimated_count),
+            ("next", self.get_cursor_link(self.page.next_cursor)),
+            ("previous", self.get_cursor_link(self.page.previous_cursor)),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["estimated_count"] = {"type": "integer", "example": 123}
+        return response_schema
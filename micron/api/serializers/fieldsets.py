@@ -0,0 +1,29 @@
+class SparseFieldsetMixin:
+    """
+    Lets GET requests trim the representation.
+    `?fields=id,name,price` keeps only the listed fields and fields named in
+    `expandable_fields` are left out unless requested with `?expand=`.
+    """
+
+    expandable_fields: tuple[str, ...] = ()
+
+    @staticmethod
+    def _parse_param(request, name: str) -> set[str]:
+        value = request.query_params.get(name, "")
+        return {field.strip() for field in value.split(",") if field.strip()}
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get("request")
+        if request is None or request.method != "GET":
+            return
+
+        expand = self._parse_param(request, "expand")
+        for field_name in set(self.expandable_fields) - expand:
+            self.fields.pop(field_name, None)
+
+        requested = self._parse_param(request, "fields")
+        if requested:
+            for field_name in set(self.fields) - requested - expand:
+                self.fields.pop(field_name)
@@ -3,10 +3,11 @@ from parler_rest.serializers import TranslatableModelSerializer
 from rest_framework import serializers
 from products.models.category import Category
 from products.models.product import Product
+from api.serializers.fieldsets import SparseFieldsetMixin
 from api.serializers.review import ReviewSerializer
 
 
-class ProductSerializer(TranslatableModelSerializer):
+class ProductSerializer(SparseFieldsetMixin, TranslatableModelSerializer):
     name = serializers.CharField(required=True)
     slug = serializers.SlugField(
         required=True,
@@ -23,6 +24,13 @@ class ProductSerializer(TranslatableModelSerializer):
     class Meta:
         model = Product
         fields = "__all__"
+        read_only_fields = ["rating_average", "rating_count"]
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save_without_ratings()
+        return instance
 
     def get_reviews(self, obj):
         reviews = obj.review_set.all()
@@ -31,3 +39,29 @@ class ProductSerializer(TranslatableModelSerializer):
 
     def get_tags(self, obj):
         return [tag.name for tag in obj.tags.all()]
+
+
+class ProductListSerializer(ProductSerializer):
+    """Slim list representation: rating summary instead of embedded reviews, no description."""
+
+    expandable_fields = ("reviews",)
+
+    class Meta(ProductSerializer.Meta):
+        fields = [
+            "id",
+            "name",
+            "slug",
+            "category",
+            "image",
+            "price",
+            "price_with_discount",
+            "effective_price",
+            "discount",
+            "available",
+            "quantity",
+            "tags",
+            "rating_average",
+            "rating_count",
+            "reviews",
+            "created_at",
+        ]
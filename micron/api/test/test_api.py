@@ -245,6 +245,57 @@ class APIProductTestCase(APITestCase):
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertGreaterEqual(len(response.data['results']), 1)
 
+    def test_list_products_slim_representation(self):
+        """Test that product list carries a rating summary instead of reviews"""
+        path = api_reverse('api:products-list')
+        response = self.client.get(path)
+
+        product = response.data['results'][0]
+        self.assertIn('rating_average', product)
+        self.assertIn('rating_count', product)
+        self.assertNotIn('reviews', product)
+        self.assertNotIn('description', product)
+
+    def test_list_products_expand_reviews(self):
+        """Test that reviews are embedded only when expanded"""
+        path = api_reverse('api:products-list')
+        response = self.client.get(path, {'expand': 'reviews'})
+
+        self.assertIn('reviews', response.data['results'][0])
+
+    def test_list_products_sparse_fields(self):
+        """Test that ?fields= limits the product representation"""
+        path = api_reverse('api:products-list')
+        response = self.client.get(path, {'fields': 'id,name'})
+
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+
+    def test_list_products_cursor_pagination(self):
+        """Test that product pages are linked by cursor and never overlap"""
+        for index in range(4):
+            Product.objects.create(
+                name=f'Cursor Product {index}',
+                slug=f'cursor-product-{index}',
+                description='Test Description',
+                category=self.category,
+                image=self.test_image,
+                price=Decimal('10.00') + index,
+                available=True
+            )
+        path = api_reverse('api:products-list')
+        first = self.client.get(path, {'ordering': 'effective_price'})
+
+        self.assertEqual(first.status_code, HTTPStatus.OK)
+        self.assertIn('estimated_count', first.data)
+        self.assertIn('cursor=', first.data['next'])
+        self.assertIsNone(first.data['previous'])
+
+        second = self.client.get(first.data['next'])
+        first_ids = {product['id'] for product in first.data['results']}
+        second_ids = {product['id'] for product in second.data['results']}
+        self.assertFalse(first_ids & second_ids)
+        self.assertIsNotNone(second.data['previous'])
+
     def test_retrieve_product(self):
         """Test retrieving a specific product"""
         path = api_reverse('api:products-detail', args=[self.product.id])
@@ -500,3 +551,12 @@ class APIFilterTestCase(APITestCase):
         self.assertEqual(response.status_code, HTTPStatus.OK)
         if len(response.data['results']) > 0:
             self.assertIn('Laptop', response.data['results'][0]['name'])
+
+    def test_filter_products_by_name_full_text(self):
+        """Test the name filter uses the full-text index"""
+        path = api_reverse('api:products-list')
+        response = self.client.get(path, {'name': 'laptops'})
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], 'Laptop')
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
 
 from orders.models import Order
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
@@ -8,13 +9,16 @@ from rest_framework.response import Response
 
 from products.models.category import Category
 from products.models.product import Product
-from api.serializers.product import ProductSerializer
+from products.models.review import Review
+from products.utils.popularity import annotate_popularity
+from api.serializers.product import ProductListSerializer, ProductSerializer
 from api.serializers.category import CategorySerializer
 from api.serializers.order import OrderSerializer
 from .filters.category import CategoryFilter
 from .filters.order import OrderFilter
 from .filters.product import ProductFilter
 from .filters.user import UserFilter
+from .pagination import KeysetPagination
 
 from .permissions import IsAdminOrReadOnly
 from .serializers.user import UserSerializer
@@ -51,14 +55,49 @@ class ProductModelViewSet(ModelViewSet):
     serializer_class = ProductSerializer
     permission_classes = (IsAdminOrReadOnly, IsAuthenticated)
     filterset_class = ProductFilter
-    ordering_fields = ["translations__name", "created_at"]
+    ordering_fields = [
+        "translations__name", "created_at", "effective_price", "rating_average", "rating_count", "popularity",
+    ]
+    pagination_class = KeysetPagination
+    default_cursor_ordering = ("-id",)
+    cursor_orderings = {
+        "created_at": ("created_at", "id"),
+        "-created_at": ("-created_at", "-id"),
+        "effective_price": ("effective_price", "id"),
+        "-effective_price": ("-effective_price", "-id"),
+        "rating_average": ("rating_average", "id"),
+        "-rating_average": ("-rating_average", "-id"),
+        "rating_count": ("rating_count", "id"),
+        "-rating_count": ("-rating_count", "-id"),
+    }
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ProductListSerializer
+        return ProductSerializer
 
     def get_queryset(self):
         if self.request.query_params.get('show_deleted') == 'true' and self.request.user.is_staff:
             qs = Product.all_objects.all()
         else:
             qs = Product.objects.all()
-        return qs.prefetch_related('review_set', 'tags')
+        qs = qs.prefetch_related('translations', 'tags')
+
+        if 'popularity' in self.request.query_params.get('ordering', ''):
+            category = self.request.query_params.get('category', '')
+            qs = annotate_popularity(qs, int(category) if category.isdigit() else None)
+
+        expand = self.request.query_params.get('expand', '').split(',')
+        if self.action != 'list' or 'reviews' in expand:
+            qs = qs.prefetch_related(Prefetch('review_set', queryset=Review.objects.select_related('user')))
+        return qs
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # The live ranking is paged by offset, so products it ties need a stable order.
+        if 'popularity' in queryset.query.annotations:
+            queryset = queryset.order_by(*queryset.query.order_by, '-id')
+        return queryset
 
     @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
     def undelete(self, request, pk=None):
@@ -112,6 +151,12 @@ class OrderModelViewSet(ModelViewSet):
     permission_classes = (IsAdminOrReadOnly, IsAuthenticated)
     ordering_fields = ["username", "created_at", "first_name", "last_name", "email"]
     filterset_class = OrderFilter
+    pagination_class = KeysetPagination
+    default_cursor_ordering = ("-created_at", "-id")
+    cursor_orderings = {
+        "created_at": ("created_at", "id"),
+        "-created_at": ("-created_at", "-id"),
+    }
 
     def get_queryset(self):
         """
@@ -1,117 +1,196 @@
+from dataclasses import dataclass, field
 from decimal import Decimal
 from typing import Generator
 
 from django.http import HttpRequest
 
 from coupons.models import Coupon
-from django.conf import settings
 from products.models import Product
 
+from .pricing import CartSummary, summarize_cart
+from .storage import get_cart_storage
 
-class Cart:
-    def __init__(self, request: HttpRequest) -> None:
-        self.session = request.session
-        cart = self.session.get(settings.CART_SESSION_ID)
-        if not cart:
-            cart = self.session[settings.CART_SESSION_ID] = {}
-        self.cart = cart
-        self.coupon_id = self.session.get("coupon_id")
 
-    def __iter__(self) -> Generator[dict, None, None]:
-        product_ids = self.cart.keys()
-        products = Product.objects.filter(id__in=product_ids)
-        cart = self.cart.copy()
+@dataclass(frozen=True)
+class StockChange:
+    product: Product
+    requested: int
+    quantity: int
+
+
+@dataclass(frozen=True)
+class StockReconciliation:
+    """Lines dropped (quantity 0) or cut down to the available stock."""
+
+    removed: list[StockChange] = field(default_factory=list)
+    adjusted: list[StockChange] = field(default_factory=list)
 
-        for product in products:
-            cart[str(product.id)]["product"] = product
+    def __bool__(self) -> bool:
+        return bool(self.removed or self.adjusted)
 
-        for item in cart.values():
-            if "product" not in item:
-                continue
 
-            item["price"] = Decimal(item["price"])
-            if "bonus_points" in item and item["bonus_points"] is not None:
-                item["bonus_points"] = Decimal(item["bonus_points"])
-            else:
-                item["bonus_points"] = Decimal("0")
+class Cart:
+    """
+    Shopping cart over a stored snapshot of quantities and prices.
+    Counts and totals are computed from the snapshot alone; products and the
+    coupon are fetched on first use and memoized for the rest of the request.
+    """
 
-            item["total_price"] = item["price"] * item["quantity"]
+    def __init__(self, request: HttpRequest) -> None:
+        self.session = request.session
+        self.storage = get_cart_storage(request)
+        self.cart = self.storage.load()
+        self.coupon_id = self.session.get("coupon_id")
+        self._products: dict[str, Product] = {}
+        self._lines: list[dict] | None = None
+        self._coupon: tuple[int | None, Coupon | None] | None = None
+        self._summary: tuple[int | None, CartSummary] | None = None
 
-            if "bonus_points" in item:
-                item["total_bonus_points"] = item["bonus_points"] * item["quantity"]
+    def _load_products(self) -> None:
+        missing = [product_id for product_id in self.cart if product_id not in self._products]
+        if missing:
+            for product in Product.objects.filter(id__in=missing):
+                self._products[str(product.id)] = product
 
-            yield item
+    def __iter__(self) -> Generator[dict, None, None]:
+        if self._lines is None:
+            self._load_products()
+            self._lines = []
+            for product_id, stored in self.cart.items():
+                product = self._products.get(product_id)
+                if product is None:
+                    continue
+
+                price = Decimal(stored["price"])
+                bonus_points = Decimal(stored.get("bonus_points") or "0")
+                self._lines.append({
+                    "product": product,
+                    "quantity": stored["quantity"],
+                    "price": price,
+                    "bonus_points": bonus_points,
+                    "total_price": price * stored["quantity"],
+                    "total_bonus_points": bonus_points * stored["quantity"],
+                })
+        yield from self._lines
 
     def __len__(self) -> int:
         return sum(item["quantity"] for item in self.cart.values())
 
     @property
     def coupon(self) -> Coupon | None:
-        if self.coupon_id:
-            try:
-                return Coupon.objects.get(id=self.coupon_id)
-            except Coupon.DoesNotExist:
-                pass
-        return None
+        if self._coupon is None or self._coupon[0] != self.coupon_id:
+            coupon = None
+            if self.coupon_id:
+                coupon = Coupon.objects.filter(id=self.coupon_id).first()
+            self._coupon = (self.coupon_id, coupon)
+        return self._coupon[1]
+
+    @property
+    def summary(self) -> CartSummary:
+        """Subtotal, discount, total and bonus points, priced once until the cart or coupon changes."""
+        if self._summary is None or self._summary[0] != self.coupon_id:
+            coupon = self.coupon
+            self._summary = (
+                self.coupon_id,
+                summarize_cart(self.cart.values(), coupon.discount if coupon else None),
+            )
+        return self._summary[1]
 
     def get_discount(self) -> Decimal:
-        if self.coupon:
-            return (self.coupon.discount / Decimal(100)) * self.get_total_price()
-        return Decimal(0)
+        return self.summary.discount
 
     def get_total_price_after_discount(self) -> Decimal:
-        return self.get_total_price() - self.get_discount()
+        return self.summary.total
 
     def get_total_price(self) -> Decimal:
-        return sum(
-            Decimal(item["price"]) * item["quantity"] for item in self.cart.values()
-        )
+        return self.summary.subtotal
 
     def get_total_bonus_points(self) -> Decimal:
-        return sum(
-            item["quantity"] * Decimal(item.get("bonus_points", "0") or "0")
-            for item in self.cart.values()
-        )
+        return self.summary.bonus_points
 
     def add(self, product: Product, quantity: int, override_quantity: bool = False) -> None:
         product_id = str(product.id)
-        if product_id not in self.cart:
-            price = (
-                str(product.price_with_discount)
-                if product.price_with_discount
-                else str(product.price)
-            )
-
-            bonus_points = str(
-                product.bonus_points if product.bonus_points is not None else 0
-            )
-
-            self.cart[product_id] = {
-                "quantity": 0,
-                "price": price,
-                "bonus_points": bonus_points,
-            }
-        if override_quantity:
-            self.cart[product_id]["quantity"] = quantity
-        else:
-            self.cart[product_id]["quantity"] += quantity
-        self.save()
+        price = (
+            str(product.price_with_discount)
+            if product.price_with_discount
+            else str(product.price)
+        )
+        bonus_points = str(
+            product.bonus_points if product.bonus_points is not None else 0
+        )
 
-    def save(self) -> None:
-        self.session.modified = True
+        line = self.cart.setdefault(product_id, {
+            "quantity": 0,
+            "price": price,
+            "bonus_points": bonus_points,
+        })
+        line["quantity"] = self.storage.add(
+            product_id, line["price"], line["bonus_points"], quantity, override_quantity
+        )
+        self._products.setdefault(product_id, product)
+        self._lines = self._summary = None
 
     def remove(self, product: Product) -> None:
         product_id = str(product.id)
         if product_id in self.cart:
-            del self.cart[product_id]
-            self.save()
+            self.storage.remove(product_id)
+            self.cart.pop(product_id, None)
+            self._lines = self._summary = None
+
+    def reconcile_stock(self) -> StockReconciliation:
+        """
+        Bring every line in line with current stock: unavailable products are
+        dropped and quantities above the stock are lowered. Stock is read in one
+        lean query and the storage is written once, whatever the number of lines.
+        """
+        stock = Product.objects.filter(id__in=self.cart).values_list("id", "available", "quantity")
+        removed, adjusted = {}, {}
+        for product_id, available, quantity in stock:
+            product_id = str(product_id)
+            requested = self.cart[product_id]["quantity"]
+            if not available or quantity == 0:
+                removed[product_id] = requested
+            elif quantity < requested:
+                adjusted[product_id] = (requested, quantity)
+
+        if not removed and not adjusted:
+            return StockReconciliation()
+
+        self.storage.apply_changes({product_id: new for product_id, (_, new) in adjusted.items()}, list(removed))
+        for product_id in removed:
+            self.cart.pop(product_id, None)
+        for product_id, (_, quantity) in adjusted.items():
+            self.cart[product_id]["quantity"] = quantity
+        self._lines = self._summary = None
+
+        missing = [product_id for product_id in [*removed, *adjusted] if product_id not in self._products]
+        if missing:
+            for product in Product.objects.filter(id__in=missing):
+                self._products[str(product.id)] = product
+        return StockReconciliation(
+            removed=[
+                StockChange(self._products[product_id], requested, 0)
+                for product_id, requested in removed.items()
+            ],
+            adjusted=[
+                StockChange(self._products[product_id], requested, quantity)
+                for product_id, (requested, quantity) in adjusted.items()
+            ],
+        )
 
     def clear(self) -> None:
         self.cart.clear()
-        if settings.CART_SESSION_ID in self.session:
-            del self.session[settings.CART_SESSION_ID]
+        self._lines = self._summary = None
+        self.storage.clear()
         if self.coupon_id:
             if "coupon_id" in self.session:
                 del self.session["coupon_id"]
             self.coupon_id = None
         self.session.modified = True
+
+
+def get_cart(request: HttpRequest) -> Cart:
+    """The request's cart, built once and shared by the views and the context processor."""
+    if not hasattr(request, "_cart"):
+        request._cart = Cart(request)
+    return request._cart
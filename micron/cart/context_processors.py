@@ -1,7 +1,9 @@
 from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
 
-from .cart import Cart
+from .cart import get_cart
 
 
 def cart(request: HttpRequest) -> dict:
-    return {"cart": Cart(request)}
+    """Cart is only built when a template actually touches it."""
+    return {"cart": SimpleLazyObject(lambda: get_cart(request))}
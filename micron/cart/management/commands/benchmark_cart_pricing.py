@@ -0,0 +1,48 @@
+import timeit
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from cart.pricing import summarize_cart
+
+CART_SIZES = (1, 50, 500)
+
+
+def build_lines(size: int) -> list[dict]:
+    return [
+        {"quantity": index % 5 + 1, "price": f"{index % 900 + 9}.99", "bonus_points": str(index % 20)}
+        for index in range(size)
+    ]
+
+
+def price_per_call(lines: list[dict], coupon_discount: int) -> tuple:
+    """The previous pricing: every total re-walked the lines and re-parsed the prices."""
+
+    def total_price() -> Decimal:
+        return sum(Decimal(line["price"]) * line["quantity"] for line in lines)
+
+    def discount() -> Decimal:
+        return (Decimal(coupon_discount) / Decimal(100)) * total_price()
+
+    bonus_points = sum(Decimal(line["bonus_points"]) * line["quantity"] for line in lines)
+    return total_price(), discount(), total_price() - discount(), bonus_points
+
+
+class Command(BaseCommand):
+    help = "Time cart pricing for carts of 1, 50 and 500 lines: per-call totals vs. the single-pass summary."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--repeat", type=int, default=1000, help="Pricings per cart size")
+        parser.add_argument("--discount", type=int, default=15, help="Coupon discount percentage")
+
+    def handle(self, *args, **options) -> None:
+        repeat, coupon_discount = options["repeat"], options["discount"]
+
+        self.stdout.write(f"{'lines':>6}{'per-call µs':>14}{'summary µs':>13}{'speedup':>10}")
+        for size in CART_SIZES:
+            lines = build_lines(size)
+            before = timeit.timeit(lambda: price_per_call(lines, coupon_discount), number=repeat)
+            after = timeit.timeit(lambda: summarize_cart(lines, coupon_discount), number=repeat)
+            self.stdout.write(
+                f"{size:>6}{before / repeat * 1e6:>14.1f}{after / repeat * 1e6:>13.1f}{before / after:>9.1f}x"
+            )
@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable
+
+
+@dataclass(frozen=True)
+class CartSummary:
+    """Priced cart snapshot; build a new one instead of mutating."""
+
+    item_count: int
+    subtotal: Decimal
+    discount: Decimal
+    total: Decimal
+    bonus_points: Decimal
+
+
+def summarize_cart(lines: Iterable[dict], coupon_discount: int | Decimal | None = None) -> CartSummary:
+    """
+    Price stored cart lines ({"quantity", "price", "bonus_points"}) in one pass.
+    `coupon_discount` is the coupon percentage, None without a coupon.
+    """
+    item_count = 0
+    subtotal = Decimal(0)
+    bonus_points = Decimal(0)
+    for line in lines:
+        quantity = line["quantity"]
+        item_count += quantity
+        subtotal += Decimal(line["price"]) * quantity
+        bonus_points += Decimal(line.get("bonus_points") or "0") * quantity
+
+    discount = (Decimal(coupon_discount) / Decimal(100)) * subtotal if coupon_discount else Decimal(0)
+    return CartSummary(
+        item_count=item_count,
+        subtotal=subtotal,
+        discount=discount,
+        total=subtotal - discount,
+        bonus_points=bonus_points,
+    )
@@ -0,0 +1,11 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+@receiver(user_logged_in)
+def merge_cart_on_login(sender, request, user, **kwargs) -> None:
+    if request is None:
+        return
+    import_string(settings.CART_STORAGE).merge_anonymous_cart(request, user)
@@ -0,0 +1,220 @@
+import uuid
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.utils.module_loading import import_string
+from django_redis import get_redis_connection
+
+CART_ID_SESSION_KEY = "cart_id"
+
+
+class BaseCartStorage(ABC):
+    """
+    Where a cart's lines live. Every line is keyed by the stringified product id
+    and holds quantity, unit price and bonus points (prices as strings).
+    """
+
+    def __init__(self, request: HttpRequest) -> None:
+        self.request = request
+        self.session = request.session
+
+    @abstractmethod
+    def load(self) -> dict[str, dict]:
+        """The cart's lines, keyed by product id."""
+
+    @abstractmethod
+    def add(self, product_id: str, price: str, bonus_points: str, quantity: int, override_quantity: bool) -> int:
+        """Store the line and return its resulting quantity."""
+
+    @abstractmethod
+    def remove(self, product_id: str) -> None:
+        """Drop one line."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every line and the cart itself."""
+
+    @abstractmethod
+    def apply_changes(self, quantities: dict[str, int], removed: list[str]) -> None:
+        """Set several line quantities and drop several lines in one write."""
+
+    @abstractmethod
+    def is_empty(self) -> bool:
+        """Whether the cart holds no lines."""
+
+    @classmethod
+    def merge_anonymous_cart(cls, request: HttpRequest, user) -> None:
+        """Called on login; storages that key carts by user fold the anonymous cart in here."""
+
+
+class SessionCartStorage(BaseCartStorage):
+    """Cart kept as a dict inside the Django session."""
+
+    def load(self) -> dict[str, dict]:
+        cart = self.session.get(settings.CART_SESSION_ID)
+        if not cart:
+            cart = self.session[settings.CART_SESSION_ID] = {}
+        return cart
+
+    def add(self, product_id: str, price: str, bonus_points: str, quantity: int, override_quantity: bool) -> int:
+        cart = self.load()
+        line = cart.setdefault(product_id, {"quantity": 0, "price": price, "bonus_points": bonus_points})
+        line["quantity"] = quantity if override_quantity else line["quantity"] + quantity
+        self.session.modified = True
+        return line["quantity"]
+
+    def remove(self, product_id: str) -> None:
+        cart = self.load()
+        if product_id in cart:
+            del cart[product_id]
+            self.session.modified = True
+
+    def apply_changes(self, quantities: dict[str, int], removed: list[str]) -> None:
+        cart = self.load()
+        for product_id, quantity in quantities.items():
+            if product_id in cart:
+                cart[product_id]["quantity"] = quantity
+        for product_id in removed:
+            cart.pop(product_id, None)
+        self.session.modified = True
+
+    def clear(self) -> None:
+        if settings.CART_SESSION_ID in self.session:
+            del self.session[settings.CART_SESSION_ID]
+        self.session.modified = True
+
+    def is_empty(self) -> bool:
+        return not self.session.get(settings.CART_SESSION_ID)
+
+
+class RedisCartStorage(BaseCartStorage):
+    """
+    Cart kept in one Redis hash per user or anonymous visitor:
+    "q:<product_id>" holds the quantity (changed with HINCRBY) and
+    "m:<product_id>" the packed "price|bonus_points". The hash expires
+    CART_TTL seconds after the last change; the session is only touched
+    once, to remember the anonymous cart id.
+    """
+
+    KEY_PREFIX = "cart"
+
+    def __init__(self, request: HttpRequest) -> None:
+        super().__init__(request)
+        self.r = get_redis_connection("default")
+
+    @classmethod
+    def user_key(cls, user_id: int) -> str:
+        return f"{cls.KEY_PREFIX}:user:{user_id}"
+
+    @classmethod
+    def anonymous_key(cls, cart_id: str) -> str:
+        return f"{cls.KEY_PREFIX}:anon:{cart_id}"
+
+    def get_key(self, create: bool = False) -> str | None:
+        user = getattr(self.request, "user", None)
+        if user is not None and user.is_authenticated:
+            return self.user_key(user.pk)
+
+        cart_id = self.session.get(CART_ID_SESSION_KEY)
+        if cart_id is None:
+            if not create:
+                return None
+            cart_id = self.session[CART_ID_SESSION_KEY] = uuid.uuid4().hex
+        return self.anonymous_key(cart_id)
+
+    @staticmethod
+    def pack(price: str, bonus_points: str) -> str:
+        return f"{price}|{bonus_points}"
+
+    @staticmethod
+    def unpack(meta: bytes) -> tuple[str, str]:
+        price, bonus_points = meta.decode().split("|", 1)
+        return price, bonus_points
+
+    def load(self) -> dict[str, dict]:
+        key = self.get_key()
+        if key is None:
+            return {}
+
+        raw = self.r.hgetall(key)
+        cart = {}
+        for field, value in raw.items():
+            kind, product_id = field.decode().split(":", 1)
+            if kind != "q" or int(value) <= 0:
+                continue
+            meta = raw.get(f"m:{product_id}".encode())
+            if meta is None:
+                continue
+            price, bonus_points = self.unpack(meta)
+            cart[product_id] = {"quantity": int(value), "price": price, "bonus_points": bonus_points}
+        return cart
+
+    def add(self, product_id: str, price: str, bonus_points: str, quantity: int, override_quantity: bool) -> int:
+        key = self.get_key(create=True)
+        pipeline = self.r.pipeline()
+        pipeline.hsetnx(key, f"m:{product_id}", self.pack(price, bonus_points))
+        if override_quantity:
+            pipeline.hset(key, f"q:{product_id}", quantity)
+            pipeline.expire(key, settings.CART_TTL)
+            pipeline.execute()
+            return quantity
+
+        pipeline.hincrby(key, f"q:{product_id}", quantity)
+        pipeline.expire(key, settings.CART_TTL)
+        return int(pipeline.execute()[1])
+
+    def remove(self, product_id: str) -> None:
+        key = self.get_key()
+        if key is not None:
+            self.r.hdel(key, f"q:{product_id}", f"m:{product_id}")
+
+    def apply_changes(self, quantities: dict[str, int], removed: list[str]) -> None:
+        key = self.get_key()
+        if key is None:
+            return
+
+        pipeline = self.r.pipeline()
+        if quantities:
+            pipeline.hset(key, mapping={f"q:{product_id}": quantity for product_id, quantity in quantities.items()})
+        for product_id in removed:
+            pipeline.hdel(key, f"q:{product_id}", f"m:{product_id}")
+        pipeline.expire(key, settings.CART_TTL)
+        pipeline.execute()
+
+    def clear(self) -> None:
+        key = self.get_key()
+        if key is not None:
+            self.r.delete(key)
+
+    def is_empty(self) -> bool:
+        key = self.get_key()
+        return key is None or not self.r.hlen(key)
+
+    @classmethod
+    def merge_anonymous_cart(cls, request: HttpRequest, user) -> None:
+        """Fold the visitor's anonymous cart into the cart of the user who just logged in."""
+
+        cart_id = request.session.pop(CART_ID_SESSION_KEY, None)
+        if cart_id is None:
+            return
+
+        r = get_redis_connection("default")
+        source, target = cls.anonymous_key(cart_id), cls.user_key(user.pk)
+        lines = r.hgetall(source)
+        if not lines:
+            return
+
+        pipeline = r.pipeline()
+        for field, value in lines.items():
+            if field.startswith(b"q:"):
+                pipeline.hincrby(target, field, int(value))
+            else:
+                pipeline.hsetnx(target, field, value)
+        pipeline.expire(target, settings.CART_TTL)
+        pipeline.delete(source)
+        pipeline.execute()
+
+
+def get_cart_storage(request: HttpRequest) -> BaseCartStorage:
+    return import_string(settings.CART_STORAGE)(request)
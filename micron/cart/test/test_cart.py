@@ -6,7 +6,8 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase, RequestFactory
 from django.urls import reverse
 
-from cart.cart import Cart
+from cart.cart import Cart, get_cart
+from cart.context_processors import cart as cart_context
 from coupons.models import Coupon
 from products.models.category import Category
 from products.models.product import Product
@@ -153,6 +154,78 @@ class CartTestCase(TestCase):
         discount = cart.get_discount()
         self.assertEqual(discount, Decimal('20.00'))  # 20% of 100.00
 
+    def test_cart_memoizes_products_and_coupon(self):
+        """Test that line items and coupon are fetched once per cart"""
+        request = self.factory.get('/')
+        request.session = MockSession()
+        coupon = Coupon.objects.create(
+            code='SAVE15',
+            valid_from=timezone.now(),
+            valid_to=timezone.now() + timedelta(days=30),
+            discount=15,
+            active=True
+        )
+        Cart(request).add(self.product1, quantity=2)
+        request.session['coupon_id'] = coupon.id
+        cart = Cart(request)
+
+        with self.assertNumQueries(2):
+            self.assertEqual(len(list(cart)), 1)
+            self.assertEqual(len(list(cart)), 1)
+            self.assertEqual(cart.coupon, coupon)
+            cart.get_total_price_after_discount()
+
+    def test_cart_shared_by_request_and_context_processor(self):
+        """Test that views and the context processor reuse one cart per request"""
+        request = self.factory.get('/')
+        request.session = MockSession()
+        cart = get_cart(request)
+        cart.add(self.product1, quantity=2)
+
+        self.assertIs(get_cart(request), cart)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(list(cart_context(request)['cart'])), 1)
+
+    def test_cart_summary_is_memoized_until_mutation(self):
+        """Test that the pricing summary is computed once and refreshed on change"""
+        request = self.factory.get('/')
+        request.session = MockSession()
+        coupon = Coupon.objects.create(
+            code='SAVE25',
+            valid_from=timezone.now(),
+            valid_to=timezone.now() + timedelta(days=30),
+            discount=25,
+            active=True
+        )
+        cart = Cart(request)
+        cart.add(self.product1, quantity=2)  # 100.00
+        summary = cart.summary
+        self.assertIs(cart.summary, summary)
+        self.assertEqual(summary.discount, Decimal('0'))
+
+        cart.coupon_id = coupon.id
+        with self.assertNumQueries(1):
+            summary = cart.summary
+            self.assertIs(cart.summary, summary)
+        self.assertEqual(summary.subtotal, Decimal('100.00'))
+        self.assertEqual(summary.discount, Decimal('25.00'))
+        self.assertEqual(summary.total, Decimal('75.00'))
+
+        cart.add(self.product1, quantity=1)
+        self.assertEqual(cart.summary.item_count, 3)
+        self.assertEqual(cart.summary.subtotal, Decimal('150.00'))
+
+    def test_cart_length_without_queries(self):
+        """Test that item count and totals come from the stored snapshot"""
+        request = self.factory.get('/')
+        request.session = MockSession()
+        Cart(request).add(self.product1, quantity=2)
+        cart = Cart(request)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(len(cart), 2)
+            self.assertEqual(cart.get_total_price(), Decimal('100.00'))
+
     def test_cart_total_price_after_discount(self):
         """Test cart total price after discount"""
         request = self.factory.get('/')
@@ -174,6 +247,26 @@ class CartTestCase(TestCase):
         total = cart.get_total_price_after_discount()
         self.assertEqual(total, Decimal('90.00'))
 
+    def test_cart_reconcile_stock(self):
+        """Test that stale lines are dropped or lowered in one pass"""
+        request = self.factory.get('/')
+        request.session = MockSession()
+        cart = Cart(request)
+        cart.add(self.product1, quantity=8)
+        cart.add(self.product2, quantity=2)
+        Product.objects.filter(id=self.product1.id).update(quantity=3)
+        Product.objects.filter(id=self.product2.id).update(available=False)
+
+        with self.assertNumQueries(1):
+            reconciliation = cart.reconcile_stock()
+        self.assertEqual([change.product for change in reconciliation.removed], [self.product2])
+        self.assertEqual(reconciliation.adjusted[0].requested, 8)
+        self.assertEqual(reconciliation.adjusted[0].quantity, 3)
+
+        cart = Cart(request)
+        self.assertEqual(len(cart), 3)
+        self.assertFalse(cart.reconcile_stock())
+
     def test_cart_clear(self):
         """Test clearing the cart"""
         request = self.factory.get('/')
@@ -299,3 +392,23 @@ class CartViewTestCase(TestCase):
         # Check cart detail
         response = self.client.get(reverse('cart:cart_summary'))
         self.assertContains(response, 'Test Product')
+
+    def test_cart_merged_into_user_cart_on_login(self):
+        """Test that the anonymous cart is folded into the user's cart on login"""
+        user = User.objects.create_user(
+            username='cartuser',
+            email='cart@example.com',
+            password='testpass123'
+        )
+        path = reverse('cart:cart_add', args=[self.product.id])
+        self.client.post(path, {'quantity': 2, 'override': False})
+
+        self.client.login(username='cartuser', password='testpass123')
+        self.client.post(path, {'quantity': 1, 'override': False})
+
+        request = RequestFactory().get('/')
+        request.session = MockSession()
+        request.user = user
+        cart = Cart(request)
+        self.assertEqual(cart.cart[str(self.product.id)]['quantity'], 3)
+        cart.clear()
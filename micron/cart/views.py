@@ -4,44 +4,30 @@ from coupons.forms import CouponApplyForm
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_POST
 from products.models import Product
+from products.recommender import Recommender
 from django.utils.translation import gettext_lazy as _
 from django.contrib import messages
 from http import HTTPStatus
 
-from .cart import Cart
+from .cart import get_cart
 from .forms import CartAddProductForm
 
 
 def cart_summary(request: HttpRequest):
     """Display shopping cart with items, quantities and coupon form."""
 
-    cart = Cart(request)
-    items_to_remove = []
-    items_to_adjust = []
+    cart = get_cart(request)
+    reconciliation = cart.reconcile_stock()
 
-    for item in cart:
-        product = item["product"]
-        quantity = item["quantity"]
-
-        if not hasattr(product, "quantity"):
-            continue
-
-        if not product.available or product.quantity == 0:
-            items_to_remove.append(product)
-        elif product.quantity < quantity:
-            items_to_adjust.append((product, product.quantity))
-
-    for product in items_to_remove:
-        cart.remove(product)
+    for change in reconciliation.removed:
         messages.warning(request, _(
             "'{0}' has been removed from your cart as it is no longer available."
-        ).format(product.name))
+        ).format(change.product.name))
 
-    for product, new_qty in items_to_adjust:
-        cart.add(product=product, quantity=new_qty, override_quantity=True)
+    for change in reconciliation.adjusted:
         messages.warning(request, _(
             "Quantity for '{0}' has been adjusted to {1} due to limited stock."
-        ).format(product.name, new_qty))
+        ).format(change.product.name, change.quantity))
 
     for item in cart:
 
@@ -50,10 +36,12 @@ def cart_summary(request: HttpRequest):
             product=item["product"],
         )
     coupon_apply_form = CouponApplyForm()
+    recommended_products = Recommender().suggest_products_for([item["product"] for item in cart], 4)
     context = {
         "title": "| Your shopping cart",
         "cart": cart,
         "coupon_apply_form": coupon_apply_form,
+        "recommended_products": recommended_products,
     }
     return render(request, "cart/cart-summary.html", context)
 
@@ -62,7 +50,7 @@ def cart_summary(request: HttpRequest):
 def cart_add(request: HttpRequest, product_id: int):
     """Add product to cart with stock validation (supports AJAX)."""
 
-    cart = Cart(request)
+    cart = get_cart(request)
     product = get_object_or_404(Product, id=product_id)
     is_ajax = request.headers.get("X-Requested-With") == "XMLHttpRequest"
 
@@ -114,15 +102,16 @@ def cart_add(request: HttpRequest, product_id: int):
     )
 
     if is_ajax:
+        summary = cart.summary
         response_data = {
             "success": True,
             "message": str(_("Cart updated successfully")),
             "message_type": "success",
-            "cart_total": len(cart),
-            "subtotal": str(cart.get_total_price()),
-            "total_bonus_points": str(cart.get_total_bonus_points()),
-            "total_after_discount": str(cart.get_total_price_after_discount()),
-            "discount": str(cart.get_discount()),
+            "cart_total": summary.item_count,
+            "subtotal": str(summary.subtotal),
+            "total_bonus_points": str(summary.bonus_points),
+            "total_after_discount": str(summary.total),
+            "discount": str(summary.discount),
         }
         return JsonResponse(response_data)
 
@@ -134,7 +123,7 @@ def cart_add(request: HttpRequest, product_id: int):
 def cart_remove(request: HttpRequest, product_id: int):
     """Remove product from cart (supports AJAX)."""
 
-    cart = Cart(request)
+    cart = get_cart(request)
     product = get_object_or_404(Product, id=product_id)
     is_ajax = request.headers.get("X-Requested-With") == "XMLHttpRequest"
 
@@ -145,15 +134,16 @@ def cart_remove(request: HttpRequest, product_id: int):
         cart.coupon_id = None
 
     if is_ajax:
+        summary = cart.summary
         response_data = {
             "success": True,
             "message": str(_("Product removed from cart successfully")),
             "message_type": "success",
-            "cart_total": len(cart),
-            "subtotal": str(cart.get_total_price()),
-            "total_bonus_points": str(cart.get_total_bonus_points()),
-            "total_after_discount": str(cart.get_total_price_after_discount()),
-            "discount": str(cart.get_discount()),
+            "cart_total": summary.item_count,
+            "subtotal": str(summary.subtotal),
+            "total_bonus_points": str(summary.bonus_points),
+            "total_after_discount": str(summary.total),
+            "discount": str(summary.discount),
         }
         return JsonResponse(response_data)
     messages.success(request, _("Product removed from cart successfully"))
@@ -165,7 +155,7 @@ def cart_remove(request: HttpRequest, product_id: int):
 def cart_clear(request: HttpRequest):
     """Remove all items from cart (supports AJAX)."""
 
-    cart = Cart(request)
+    cart = get_cart(request)
     is_ajax = request.headers.get("X-Requested-With") == "XMLHttpRequest"
 
     if is_ajax:
@@ -0,0 +1,52 @@
+import logging
+import random
+import time
+from typing import Callable, TypeVar
+
+from django.db import OperationalError, connection, transaction
+
+from common.metrics import increment
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# SQLSTATE codes of conflicts that succeed when the transaction is simply run again.
+RETRYABLE_SQLSTATES = {
+    "40001": "serialization_failure",
+    "40P01": "deadlock",
+}
+
+
+def get_retryable_conflict(exc: BaseException) -> str | None:
+    return RETRYABLE_SQLSTATES.get(getattr(exc.__cause__, "pgcode", None))
+
+
+def atomic_with_retry(
+    func: Callable[[], T],
+    attempts: int = 4,
+    base_delay: float = 0.05,
+    max_delay: float = 1.0,
+    metric: str = "db.transaction",
+) -> T:
+    """
+    Run `func` in its own transaction, running it again after a deadlock or
+    serialization failure with jittered exponential backoff. Retries are
+    counted as "<metric>.retry.<reason>", and giving up as "<metric>.exhausted".
+    Inside an outer transaction nothing can be retried, so conflicts propagate.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            with transaction.atomic():
+                return func()
+        except OperationalError as exc:
+            reason = get_retryable_conflict(exc)
+            if reason is None or connection.in_atomic_block:
+                raise
+            if attempt == attempts:
+                increment(f"{metric}.exhausted")
+                raise
+            increment(f"{metric}.retry.{reason}")
+            delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+            logger.info("Retrying transaction after %s (attempt %d of %d)", reason, attempt, attempts)
+            time.sleep(random.uniform(delay / 2, delay))
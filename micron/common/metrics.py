@@ -0,0 +1,35 @@
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+METRICS_CACHE_PREFIX = "metrics"
+
+
+def _metric_key(name: str) -> str:
+    return f"{METRICS_CACHE_PREFIX}:{name}"
+
+
+def increment(name: str, amount: int = 1) -> None:
+    """Bump a shared counter; metrics must never break the request that records them."""
+
+    if amount <= 0:
+        return
+    key = _metric_key(name)
+    try:
+        if not cache.add(key, amount, None):
+            cache.incr(key, amount)
+    except Exception as e:
+        logger.warning("Failed to record metric %s: %s", name, e)
+
+
+def get_counters(*names: str) -> dict[str, int]:
+    """Current value of the given counters, 0 for the ones never recorded."""
+
+    values = cache.get_many([_metric_key(name) for name in names])
+    return {name: int(values.get(_metric_key(name), 0)) for name in names}
+
+
+def reset_counters(*names: str) -> None:
+    cache.delete_many([_metric_key(name) for name in names])
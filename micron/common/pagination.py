@@ -0,0 +1,176 @@
+import base64
+import binascii
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db import connections, transaction
+from django.db.models import Q, QuerySet
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor can not be decoded or does not match the ordering."""
+
+
+@dataclass(frozen=True)
+class KeysetPage:
+    object_list: list
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+    ordering: tuple[str, ...] = field(default=())
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+
+def _serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values: tuple, reverse: bool = False) -> str:
+    """Pack the ordering values of a boundary row into an opaque url-safe token."""
+
+    payload = json.dumps({"v": [_serialize(value) for value in values], "r": int(reverse)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ordering: tuple[str, ...]) -> tuple[list, bool]:
+    """Unpack a token produced by encode_cursor; raise InvalidCursor on tampered input."""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values, reverse = payload["v"], bool(payload["r"])
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor("Cursor does not match ordering")
+    return values, reverse
+
+
+def _field_name(ordering_field: str) -> str:
+    return ordering_field.lstrip("-")
+
+
+def keyset_filter(ordering: tuple[str, ...], values: list, reverse: bool = False) -> Q:
+    """
+    Build the "row comes after the cursor" condition for a composite ordering.
+    (a, b) > (x, y) is expanded to a > x OR (a = x AND b > y) so every column
+    may have its own direction.
+    """
+    condition = Q()
+    for position, ordering_field in enumerate(ordering):
+        descending = ordering_field.startswith("-")
+        lookup = "lt" if descending != reverse else "gt"
+        step = Q(**{f"{_field_name(ordering_field)}__{lookup}": values[position]})
+        for previous_field, previous_value in zip(ordering[:position], values[:position]):
+            step &= Q(**{_field_name(previous_field): previous_value})
+        condition |= step
+    return condition
+
+
+def _reverse_ordering(ordering: tuple[str, ...]) -> tuple[str, ...]:
+    return tuple(f[1:] if f.startswith("-") else f"-{f}" for f in ordering)
+
+
+def _position(instance, ordering: tuple[str, ...]) -> tuple:
+    return tuple(getattr(instance, _field_name(ordering_field)) for ordering_field in ordering)
+
+
+def paginate_keyset(queryset: QuerySet, ordering: tuple[str, ...], cursor: str | None, page_size: int) -> KeysetPage:
+    """
+    Return one page of a queryset ordered by `ordering`, starting after `cursor`.
+    The last ordering column must be unique (normally the primary key) so the
+    position of every row is unambiguous. No COUNT or OFFSET is ever issued.
+    """
+    reverse = False
+    if cursor:
+        values, reverse = decode_cursor(cursor, ordering)
+        queryset = queryset.filter(keyset_filter(ordering, values, reverse))
+
+    page_ordering = _reverse_ordering(ordering) if reverse else ordering
+    rows = list(queryset.order_by(*page_ordering)[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if reverse:
+        rows.reverse()
+
+    if not rows:
+        return KeysetPage(object_list=[], ordering=ordering)
+
+    has_next = has_more if not reverse else True
+    has_previous = bool(cursor) if not reverse else has_more
+    return KeysetPage(
+        object_list=rows,
+        next_cursor=encode_cursor(_position(rows[-1], ordering)) if has_next else None,
+        previous_cursor=encode_cursor(_position(rows[0], ordering), reverse=True) if has_previous else None,
+        ordering=ordering,
+    )
+
+
+def paginate_offset(queryset: QuerySet, ordering: tuple[str, ...], cursor: str | None, page_size: int) -> KeysetPage:
+    """
+    Return one page of a queryset whose order changes between requests, such
+    as a live ranking, so the cursor holds a row offset rather than sort
+    values a later request may never see again. The last ordering column
+    must be unique so rows with equal keys keep a stable order.
+    """
+    offset = 0
+    if cursor:
+        (offset,), _ = decode_cursor(cursor, ("offset",))
+        if not isinstance(offset, int) or offset < 0:
+            raise InvalidCursor("Invalid cursor")
+
+    rows = list(queryset.order_by(*ordering)[offset:offset + page_size + 1])
+    has_next = len(rows) > page_size
+    return KeysetPage(
+        object_list=rows[:page_size],
+        next_cursor=encode_cursor((offset + page_size,)) if has_next else None,
+        previous_cursor=encode_cursor((max(offset - page_size, 0),), reverse=True) if offset else None,
+        ordering=ordering,
+    )
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """
+    Row estimate from the PostgreSQL planner instead of an exact COUNT(*).
+    Good enough for "about N results" and free of a full scan on large tables.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    connection = connections[queryset.db]
+    try:
+        # A savepoint keeps a failed EXPLAIN from aborting the caller's transaction.
+        with transaction.atomic(using=queryset.db), connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+    except Exception as e:
+        logger.warning("Could not estimate row count, falling back to COUNT: %s", e)
+        return queryset.count()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
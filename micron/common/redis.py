@@ -0,0 +1,6 @@
+# The Lua scripts of the shop build some of their keys from ARGV instead of
+# declaring them all in KEYS, so they expect a single Redis node, not a cluster.
+
+# How long the "order already counted" markers of the sales rankings and the
+# co-purchase recommender are kept, so a late or retried payment is a no-op.
+INGESTED_ORDER_TTL = 60 * 60 * 24 * 90
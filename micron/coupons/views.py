@@ -5,7 +5,7 @@ from django.views.decorators.http import require_POST
 
 from .forms import CouponApplyForm
 from coupons.models.coupon import Coupon
-from cart.cart import Cart
+from cart.cart import get_cart
 
 
 def _get_valid_coupon(code: str, now) -> Coupon | None:
@@ -59,15 +59,15 @@ def coupon_apply(request):
     request.session["coupon_id"] = coupon.id
 
     if is_ajax:
-        cart = Cart(request)
+        summary = get_cart(request).summary
         return JsonResponse({
             "success": True,
             "message": "Coupon applied successfully",
             "message_type": "success",
             "coupon": {"code": coupon.code, "discount": coupon.discount},
-            "discount_amount": float(cart.get_discount()),
-            "subtotal": float(cart.get_total_price()),
-            "total_after_discount": float(cart.get_total_price_after_discount()),
+            "discount_amount": float(summary.discount),
+            "subtotal": float(summary.subtotal),
+            "total_after_discount": float(summary.total),
         })
 
     return redirect("cart:cart_summary")
@@ -81,8 +81,8 @@ def coupon_remove(request):
         del request.session["coupon_id"]
 
     if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-        cart = Cart(request)
-        total_price = cart.get_total_price()
+        summary = get_cart(request).summary
+        total_price = summary.subtotal
         return JsonResponse({
             "success": True,
             "message": "Coupon removed successfully.",
@@ -91,7 +91,7 @@ def coupon_remove(request):
             "subtotal": float(total_price),
             "discount": "0",
             "total_after_discount": float(total_price),
-            "total_bonus_points": str(cart.get_total_bonus_points()),
+            "total_bonus_points": str(summary.bonus_points),
         })
 
     return redirect("cart:cart_summary")
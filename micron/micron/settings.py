@@ -83,6 +83,7 @@ INSTALLED_APPS: tuple[str, ...] = (
     *_DEBUG_APPS,
     "django_extensions",
     "django.contrib.humanize",
+    "django.contrib.postgres",
     "social_django",
 
     # Third party apps
@@ -276,6 +277,32 @@ EMAIL_HOST_USER = env("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD")
 
 CART_SESSION_ID: str = "cart"
+# Cart storage backend: "cart.storage.RedisCartStorage" keeps carts in Redis hashes,
+# "cart.storage.SessionCartStorage" in the Django session.
+CART_STORAGE: str = "cart.storage.RedisCartStorage"
+CART_TTL: int = 60 * 60 * 24 * 30
+
+# Seconds a checkout holds its stock in Redis before an unpaid order gives it back.
+STOCK_RESERVATION_TTL: int = 60 * 30
+
+# Background order exports hold customer data, so they are written outside
+# MEDIA_ROOT, which nginx serves publicly, and deleted after a week.
+ORDER_EXPORT_DIR: str = os.path.join(BASE_DIR, "exports")
+ORDER_EXPORT_MAX_AGE: int = 60 * 60 * 24 * 7
+
+# Content-similarity index of the catalog: memory-mapped NumPy arrays, rebuilt
+# by Celery. Must be on storage shared by the web and worker hosts.
+PRODUCT_CONTENT_INDEX_DIR: str = os.path.join(BASE_DIR, "content_index")
+
+# Product search
+# PostgreSQL text search configuration per language. PostgreSQL ships no
+# Ukrainian stemmer, so "uk" falls back to "simple" unless a hunspell-based
+# configuration is installed on the database server.
+
+PRODUCT_SEARCH_CONFIGS: dict[str, str] = {
+    "en": "english",
+    "uk": "simple",
+}
 
 AUTHENTICATION_BACKENDS: list[str] = [
     "django.contrib.auth.backends.ModelBackend",
@@ -637,4 +664,24 @@ CELERY_BEAT_SCHEDULE = {
         "task": "common.tasks.clear_expired_email_verifications",
         "schedule": 60 * 60 * 24,
     },
+    "release-expired-stock-reservations": {
+        "task": "orders.tasks.release_expired_stock_reservations",
+        "schedule": 60,
+    },
+    "rebuild-item-similarity": {
+        "task": "products.tasks.rebuild_item_similarity",
+        "schedule": 60 * 60 * 24,
+    },
+    "rescale-popularity-rankings": {
+        "task": "products.tasks.rescale_popularity_rankings",
+        "schedule": 60 * 60,
+    },
+    "rebuild-content-similarity": {
+        "task": "products.tasks.rebuild_content_similarity",
+        "schedule": 60 * 60 * 24,
+    },
+    "delete-old-order-exports": {
+        "task": "orders.tasks.delete_old_order_exports",
+        "schedule": 60 * 60 * 24,
+    },
 }
@@ -1,41 +1,33 @@
-import csv
-import datetime
-
 from django.contrib import admin
-from django.http import HttpResponse
 from django.urls import reverse
 from django.utils.html import format_html
 from safedelete.admin import SafeDeleteAdmin, SafeDeleteAdminFilter, highlight_deleted
 from orders.models.order import Order
 from orders.models.order_item import OrderItem
+from orders.tasks import export_orders_xlsx
+from orders.utils.export import dump_export_query, stream_orders_csv
 
 
 def export_to_csv(modeladmin, request, queryset):
-    opts = modeladmin.model._meta
-    content_disposition = f"attachment; filename={opts.verbose_name}.csv"
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = content_disposition
-    writer = csv.writer(response)
-    fields = [
-        field
-        for field in opts.get_fields()
-        if not field.many_to_many and not field.one_to_many
-    ]
-    writer.writerow([field.verbose_name for field in fields])
-    for obj in queryset:
-        data_row = []
-        for field in fields:
-            value = getattr(obj, field.name)
-            if isinstance(value, datetime.datetime):
-                value = value.strftime("%d/%m/%Y")
-            data_row.append(value)
-        writer.writerow(data_row)
-    return response
+    filename = f"{modeladmin.model._meta.verbose_name_plural}.csv"
+    return stream_orders_csv(queryset, request.LANGUAGE_CODE, filename)
 
 
 export_to_csv.short_description = "Export to CSV"
 
 
+def export_to_xlsx(modeladmin, request, queryset):
+    export_orders_xlsx.delay(request.user.id, request.LANGUAGE_CODE, dump_export_query(queryset))
+    modeladmin.message_user(
+        request,
+        f"Exporting {queryset.count()} orders in the background; "
+        f"the download link will be sent to {request.user.email}.",
+    )
+
+
+export_to_xlsx.short_description = "Export to XLSX (background)"
+
+
 class OrderItemInLine(admin.TabularInline):
     model = OrderItem
     raw_id_fields = ["product"]
@@ -82,6 +74,7 @@ class OrderAdmin(SafeDeleteAdmin):
         "city",
         "post_office",
         "paid",
+        "total",
         "created_at",
         "updated_at",
         order_detail,
@@ -91,9 +84,9 @@ class OrderAdmin(SafeDeleteAdmin):
     ]
     list_filter = ["paid", "created_at", "updated_at", SafeDeleteAdminFilter]
     inlines = [OrderItemInLine]
-    actions = [export_to_csv]
+    actions = [export_to_csv, export_to_xlsx]
     list_display_links = ("id", "first_name", "last_name", "email")
-    readonly_fields = ["created_at", "updated_at"]
+    readonly_fields = ["subtotal", "discount_amount", "total", "created_at", "updated_at"]
 
 
 @admin.register(OrderItem)
@@ -1,12 +1,8 @@
 from django.contrib.admin.views.decorators import staff_member_required
 from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
-from django.db.models import Count, Sum, F, DecimalField, ExpressionWrapper
-from django.db.models.functions import TruncDay
-from datetime import timedelta
-from django.utils import timezone
 import json
-from .models import Order
+from .utils.sales_rollup import get_sales_summary
 
 
 @method_decorator(staff_member_required, name='dispatch')
@@ -21,29 +17,10 @@ class StoreStatisticsView(TemplateView):
             filter_days = int(days_param)
         except ValueError:
             filter_days = 30
-        start_date = timezone.now() - timedelta(days=filter_days)
-        # Base queryset for paid orders in range
-        qs_paid = Order.objects.filter(created_at__gte=start_date, paid='paid')
-        # Daily orders and revenue
-        # Revenue is sum of items__price * items__quantity
-        daily_stats = (
-            qs_paid
-            .annotate(day=TruncDay('created_at'))
-            .values('day')
-            .annotate(
-                count=Count('id', distinct=True),
-                revenue=Sum(
-                    ExpressionWrapper(
-                        F('items__price') * F('items__quantity'),
-                        output_field=DecimalField()
-                    )
-                )
-            )
-            .order_by('day')
-        )
-        days = [d['day'].strftime('%Y-%m-%d') for d in daily_stats if d['day']]
-        counts = [d['count'] for d in daily_stats]
-        revenues = [float(d['revenue'] or 0) for d in daily_stats]
+        summary = get_sales_summary(filter_days)
+        days = summary['days']
+        counts = summary['orders']
+        revenues = summary['revenue']
         if not days:
             days = ['No data']
             counts = [0]
@@ -52,13 +29,8 @@ class StoreStatisticsView(TemplateView):
         total_revenue = sum(revenues)
         total_orders = sum(counts)
         # Status distribution
-        status_distribution = (
-            Order.objects.filter(created_at__gte=start_date)
-            .values('paid')
-            .annotate(count=Count('id'))
-        )
-        statuses = [str(s['paid']).capitalize() for s in status_distribution]
-        status_counts = [s['count'] for s in status_distribution]
+        statuses = [status.capitalize() for status in summary['statuses']]
+        status_counts = list(summary['statuses'].values())
         if not statuses:
             statuses = ['No data']
             status_counts = [0]
@@ -0,0 +1,119 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F
+from safedelete.models import HARD_DELETE
+
+from common.db import atomic_with_retry
+from orders.models.order import Order
+from orders.models.order_item import OrderItem
+from orders.utils.stock_reservation import (
+    apply_stock_reservation, drop_stock_counters, release_stock_reservation, reserve_stock,
+)
+from products.models.product import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer one product with concurrent checkouts and compare throughput of "
+        "select_for_update row locks vs. Redis stock reservations. Both variants "
+        "write the order and its item the way order_create does. The orders are "
+        "deleted and the product's stock is restored afterwards."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("product_id", type=int)
+        parser.add_argument("--checkouts", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=32)
+        parser.add_argument("--username", help="User to place the orders as (defaults to the first superuser)")
+
+    def handle(self, *args, **options) -> None:
+        product_id = options["product_id"]
+        product = Product.all_objects.filter(pk=product_id).first()
+        if product is None:
+            raise CommandError(f"Product {product_id} does not exist.")
+        original = product.quantity
+
+        user_model = get_user_model()
+        if options["username"]:
+            user = user_model.objects.filter(username=options["username"]).first()
+        else:
+            user = user_model.objects.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError("No user to place the load test orders as.")
+
+        variants = {
+            "row lock": lambda: self.row_lock_checkout(user, product),
+            "reservation": lambda: self.reservation_checkout(user, product),
+        }
+        self.stdout.write(f"{'variant':<14}{'checkouts':>11}{'seconds':>10}{'per second':>12}{'p95 ms':>9}")
+        try:
+            for label, checkout in variants.items():
+                Product.all_objects.filter(pk=product_id).update(quantity=options["checkouts"])
+                drop_stock_counters(product_id)
+                elapsed, latencies, order_ids = self.run(checkout, options["checkouts"], options["workers"])
+                p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000
+                self.stdout.write(
+                    f"{label:<14}{len(latencies):>11}{elapsed:>10.2f}{len(latencies) / elapsed:>12.1f}{p95:>9.1f}"
+                )
+                for token in Order.all_objects.filter(id__in=order_ids).exclude(stock_reservation="").values_list(
+                    "stock_reservation", flat=True
+                ):
+                    release_stock_reservation(token)
+                Order.all_objects.filter(id__in=order_ids).delete(force_policy=HARD_DELETE)
+        finally:
+            Product.all_objects.filter(pk=product_id).update(quantity=original)
+            drop_stock_counters(product_id)
+
+    def run(self, checkout, checkouts: int, workers: int) -> tuple[float, list[float], list[int]]:
+        def timed():
+            started = time.perf_counter()
+            try:
+                order_id = checkout()
+                return time.perf_counter() - started, order_id
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda _: timed(), range(checkouts)))
+        elapsed = time.perf_counter() - started
+        return elapsed, [latency for latency, _ in results], [order_id for _, order_id in results]
+
+    @staticmethod
+    def save_order(user, product: Product, reservation: str = "") -> Order:
+        order = Order.objects.create(
+            user=user,
+            first_name=user.first_name or user.username,
+            last_name=user.last_name or user.username,
+            email=user.email or "loadtest@example.com",
+            stock_reservation=reservation,
+            subtotal=product.effective_price,
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, price=product.effective_price, quantity=1, user=user),
+        ])
+        return order
+
+    def row_lock_checkout(self, user, product: Product) -> int:
+        with transaction.atomic():
+            quantity = Product.all_objects.select_for_update().values_list("quantity", flat=True).get(pk=product.pk)
+            if quantity < 1:
+                raise CommandError("Ran out of stock during the run.")
+            order = self.save_order(user, product)
+            Product.all_objects.filter(pk=product.pk).update(quantity=F("quantity") - 1)
+        return order.id
+
+    def reservation_checkout(self, user, product: Product) -> int:
+        # The steps of order_create, with the stock write run inline instead of as a task.
+        reservation = reserve_stock({product.pk: 1})
+        try:
+            order = atomic_with_retry(lambda: self.save_order(user, product, reservation), metric="orders.create")
+        except Exception:
+            release_stock_reservation(reservation)
+            raise
+        apply_stock_reservation(reservation)
+        return order.id
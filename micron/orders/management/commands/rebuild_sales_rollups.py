@@ -0,0 +1,35 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+
+from orders.models.order import Order
+from orders.utils.sales_rollup import rebuild_sales_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily sales rollups behind the store dashboard."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--days", type=int, help="Only the last N days (default: since the first order)")
+        parser.add_argument("--chunk-days", type=int, default=31, help="Days recomputed per batch")
+
+    def handle(self, *args, **options) -> None:
+        last = timezone.localdate()
+        if options["days"] is not None:
+            first = last - datetime.timedelta(days=options["days"])
+        else:
+            first_order = Order.objects.aggregate(first=Min("created_at"))["first"]
+            if first_order is None:
+                self.stdout.write("No orders to roll up.")
+                return
+            first = timezone.localtime(first_order).date()
+
+        stored = 0
+        step = datetime.timedelta(days=options["chunk_days"])
+        while first <= last:
+            chunk_last = min(first + step - datetime.timedelta(days=1), last)
+            stored += rebuild_sales_rollups(first, chunk_last)
+            first = chunk_last + datetime.timedelta(days=1)
+        self.stdout.write(self.style.SUCCESS(f"Stored rollups for {stored} days."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0013_order_user_date_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='stock_reservation',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+    ]
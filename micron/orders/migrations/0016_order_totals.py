@@ -0,0 +1,47 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:34
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+
+
+def backfill_totals(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderItem = apps.get_model("orders", "OrderItem")
+
+    subtotal = (
+        OrderItem.objects.filter(order=OuterRef("pk"), deleted__isnull=True)
+        .values("order")
+        .annotate(total=Sum(F("price") * F("quantity")))
+        .values("total")
+    )
+    money = DecimalField(max_digits=12, decimal_places=2)
+    Order.objects.update(subtotal=Coalesce(Subquery(subtotal, output_field=money), Value(0), output_field=money))
+    Order.objects.update(discount_amount=Round(F("subtotal") * F("discount") / Value(100), 2))
+    Order.objects.update(total=F("subtotal") - F("discount_amount"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0015_order_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='discount_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Coupon discount taken off the subtotal', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Sum of item prices times quantities, before discount', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Amount to pay: subtotal minus discount', max_digits=12),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
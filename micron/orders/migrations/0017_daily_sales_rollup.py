@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0016_order_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True, verbose_name='day')),
+                ('orders', models.PositiveIntegerField(default=0, help_text='Paid orders placed that day')),
+                ('unpaid_orders', models.PositiveIntegerField(default=0, help_text='Unpaid orders placed that day')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Subtotal of the paid orders', max_digits=14)),
+                ('units', models.PositiveIntegerField(default=0, help_text='Units sold in the paid orders')),
+                ('by_category', models.JSONField(blank=True, default=dict, help_text='Units and revenue of the paid orders per category id')),
+                ('by_coupon', models.JSONField(blank=True, default=dict, help_text='Paid orders and discount given per coupon code')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'daily sales rollup',
+                'verbose_name_plural': 'daily sales rollups',
+                'ordering': ['-day'],
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill_rollups(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderItem = apps.get_model("orders", "OrderItem")
+    DailySalesRollup = apps.get_model("orders", "DailySalesRollup")
+
+    tz = timezone.get_current_timezone()
+    paid = Q(paid="paid")
+    orders = Order.objects.filter(deleted__isnull=True)
+    rollups = {}
+
+    for row in (
+        orders.annotate(day=TruncDate("created_at", tzinfo=tz))
+        .values("day")
+        .annotate(
+            paid_orders=Count("id", filter=paid),
+            unpaid=Count("id", filter=~paid),
+            paid_revenue=Sum("subtotal", filter=paid),
+        )
+        .order_by()
+    ):
+        rollups[row["day"]] = DailySalesRollup(
+            day=row["day"],
+            orders=row["paid_orders"],
+            unpaid_orders=row["unpaid"],
+            revenue=row["paid_revenue"] or Decimal(0),
+            by_category={},
+            by_coupon={},
+        )
+
+    for row in (
+        OrderItem.objects.filter(deleted__isnull=True, order__in=orders.filter(paid))
+        .annotate(day=TruncDate("order__created_at", tzinfo=tz))
+        .values("day", "product__category_id")
+        .annotate(units=Sum("quantity"), revenue=Sum(F("price") * F("quantity")))
+        .order_by()
+    ):
+        rollup = rollups[row["day"]]
+        rollup.units += row["units"]
+        rollup.by_category[str(row["product__category_id"])] = {
+            "units": row["units"],
+            "revenue": str(row["revenue"]),
+        }
+
+    for row in (
+        orders.filter(paid, coupon__isnull=False)
+        .annotate(day=TruncDate("created_at", tzinfo=tz))
+        .values("day", "coupon__code")
+        .annotate(coupon_orders=Count("id"), discount=Sum("discount_amount"))
+        .order_by()
+    ):
+        rollups[row["day"]].by_coupon[row["coupon__code"]] = {
+            "orders": row["coupon_orders"],
+            "discount": str(row["discount"]),
+        }
+
+    DailySalesRollup.objects.all().delete()
+    DailySalesRollup.objects.bulk_create(rollups.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0017_daily_sales_rollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,11 @@
+from .daily_sales_rollup import DailySalesRollup
+from .idempotency_key import OrderIdempotencyKey
 from .order import Order
 from .order_item import OrderItem
 
 __all__ = [
+    "DailySalesRollup",
     "Order",
+    "OrderIdempotencyKey",
     "OrderItem",
 ]
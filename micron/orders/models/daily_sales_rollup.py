@@ -0,0 +1,29 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class DailySalesRollup(models.Model):
+    """Orders of one day, pre-aggregated for the store dashboard"""
+
+    day = models.DateField(_("day"), unique=True)
+    orders = models.PositiveIntegerField(default=0, help_text=_("Paid orders placed that day"))
+    unpaid_orders = models.PositiveIntegerField(default=0, help_text=_("Unpaid orders placed that day"))
+    revenue = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, help_text=_("Subtotal of the paid orders")
+    )
+    units = models.PositiveIntegerField(default=0, help_text=_("Units sold in the paid orders"))
+    by_category = models.JSONField(
+        default=dict, blank=True, help_text=_("Units and revenue of the paid orders per category id")
+    )
+    by_coupon = models.JSONField(
+        default=dict, blank=True, help_text=_("Paid orders and discount given per coupon code")
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("daily sales rollup")
+        verbose_name_plural = _("daily sales rollups")
+        ordering = ["-day"]
+
+    def __str__(self) -> str:
+        return f"Sales {self.day}"
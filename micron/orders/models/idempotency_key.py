@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class OrderIdempotencyKey(models.Model):
+    """Client supplied key of a checkout attempt and the order it produced"""
+
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="order_idempotency_keys")
+    key = models.CharField(max_length=64)
+    order = models.ForeignKey("Order", on_delete=models.CASCADE, related_name="idempotency_keys")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _("order idempotency key")
+        verbose_name_plural = _("order idempotency keys")
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="order_idempotency_key_unique"),
+        ]
+
+    def __str__(self) -> str:
+        return self.key
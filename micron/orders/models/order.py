@@ -10,6 +10,9 @@ from django.utils.translation import gettext_lazy as _
 
 from common.model import TimeStampedModel
 
+TOTAL_FIELDS = ("subtotal", "discount_amount", "total")
+CENT = Decimal("0.01")
+
 STATUS = (
     ("paid", _("Paid")),
     ("unpaid", _("Unpaid")),
@@ -26,6 +29,7 @@ class Order(TimeStampedModel):
     post_office = models.CharField(_("post office"), max_length=250, default="")
     paid = models.CharField(choices=STATUS, max_length=10, default="unpaid")
     stripe_id = models.CharField(max_length=250, blank=True)
+    stock_reservation = models.CharField(max_length=32, blank=True, editable=False)
     coupon = models.ForeignKey(
         "coupons.Coupon", related_name="orders", null=True, blank=True, on_delete=models.SET_NULL
     )
@@ -35,6 +39,18 @@ class Order(TimeStampedModel):
     discount = models.IntegerField(
         default=0, validators=[MinValueValidator(0), MaxValueValidator(100)]
     )
+    subtotal = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, editable=False,
+        help_text=_("Sum of item prices times quantities, before discount")
+    )
+    discount_amount = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, editable=False,
+        help_text=_("Coupon discount taken off the subtotal")
+    )
+    total = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, editable=False,
+        help_text=_("Amount to pay: subtotal minus discount")
+    )
     user = models.ForeignKey(
         get_user_model(),
         on_delete=models.SET_NULL,
@@ -53,19 +69,59 @@ class Order(TimeStampedModel):
     def __str__(self) -> str:
         return f"Order {self.id}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        order = super().from_db(db, field_names, values)
+        order._saved_discount = order.__dict__.get("discount")
+        return order
+
+    def save(self, *args, **kwargs) -> None:
+        # The totals follow the items through refresh_totals. Saving an order
+        # loaded earlier (to set `paid`, say) leaves them alone, so it can not
+        # overwrite a newer subtotal; only a changed discount recomputes them.
+        if self._state.adding:
+            self.set_totals(self.subtotal)
+            super().save(*args, **kwargs)
+            self._saved_discount = self.discount
+            return
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            discount_changed = self.discount != getattr(self, "_saved_discount", None)
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred
+            ]
+        else:
+            discount_changed = "discount" in update_fields
+        kwargs["update_fields"] = [field for field in update_fields if field not in TOTAL_FIELDS]
+        super().save(*args, **kwargs)
+        self._saved_discount = self.discount
+        if discount_changed:
+            self.refresh_totals()
+
+    def set_totals(self, subtotal: Decimal) -> None:
+        self.subtotal = Decimal(subtotal)
+        self.discount_amount = (
+            (self.subtotal * Decimal(self.discount) / Decimal(100)).quantize(CENT) if self.discount else Decimal(0)
+        )
+        self.total = self.subtotal - self.discount_amount
+
+    def refresh_totals(self) -> None:
+        """Recompute the stored totals from the active items, in one aggregate and one UPDATE."""
+        result = self.items.aggregate(total=Sum(F("price") * F("quantity")))
+        self.set_totals(result["total"] or Decimal(0))
+        Order.all_objects.filter(pk=self.pk).update(**{field: getattr(self, field) for field in TOTAL_FIELDS})
+
     def get_discount(self) -> Decimal:
-        total_cost = self.get_total_cost_before_discount()
-        if self.discount:
-            return total_cost * (self.discount / Decimal(100))
-        return Decimal(0)
+        return self.discount_amount
 
     def get_total_cost(self) -> Decimal:
-        total_cost = self.get_total_cost_before_discount()
-        return total_cost - self.get_discount()
+        return self.total
 
     def get_total_cost_before_discount(self) -> Decimal:
-        result = self.items.aggregate(total=Sum(F("price") * F("quantity")))
-        return result["total"] or Decimal(0)
+        return self.subtotal
 
     def get_stripe_url(self) -> str:
         if not self.stripe_id:
@@ -0,0 +1,58 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from orders.models.order import Order
+from orders.models.order_item import OrderItem
+from orders.tasks import rebuild_daily_sales_rollup
+from orders.utils.sales_rollup import SALES_ROLLUP_DEBOUNCE, get_order_day, get_sales_rollup_queued_key
+from orders.utils.stock_reservation import adjust_stock_counter
+from products.models.product import Product
+
+
+@receiver(pre_save, sender=Product)
+def remember_stock_quantity(sender, instance, update_fields=None, **kwargs) -> None:
+    instance._previous_quantity = None
+    if instance.pk and (update_fields is None or "quantity" in update_fields):
+        instance._previous_quantity = (
+            sender.all_objects.filter(pk=instance.pk).values_list("quantity", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Product)
+def move_stock_counter(sender, instance, created=False, **kwargs) -> None:
+    previous = getattr(instance, "_previous_quantity", None)
+    if created or previous is None or instance.quantity == previous:
+        return
+    delta = instance.quantity - previous
+    transaction.on_commit(lambda: adjust_stock_counter(instance.pk, delta))
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def refresh_order_totals(sender, instance, **kwargs) -> None:
+    try:
+        order = instance.order
+    except Order.DoesNotExist:
+        return
+    order.refresh_totals()
+    queue_sales_rollup_rebuild(get_order_day(order).isoformat())
+
+
+def queue_sales_rollup_rebuild(day: str) -> None:
+    """One rollup rebuild per day however many of its orders change within the debounce window."""
+
+    # The day is claimed only once the change is committed, so a rolled back
+    # save can not hold the claim without a rebuild behind it.
+    def queue() -> None:
+        if cache.add(get_sales_rollup_queued_key(day), True, SALES_ROLLUP_DEBOUNCE * 2):
+            rebuild_daily_sales_rollup.apply_async((day,), countdown=SALES_ROLLUP_DEBOUNCE)
+
+    transaction.on_commit(queue)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def refresh_sales_rollup(sender, instance, **kwargs) -> None:
+    queue_sales_rollup_rebuild(get_order_day(instance).isoformat())
@@ -1,7 +1,20 @@
+import datetime
+import logging
+import tempfile
+import uuid
+
 from celery import shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files import File
 from django.core.mail import send_mail
+from django.urls import reverse
+from django.utils import timezone
 from orders.models.order import Order
-import logging
+from orders.utils import stock_reservation
+from orders.utils.export import delete_old_exports, get_export_storage, get_orders_for_export, write_orders_xlsx
+from orders.utils.sales_rollup import get_sales_rollup_queued_key, rebuild_sales_rollups
 from tg_bot.notifier import notify_order_created
 from tg_bot.notifier import notify_order_paid
 
@@ -52,3 +65,78 @@ def send_telegram_order_paid(order_id: int) -> None:
         .get(id=order_id)
     )
     notify_order_paid(order)
+
+
+@shared_task(autoretry_for=(Exception,), retry_backoff=True, max_retries=5)
+def apply_stock_reservation(token: str) -> None:
+    """Write a checkout's stock reservation to the product rows."""
+    stock_reservation.apply_stock_reservation(token)
+
+
+@shared_task
+def release_expired_stock_reservations() -> int:
+    """Give the stock of unpaid checkouts back once their reservation expires."""
+    released = 0
+    for token in stock_reservation.get_expired_reservations():
+        try:
+            released += stock_reservation.release_stock_reservation(token)
+        except Exception as exc:
+            logger.error("Failed to release stock reservation %s: %s", token, exc)
+    if released:
+        logger.info("Released %d expired stock reservations.", released)
+    return released
+
+
+@shared_task
+def confirm_order_stock_reservation(order_id: int) -> None:
+    """Keep the stock of a paid order reserved for good."""
+    order = Order.objects.get(id=order_id)
+    if not order.stock_reservation:
+        return
+    try:
+        token = stock_reservation.confirm_stock_reservation(order.stock_reservation, order)
+    except stock_reservation.InsufficientStock as exc:
+        logger.error("Paid order %s is short of stock after its reservation expired: %s", order_id, exc)
+        return
+    if token != order.stock_reservation:
+        Order.objects.filter(pk=order_id).update(stock_reservation=token)
+
+
+@shared_task
+def export_orders_xlsx(user_id: int, language_code: str, query: str) -> str:
+    """Write an XLSX export of the orders to private storage and mail its download link to the staff user."""
+    user = get_user_model().objects.get(id=user_id)
+    name = f"orders-{timezone.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}.xlsx"
+
+    with tempfile.TemporaryFile() as file:
+        orders = get_orders_for_export(query)
+        rows = write_orders_xlsx(orders, language_code, file)
+        file.seek(0)
+        name = get_export_storage().save(name, File(file))
+
+    link = f"{settings.DOMAIN_NAME}{reverse('orders:admin_order_export', args=[name])}"
+    send_mail(
+        "Orders export is ready",
+        f"Your export of {rows} orders is ready: {link}",
+        settings.EMAIL_HOST_USER,
+        [user.email],
+    )
+    return name
+
+
+@shared_task
+def delete_old_order_exports() -> int:
+    """Remove background order exports once their download links are old enough to be stale."""
+    deleted = delete_old_exports()
+    if deleted:
+        logger.info("Deleted %d old order exports.", deleted)
+    return deleted
+
+
+@shared_task
+def rebuild_daily_sales_rollup(day: str) -> int:
+    """Recompute the dashboard rollup of one day after its orders changed."""
+    # Changes from here on queue another rebuild instead of being missed by this one.
+    cache.delete(get_sales_rollup_queued_key(day))
+    day = datetime.date.fromisoformat(day)
+    return rebuild_sales_rollups(day, day)
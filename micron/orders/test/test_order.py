@@ -1,15 +1,40 @@
+import csv
+import os
+import tempfile
+import time
+import uuid
 from decimal import Decimal
 from http import HTTPStatus
+from unittest import mock
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
+from django_redis import get_redis_connection
 from datetime import timedelta
 
+from common.db import atomic_with_retry
 from coupons.models import Coupon
-from orders.models import Order, OrderItem
+from orders.models import DailySalesRollup, Order, OrderIdempotencyKey, OrderItem
+from orders.utils.export import (
+    EXPORT_HEADER, delete_old_exports, dump_export_query, get_export_storage, get_orders_for_export,
+    stream_orders_csv,
+)
+from orders.utils.sales_rollup import (
+    SALES_ROLLUP_DEBOUNCE, get_sales_rollup_queued_key, get_sales_summary, rebuild_sales_rollups,
+)
+from orders.utils.stock_reservation import (
+    InsufficientStock, confirm_stock_reservation, drop_stock_counters, release_stock_reservation, reserve_stock,
+    stock_key,
+)
 from products.models.category import Category
 from products.models.product import Product
 
@@ -133,6 +158,31 @@ class OrderModelTestCase(TestCase):
         total = self.order.get_total_cost()
         self.assertEqual(total, Decimal('90.00'))
 
+    def test_order_totals_follow_items(self):
+        """Test that stored totals track item changes and are read without queries"""
+        category = Category.objects.create(name='Test', slug='test')
+        product = Product.objects.create(
+            name='Test Product',
+            slug='test-product',
+            description='Test',
+            category=category,
+            image=SimpleUploadedFile('test.jpg', b'', 'image/jpeg'),
+            price=Decimal('40.00'),
+            available=True
+        )
+        self.order.discount = 25
+        self.order.save()
+
+        item = OrderItem.objects.create(order=self.order, product=product, price=Decimal('40.00'), quantity=2)
+        OrderItem.objects.create(order=self.order, product=product, price=Decimal('20.00'), quantity=1)
+        item.delete()
+
+        order = Order.objects.get(id=self.order.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(order.get_total_cost_before_discount(), Decimal('20.00'))
+            self.assertEqual(order.get_discount(), Decimal('5.00'))
+            self.assertEqual(order.get_total_cost(), Decimal('15.00'))
+
     def test_order_with_coupon(self):
         """Test order with coupon"""
         coupon = Coupon.objects.create(
@@ -365,6 +415,100 @@ class OrderViewTestCase(TestCase):
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertContains(response, 'Order')
 
+    def test_orders_list_query_count_is_constant(self):
+        """Test that the orders page costs the same queries for one or many orders"""
+        self.client.login(username='testuser', password='testpass123')
+        path = reverse('orders:orders')
+        self.client.get(path)
+
+        with CaptureQueriesContext(connection) as single:
+            response = self.client.get(path)
+        self.assertContains(response, 'Test Product')
+
+        for _ in range(6):
+            order = Order.objects.create(
+                first_name='Jane', last_name='Doe', email='jane@example.com',
+                region='Lviv', post_office='Branch 2', city='Test Town', user=self.user
+            )
+            OrderItem.objects.create(order=order, product=self.product, price=Decimal('99.99'), quantity=3)
+
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(path)
+        self.assertEqual(len(response.context['orders']), 7)
+        self.assertEqual(len(many), len(single))
+
+    def test_stream_orders_csv(self):
+        """Test that the CSV export streams orders with their totals and items"""
+        response = stream_orders_csv(Order.objects.all(), 'en', 'orders.csv')
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+
+        self.assertEqual(rows[0], EXPORT_HEADER)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][0], str(self.order.id))
+        self.assertEqual(rows[1][13], str(self.order.get_total_cost()))
+        self.assertIn('Test Product x', rows[1][-1])
+
+    def test_export_query_round_trip(self):
+        """Test that a background export selects the orders of the picked queryset, and only a signed one"""
+        paid = Order.objects.create(
+            first_name='Jane', last_name='Doe', email='jane@example.com', city='Test City', paid='paid'
+        )
+
+        query = dump_export_query(Order.objects.filter(paid='paid'))
+        self.assertEqual(list(get_orders_for_export(query)), [paid])
+        with self.assertRaises(signing.BadSignature):
+            get_orders_for_export(query[:-1])
+
+    def test_delete_old_exports(self):
+        """Test that only exports older than the retention period are deleted"""
+        with tempfile.TemporaryDirectory() as root, override_settings(ORDER_EXPORT_DIR=root):
+            storage = get_export_storage()
+            old, fresh = storage.save('old.xlsx', ContentFile(b'x')), storage.save('fresh.xlsx', ContentFile(b'x'))
+            stale = time.time() - settings.ORDER_EXPORT_MAX_AGE - 60
+            os.utime(storage.path(old), (stale, stale))
+
+            self.assertEqual(delete_old_exports(), 1)
+            self.assertEqual(storage.listdir('')[1], [fresh])
+
+    def test_sales_rollup_feeds_dashboard(self):
+        """Test that the dashboard summary is read from the daily rollups"""
+        coupon = Coupon.objects.create(
+            code='ROLLUP10',
+            valid_from=timezone.now(),
+            valid_to=timezone.now() + timedelta(days=30),
+            discount=10,
+            active=True
+        )
+        self.order.paid = 'paid'
+        self.order.coupon = coupon
+        self.order.discount = 10
+        self.order.save()
+        today = timezone.localdate()
+
+        self.assertEqual(rebuild_sales_rollups(today, today), 1)
+        rollup = DailySalesRollup.objects.get(day=today)
+        self.assertEqual(rollup.orders, 1)
+        self.assertEqual(rollup.units, 1)
+        self.assertEqual(rollup.revenue, Decimal('99.99'))
+        self.assertEqual(rollup.by_coupon['ROLLUP10'], {'orders': 1, 'discount': '10.00'})
+
+        with self.assertNumQueries(1):
+            summary = get_sales_summary(30)
+        self.assertEqual(summary['orders'], [1])
+        self.assertEqual(summary['statuses'], {'paid': 1})
+
+    def test_sales_rollup_rebuild_is_debounced(self):
+        """Test that a burst of saves queues one delayed rebuild of the order's day"""
+        day = timezone.localdate().isoformat()
+        cache.delete(get_sales_rollup_queued_key(day))
+
+        with mock.patch('orders.signals.rebuild_daily_sales_rollup.apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.order.paid = 'paid'
+                self.order.save()
+                self.order.save()
+        apply_async.assert_called_once_with((day,), countdown=SALES_ROLLUP_DEBOUNCE)
+
     def test_orders_list_view_unauthenticated(self):
         """Test orders list view redirects when not authenticated"""
         path = reverse('orders:orders')
@@ -467,6 +611,120 @@ class OrderIntegrationTestCase(TestCase):
 
         # Verify order items were created
         self.assertEqual(order.items.count(), 2)
+        self.assertTrue(order.stock_reservation)
+
+    def test_order_create_is_idempotent(self):
+        """Test that resubmitting the checkout form does not duplicate the order"""
+        self.client.login(username='testuser', password='testpass123')
+        cart_path = reverse('cart:cart_add', args=[self.product1.id])
+        self.client.post(cart_path, {'quantity': 2, 'override': False})
+
+        order_path = reverse('orders:order_create')
+        order_data = {
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'email': 'john@example.com',
+            'region': 'Kyiv', 'post_office': 'Branch 1',
+            'city': 'Test City',
+            'idempotency_key': uuid.uuid4().hex,
+        }
+        first = self.client.post(order_path, order_data)
+        second = self.client.post(order_path, order_data)
+
+        self.assertEqual(first.status_code, HTTPStatus.FOUND)
+        self.assertEqual(second.url, first.url)
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 1)
+
+    def test_order_create_replays_order_on_duplicate_key(self):
+        """Test that a resubmit the Redis claim missed gets the order placed first"""
+        self.client.login(username='testuser', password='testpass123')
+        order_path = reverse('orders:order_create')
+        order_data = {
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'email': 'john@example.com',
+            'region': 'Kyiv', 'post_office': 'Branch 1',
+            'city': 'Test City',
+            'idempotency_key': uuid.uuid4().hex,
+        }
+        self.client.post(reverse('cart:cart_add', args=[self.product1.id]), {'quantity': 2, 'override': False})
+        first = self.client.post(order_path, order_data)
+        self.client.post(reverse('cart:cart_add', args=[self.product1.id]), {'quantity': 2, 'override': False})
+        with mock.patch('orders.views.claim_idempotency_key', return_value=None):
+            second = self.client.post(order_path, order_data)
+
+        self.assertEqual(second.url, first.url)
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(self.client.session['order_id'], Order.objects.get(user=self.user).id)
+
+    def test_order_create_without_key_skips_idempotency(self):
+        """Test that a checkout without an idempotency key is placed without replay"""
+        self.client.login(username='testuser', password='testpass123')
+        order_data = {
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'email': 'john@example.com',
+            'region': 'Kyiv', 'post_office': 'Branch 1',
+            'city': 'Test City',
+        }
+        for _ in range(2):
+            self.client.post(reverse('cart:cart_add', args=[self.product1.id]), {'quantity': 1, 'override': False})
+            self.client.post(reverse('orders:order_create'), order_data)
+
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 2)
+        self.assertFalse(OrderIdempotencyKey.objects.exists())
+
+    def test_stock_reservation_is_all_or_nothing(self):
+        """Test that a short product leaves every other counter untouched"""
+        reserve_stock({self.product1.id: 8})
+
+        with self.assertRaises(InsufficientStock) as raised:
+            reserve_stock({self.product2.id: 1, self.product1.id: 3})
+        self.assertEqual(raised.exception.product_id, self.product1.id)
+        self.assertEqual(raised.exception.available, 2)
+        self.assertEqual(int(get_redis_connection("default").get(stock_key(self.product2.id))), 5)
+
+    def test_released_stock_reservation_returns_units(self):
+        """Test that releasing a reservation gives its units back once"""
+        token = reserve_stock({self.product2.id: 5})
+        with self.assertRaises(InsufficientStock):
+            reserve_stock({self.product2.id: 1})
+
+        self.assertTrue(release_stock_reservation(token))
+        self.assertFalse(release_stock_reservation(token))
+        reserve_stock({self.product2.id: 5})
+
+    def test_stock_counter_follows_manual_stock_change(self):
+        """Test that changing the stock by hand moves the counter by the difference"""
+        reserve_stock({self.product1.id: 3})
+        self.product1.quantity = 15
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product1.save()
+
+        self.assertEqual(int(get_redis_connection("default").get(stock_key(self.product1.id))), 12)
+
+    def test_release_does_not_recreate_dropped_counter(self):
+        """Test that units released into a dropped counter are left to the next priming"""
+        token = reserve_stock({self.product2.id: 2})
+        drop_stock_counters(self.product2.id)
+
+        self.assertTrue(release_stock_reservation(token))
+        self.assertIsNone(get_redis_connection("default").get(stock_key(self.product2.id)))
+
+    def test_late_payment_checks_available_stock(self):
+        """Test that a payment after its reservation expired cannot take stock sold meanwhile"""
+        order = Order.objects.create(
+            first_name='John', last_name='Doe', email='john@example.com', city='Test City', user=self.user
+        )
+        OrderItem.objects.create(order=order, product=self.product2, price=Decimal('75.00'), quantity=4)
+        token = reserve_stock({self.product2.id: 4})
+        release_stock_reservation(token)
+        reserve_stock({self.product2.id: 3})
+
+        with self.assertRaises(InsufficientStock):
+            confirm_stock_reservation(token, order)
+        self.product2.refresh_from_db()
+        self.assertEqual(self.product2.quantity, 5)
 
     def test_order_with_coupon_flow(self):
         """Test order flow with coupon discount"""
@@ -507,3 +765,36 @@ class OrderIntegrationTestCase(TestCase):
         order = Order.objects.latest('created_at')
         self.assertEqual(order.coupon, coupon)
         self.assertEqual(order.discount, 20)
+
+
+class _Deadlock(Exception):
+    pgcode = '40P01'
+
+
+class AtomicWithRetryTestCase(TransactionTestCase):
+    """Tests for retrying conflicting transactions"""
+
+    def test_deadlock_is_retried(self):
+        """Test that a deadlock runs the transaction again"""
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise OperationalError('deadlock detected') from _Deadlock()
+            return 'done'
+
+        self.assertEqual(atomic_with_retry(flaky, base_delay=0), 'done')
+        self.assertEqual(len(calls), 2)
+
+    def test_other_errors_are_not_retried(self):
+        """Test that unrelated database errors propagate at once"""
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise OperationalError('connection lost')
+
+        with self.assertRaises(OperationalError):
+            atomic_with_retry(broken, base_delay=0)
+        self.assertEqual(len(calls), 1)
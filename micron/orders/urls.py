@@ -2,6 +2,7 @@ from django.urls import path
 from django.utils.translation import gettext_lazy as _
 from orders.views import (
     admin_order_detail,
+    admin_order_export,
     admin_order_pdf,
     delete_order,
     detail_order,
@@ -24,4 +25,6 @@ urlpatterns = [
     path("admin/order/<int:order_id>/", admin_order_detail, name="admin_order_detail"),
     # Admin order PDF
     path("admin/order/<int:order_id>/pdf/", admin_order_pdf, name="admin_order_pdf"),
+    # Admin order export download
+    path("admin/export/<str:filename>/", admin_order_export, name="admin_order_export"),
 ]
@@ -0,0 +1,73 @@
+import re
+
+from django.http import HttpRequest
+from django_redis import get_redis_connection
+
+from common.metrics import increment
+from orders.models.idempotency_key import OrderIdempotencyKey
+
+IDEMPOTENCY_KEY_FIELD = "idempotency_key"
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_CACHE_PREFIX = "order_idempotency"
+IDEMPOTENCY_KEY_TIMEOUT = 60 * 60 * 24
+IDEMPOTENCY_CLAIM_TIMEOUT = 60
+
+REPLAY_METRIC = "orders.idempotency.replay"
+COLLISION_METRIC = "orders.idempotency.collision"
+
+_PENDING = b"pending"
+_KEY_RE = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+class IdempotencyKeyInUse(Exception):
+    """Another request is still placing an order under the same key."""
+
+
+def _cache_key(user_id: int, key: str) -> str:
+    return f"{IDEMPOTENCY_CACHE_PREFIX}:{user_id}:{key}"
+
+
+def get_idempotency_key(request: HttpRequest) -> str | None:
+    """Key from the Idempotency-Key header (API) or the hidden checkout form field (HTML)."""
+
+    key = request.headers.get(IDEMPOTENCY_HEADER) or request.POST.get(IDEMPOTENCY_KEY_FIELD)
+    return key if key and _KEY_RE.match(key) else None
+
+
+def get_placed_order_id(user_id: int, key: str) -> int | None:
+    """The order Postgres recorded under `key`, if any."""
+
+    return OrderIdempotencyKey.objects.filter(user_id=user_id, key=key).values_list("order_id", flat=True).first()
+
+
+def claim_idempotency_key(user_id: int, key: str) -> int | None:
+    """
+    Return the id of the order already placed under `key`, or claim the key
+    for the current request and return None. Redis answers repeats and
+    concurrent duplicates; Postgres is the record once Redis forgot the key.
+    """
+    r = get_redis_connection("default")
+    cache_key = _cache_key(user_id, key)
+    if r.set(cache_key, _PENDING, nx=True, ex=IDEMPOTENCY_CLAIM_TIMEOUT):
+        order_id = get_placed_order_id(user_id, key)
+        if order_id is not None:
+            r.set(cache_key, order_id, ex=IDEMPOTENCY_KEY_TIMEOUT)
+            increment(REPLAY_METRIC)
+        return order_id
+
+    value = r.get(cache_key)
+    if value is None or value == _PENDING:
+        increment(COLLISION_METRIC)
+        raise IdempotencyKeyInUse(key)
+    increment(REPLAY_METRIC)
+    return int(value)
+
+
+def complete_idempotency_key(user_id: int, key: str, order_id: int) -> None:
+    get_redis_connection("default").set(_cache_key(user_id, key), order_id, ex=IDEMPOTENCY_KEY_TIMEOUT)
+
+
+def release_idempotency_key(user_id: int, key: str) -> None:
+    """Let the key be used again after the attempt failed without placing an order."""
+
+    get_redis_connection("default").delete(_cache_key(user_id, key))
@@ -0,0 +1,58 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db.models import Count, IntegerField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from parler import appsettings
+
+from orders.models.order import Order
+from orders.models.order_item import OrderItem
+
+ORDERS_PER_PAGE = 7
+ACTIVE_ITEMS = Q(items__deleted__isnull=True)
+
+
+def get_order_history_page(user, page_number: str | int | None, language_code: str) -> Page:
+    """
+    One page of a user's orders, annotated with item and unit counts and
+    carrying `product_names`. Totals come from the stored order columns, so
+    the page costs a fixed number of queries whatever its size.
+    """
+    orders = (
+        Order.objects
+        .filter(user=user)
+        .select_related("coupon")
+        .annotate(
+            line_count=Count("items", filter=ACTIVE_ITEMS),
+            unit_count=Coalesce(Sum("items__quantity", filter=ACTIVE_ITEMS), Value(0), output_field=IntegerField()),
+        )
+        .order_by("-created_at")
+    )
+    page = Paginator(orders, ORDERS_PER_PAGE).get_page(page_number)
+    names = get_order_product_names([order.id for order in page], language_code)
+    for order in page:
+        order.product_names = names.get(order.id, [])
+    return page
+
+
+def get_order_product_names(order_ids: list[int], language_code: str) -> dict[int, list[str]]:
+    """Translated names of the products in these orders, falling back to the default language."""
+
+    fallback = appsettings.PARLER_DEFAULT_LANGUAGE_CODE
+    rows = (
+        OrderItem.objects
+        .filter(order_id__in=order_ids, product__translations__language_code__in={language_code, fallback})
+        .order_by("order_id", "id")
+        .values_list("order_id", "id", "product__translations__language_code", "product__translations__name")
+    )
+
+    per_item: dict[tuple[int, int], str] = {}
+    for order_id, item_id, row_language, name in rows:
+        if row_language == language_code or (order_id, item_id) not in per_item:
+            per_item[order_id, item_id] = name
+
+    names = defaultdict(list)
+    for (order_id, _), name in per_item.items():
+        names[order_id].append(name)
+    return dict(names)
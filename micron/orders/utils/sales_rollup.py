@@ -0,0 +1,119 @@
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from orders.models.daily_sales_rollup import DailySalesRollup
+from orders.models.order import Order
+from orders.models.order_item import OrderItem
+
+PAID = Q(paid="paid")
+ROLLUP_FIELDS = ["orders", "unpaid_orders", "revenue", "units", "by_category", "by_coupon", "updated_at"]
+# A burst of order saves on one day queues a single rebuild, run this many seconds after the first.
+SALES_ROLLUP_DEBOUNCE = 60
+SALES_ROLLUP_QUEUED_PREFIX = "sales_rollup:queued"
+
+
+def _day_bounds(first: datetime.date, last: datetime.date) -> tuple[datetime.datetime, datetime.datetime]:
+    tz = timezone.get_current_timezone()
+    start = datetime.datetime.combine(first, datetime.time.min, tzinfo=tz)
+    end = datetime.datetime.combine(last + datetime.timedelta(days=1), datetime.time.min, tzinfo=tz)
+    return start, end
+
+
+def rebuild_sales_rollups(first: datetime.date, last: datetime.date) -> int:
+    """
+    Recompute the rollups of the days first..last (inclusive, in the current
+    timezone) with three grouped queries and one upsert. Days left without
+    orders are removed. Returns the number of days stored.
+    """
+    start, end = _day_bounds(first, last)
+    tz = timezone.get_current_timezone()
+    orders = Order.objects.filter(created_at__gte=start, created_at__lt=end)
+    rollups: dict[datetime.date, DailySalesRollup] = {}
+
+    for row in (
+        orders.annotate(day=TruncDate("created_at", tzinfo=tz))
+        .values("day")
+        .annotate(
+            paid_orders=Count("id", filter=PAID),
+            unpaid=Count("id", filter=~PAID),
+            paid_revenue=Sum("subtotal", filter=PAID),
+        )
+        .order_by()
+    ):
+        rollups[row["day"]] = DailySalesRollup(
+            day=row["day"],
+            orders=row["paid_orders"],
+            unpaid_orders=row["unpaid"],
+            revenue=row["paid_revenue"] or Decimal(0),
+        )
+
+    for row in (
+        OrderItem.objects.filter(order__in=orders.filter(PAID))
+        .annotate(day=TruncDate("order__created_at", tzinfo=tz))
+        .values("day", "product__category_id")
+        .annotate(units=Sum("quantity"), revenue=Sum(F("price") * F("quantity")))
+        .order_by()
+    ):
+        rollup = rollups[row["day"]]
+        rollup.units += row["units"]
+        rollup.by_category[str(row["product__category_id"])] = {
+            "units": row["units"],
+            "revenue": str(row["revenue"]),
+        }
+
+    for row in (
+        orders.filter(PAID, coupon__isnull=False)
+        .annotate(day=TruncDate("created_at", tzinfo=tz))
+        .values("day", "coupon__code")
+        .annotate(coupon_orders=Count("id"), discount=Sum("discount_amount"))
+        .order_by()
+    ):
+        rollups[row["day"]].by_coupon[row["coupon__code"]] = {
+            "orders": row["coupon_orders"],
+            "discount": str(row["discount"]),
+        }
+
+    with transaction.atomic():
+        DailySalesRollup.objects.filter(day__range=(first, last)).exclude(day__in=rollups).delete()
+        DailySalesRollup.objects.bulk_create(
+            rollups.values(), batch_size=500,
+            update_conflicts=True, unique_fields=["day"], update_fields=ROLLUP_FIELDS,
+        )
+    return len(rollups)
+
+
+def get_order_day(order: Order) -> datetime.date:
+    return timezone.localtime(order.created_at).date()
+
+
+def get_sales_rollup_queued_key(day: str) -> str:
+    return f"{SALES_ROLLUP_QUEUED_PREFIX}:{day}"
+
+
+def get_sales_summary(days: int) -> dict:
+    """Dashboard figures of the last `days` days, read from the rollups in a single query."""
+
+    first = timezone.localdate() - datetime.timedelta(days=days)
+    rollups = list(
+        DailySalesRollup.objects
+        .filter(day__gte=first)
+        .order_by("day")
+        .values("day", "orders", "unpaid_orders", "revenue")
+    )
+    statuses = defaultdict(int)
+    for rollup in rollups:
+        statuses["paid"] += rollup["orders"]
+        statuses["unpaid"] += rollup["unpaid_orders"]
+    paid_days = [rollup for rollup in rollups if rollup["orders"]]
+    return {
+        "days": [rollup["day"].strftime("%Y-%m-%d") for rollup in paid_days],
+        "orders": [rollup["orders"] for rollup in paid_days],
+        "revenue": [float(rollup["revenue"]) for rollup in paid_days],
+        "statuses": {status: count for status, count in statuses.items() if count},
+    }
@@ -0,0 +1,242 @@
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django_redis import get_redis_connection
+
+from products.models.product import Product
+
+STOCK_KEY_PREFIX = "stock"
+RESERVATIONS_KEY = f"{STOCK_KEY_PREFIX}:reservations"
+CONFIRMED_RESERVATION_TTL = 60 * 60 * 24 * 7
+
+# All or nothing: either every counter covers its quantity and all of them are
+# decremented, or nothing changes. Returns {1} on success, {-1, i} when the
+# i-th counter is not primed yet and {0, i, available} when it is short.
+RESERVE_SCRIPT = """
+local n = #KEYS - 2
+for i = 1, n do
+    local available = redis.call('GET', KEYS[i + 2])
+    if not available then
+        return {-1, i}
+    end
+    if tonumber(available) < tonumber(ARGV[i + 2]) then
+        return {0, i, tonumber(available)}
+    end
+end
+for i = 1, n do
+    redis.call('DECRBY', KEYS[i + 2], ARGV[i + 2])
+    redis.call('HSET', KEYS[1], 'p:' .. ARGV[i + 2 + n], ARGV[i + 2])
+end
+redis.call('HSET', KEYS[1], 'created', ARGV[2])
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+return {1}
+"""
+
+# Give a pending reservation's units back. The ZREM makes release, expiry and
+# confirmation mutually exclusive. A counter that was dropped meanwhile is left
+# missing, to be primed again from Postgres. Returns nil when there was nothing
+# to release, otherwise {applied, product_id, quantity, ...}. Counter keys are
+# built from ARGV[2], see common.redis.
+RELEASE_SCRIPT = """
+if redis.call('ZREM', KEYS[2], ARGV[1]) == 0 then
+    return false
+end
+local fields = redis.call('HGETALL', KEYS[1])
+local result = {0}
+for i = 1, #fields, 2 do
+    if string.sub(fields[i], 1, 2) == 'p:' then
+        local product_id = string.sub(fields[i], 3)
+        if redis.call('EXISTS', ARGV[2] .. product_id) == 1 then
+            redis.call('INCRBY', ARGV[2] .. product_id, fields[i + 1])
+        end
+        table.insert(result, product_id)
+        table.insert(result, fields[i + 1])
+    elseif fields[i] == 'applied' then
+        result[1] = 1
+    end
+end
+redis.call('DEL', KEYS[1])
+return result
+"""
+
+# Mark a reservation as written to Postgres; returns its lines only the first time.
+APPLY_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 or redis.call('HSETNX', KEYS[1], 'applied', 1) == 0 then
+    return false
+end
+local fields = redis.call('HGETALL', KEYS[1])
+local result = {}
+for i = 1, #fields, 2 do
+    if string.sub(fields[i], 1, 2) == 'p:' then
+        table.insert(result, string.sub(fields[i], 3))
+        table.insert(result, fields[i + 1])
+    end
+end
+return result
+"""
+
+# Returns 1 when a pending reservation got confirmed, 0 when it was already
+# confirmed and -1 when it no longer exists (expired and released).
+CONFIRM_SCRIPT = """
+if redis.call('ZREM', KEYS[2], ARGV[1]) == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+return -1
+"""
+
+
+# Move a primed counter by ARGV[1] after the stock was changed by hand; a
+# missing counter stays missing. Returns the new count, or nil.
+ADJUST_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return false
+end
+return redis.call('INCRBY', KEYS[1], ARGV[1])
+"""
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_id: int, available: int) -> None:
+        super().__init__(f"Only {available} units of product {product_id} left")
+        self.product_id = product_id
+        self.available = available
+
+
+def stock_key(product_id: int | str) -> str:
+    return f"{STOCK_KEY_PREFIX}:{product_id}"
+
+
+def reservation_key(token: str) -> str:
+    return f"{STOCK_KEY_PREFIX}:reservation:{token}"
+
+
+def _pairs(values: list) -> dict[int, int]:
+    return {int(values[i]): int(values[i + 1]) for i in range(0, len(values), 2)}
+
+
+def prime_stock_counters(product_ids: list[int]) -> None:
+    """Seed missing counters from Postgres; existing counters are left alone."""
+
+    r = get_redis_connection("default")
+    pipeline = r.pipeline()
+    for product_id, quantity in Product.objects.filter(id__in=product_ids).values_list("id", "quantity"):
+        pipeline.set(stock_key(product_id), quantity, nx=True)
+    pipeline.execute()
+
+
+def adjust_stock_counter(product_id: int, delta: int) -> None:
+    """Move a primed counter by the change an admin made to the stock."""
+
+    r = get_redis_connection("default")
+    r.register_script(ADJUST_SCRIPT)(keys=[stock_key(product_id)], args=[delta])
+
+
+def drop_stock_counters(*product_ids: int) -> None:
+    """Forget counters after the stock was set by hand; they are re-primed on the next checkout."""
+
+    get_redis_connection("default").delete(*(stock_key(product_id) for product_id in product_ids))
+
+
+def reserve_stock(lines: dict[int, int]) -> str:
+    """
+    Atomically take `lines` ({product_id: quantity}) out of the Redis stock
+    counters and return the reservation token. Unless confirmed, the
+    reservation is released after STOCK_RESERVATION_TTL seconds.
+    Raises InsufficientStock naming the first product that is short.
+    """
+    r = get_redis_connection("default")
+    script = r.register_script(RESERVE_SCRIPT)
+    token = uuid.uuid4().hex
+    product_ids = sorted(lines)
+    keys = [reservation_key(token), RESERVATIONS_KEY, *(stock_key(product_id) for product_id in product_ids)]
+    args = [
+        token,
+        int(time.time()) + settings.STOCK_RESERVATION_TTL,
+        *(lines[product_id] for product_id in product_ids),
+        *product_ids,
+    ]
+
+    result = script(keys=keys, args=args)
+    if result[0] == -1:
+        prime_stock_counters(product_ids)
+        result = script(keys=keys, args=args)
+    if result[0] == -1:
+        raise InsufficientStock(product_ids[result[1] - 1], 0)
+    if result[0] == 0:
+        raise InsufficientStock(product_ids[result[1] - 1], int(result[2]))
+    return token
+
+
+def release_stock_reservation(token: str) -> bool:
+    """Return a pending reservation's units to Redis and, if already written there, to Postgres."""
+
+    r = get_redis_connection("default")
+    result = r.register_script(RELEASE_SCRIPT)(
+        keys=[reservation_key(token), RESERVATIONS_KEY], args=[token, f"{STOCK_KEY_PREFIX}:"]
+    )
+    if result is None:
+        return False
+    if int(result[0]):
+        _move_database_stock(_pairs(result[1:]), sign=1)
+    return True
+
+
+def apply_stock_reservation(token: str) -> None:
+    """Write a reservation's decrements to Postgres, once."""
+
+    r = get_redis_connection("default")
+    key = reservation_key(token)
+    lines = r.register_script(APPLY_SCRIPT)(keys=[key])
+    if lines is None:
+        return
+    try:
+        _move_database_stock(_pairs(lines), sign=-1)
+    except Exception:
+        r.hdel(key, "applied")
+        raise
+
+
+def confirm_stock_reservation(token: str, order=None) -> str:
+    """
+    Keep a reservation for good once its order is paid and return the token
+    the order holds its stock under. A reservation that already expired gave
+    its units back, so the paid order reserves them again; raises
+    InsufficientStock when they were sold to someone else meanwhile.
+    """
+    r = get_redis_connection("default")
+    confirm = r.register_script(CONFIRM_SCRIPT)
+    state = confirm(keys=[reservation_key(token), RESERVATIONS_KEY], args=[token, CONFIRMED_RESERVATION_TTL])
+    if state != -1 or order is None:
+        return token
+
+    lines = defaultdict(int)
+    for product_id, quantity in order.items.values_list("product_id", "quantity"):
+        lines[product_id] += quantity
+    token = reserve_stock(lines)
+    confirm(keys=[reservation_key(token), RESERVATIONS_KEY], args=[token, CONFIRMED_RESERVATION_TTL])
+    apply_stock_reservation(token)
+    return token
+
+
+def get_expired_reservations(limit: int = 500) -> list[str]:
+    r = get_redis_connection("default")
+    return [token.decode() for token in r.zrangebyscore(RESERVATIONS_KEY, "-inf", int(time.time()), 0, limit)]
+
+
+def _move_database_stock(lines: dict[int, int], sign: int) -> None:
+    # One short UPDATE per product in id order: rows stay locked only for this
+    # transaction and concurrent writers always lock them in the same order.
+    with transaction.atomic():
+        for product_id in sorted(lines):
+            Product.all_objects.filter(pk=product_id).update(
+                quantity=Greatest(F("quantity") + sign * lines[product_id], Value(0))
+            )
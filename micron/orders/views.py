@@ -1,101 +1,150 @@
+import logging
 import os
+import uuid
+from decimal import Decimal
 
 import weasyprint
-from django.db import transaction
+from django.db import IntegrityError
 from django.db.models import F
 
-from cart.cart import Cart
+from cart.cart import Cart, get_cart
 from django.conf import settings
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse, HttpRequest
+from django.http import FileResponse, Http404, HttpResponse, HttpRequest
 from django.views.decorators.http import require_POST
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
 from django.urls import reverse, reverse_lazy
 from django.contrib import messages
 from django.utils.translation import gettext_lazy as _
-from django.core.paginator import Paginator
 
 from .forms import OrderCreateForm
 from coupons.models.coupon import Coupon
+from common.db import atomic_with_retry
+from orders.models.idempotency_key import OrderIdempotencyKey
 from orders.models.order import Order
 from orders.models.order_item import OrderItem
-from products.models.product import Product
-from .tasks import order_created_email, order_created_telegram
+from orders.utils.idempotency import (
+    IDEMPOTENCY_KEY_FIELD, IdempotencyKeyInUse, claim_idempotency_key, complete_idempotency_key,
+    get_idempotency_key, get_placed_order_id, release_idempotency_key,
+)
+from orders.utils.export import get_export_storage
+from orders.utils.order_history import get_order_history_page
+from orders.utils.stock_reservation import InsufficientStock, release_stock_reservation, reserve_stock
+from .tasks import apply_stock_reservation, order_created_email, order_created_telegram
+
+logger = logging.getLogger(__name__)
+
+
+def _save_order(request: HttpRequest, form: OrderCreateForm, cart: Cart, reservation: str,
+                idempotency_key: str | None) -> Order:
+    order = form.save(commit=False)
+    order.user = request.user
+    order.stock_reservation = reservation
+    if cart.coupon:
+        order.coupon = cart.coupon
+        order.discount = cart.coupon.discount
+
+    order.bonus_points = cart.get_total_bonus_points()
+    # Items are bulk created below without signals, so the subtotal is set here.
+    order.subtotal = sum((item["total_price"] for item in cart), Decimal(0))
+    order.save()
+
+    if order.coupon:
+        Coupon.objects.filter(pk=order.coupon_id).update(used_count=F("used_count") + 1)
+
+    OrderItem.objects.bulk_create([
+        OrderItem(
+            order=order,
+            product=item["product"],
+            price=item["price"],
+            quantity=item["quantity"],
+            user=request.user,
+        )
+        for item in cart
+    ])
+    if idempotency_key:
+        OrderIdempotencyKey.objects.create(user=request.user, key=idempotency_key, order=order)
+    return order
+
+
+def _order_failed(request: HttpRequest, idempotency_key: str | None) -> HttpResponse:
+    if idempotency_key:
+        release_idempotency_key(request.user.id, idempotency_key)
+    messages.error(
+        request, _("An error occurred while processing your order.")
+    )
+    return redirect("cart:cart_summary")
 
 
 @login_required(login_url=reverse_lazy("user_account:login"))
 def order_create(request: HttpRequest):
     """Create new order from cart items with stock validation."""
-    cart = Cart(request)
+    cart = get_cart(request)
 
     shipping = Order.objects.filter(user=request.user).order_by("-created_at").first()
 
+    idempotency_key = None
     if request.method == "POST":
+        # Without a key (an old form, a client that sends none) the order is placed without replay protection.
+        idempotency_key = get_idempotency_key(request)
         form = OrderCreateForm(request.POST)
         if form.is_valid():
+            if idempotency_key:
+                try:
+                    order_id = claim_idempotency_key(request.user.id, idempotency_key)
+                except IdempotencyKeyInUse:
+                    messages.info(request, _("Your order is already being placed."))
+                    return redirect("cart:cart_summary")
+                if order_id is not None:
+                    request.session["order_id"] = order_id
+                    return redirect(reverse("payment:select-payment"))
+
+            lines = {item["product"].id: item["quantity"] for item in cart}
+            reservation = None
             try:
-                with transaction.atomic():
-                    order = form.save(commit=False)
-                    order.user = request.user
-                    if cart.coupon:
-                        order.coupon = cart.coupon
-                        order.discount = cart.coupon.discount
-
-                    order.bonus_points = cart.get_total_bonus_points()
-                    order.save()
-
-                    if order.coupon:
-                        Coupon.objects.filter(pk=order.coupon_id).update(used_count=F("used_count") + 1)
-
-                    product_ids = [item["product"].id for item in cart]
-                    locked_products = {
-                        p.id: p for p in
-                        Product.objects.select_for_update().filter(id__in=product_ids)
-                    }
-
-                    products_to_update = []
-                    order_items = []
-                    for item in cart:
-                        product = locked_products[item["product"].id]
-                        quantity = item["quantity"]
-
-                        if product.quantity < quantity:
-                            messages.error(
-                                request,
-                                _(
-                                    "Sorry, only {0} units of {1} are available now. Please update your cart."
-                                ).format(product.quantity, product.name),
-                            )
-                            raise ValueError(_("Insufficient product quantity"))
-
-                        product.quantity -= quantity
-                        products_to_update.append(product)
-                        order_items.append(OrderItem(
-                            order=order,
-                            product=item["product"],
-                            price=item["price"],
-                            quantity=item["quantity"],
-                            user=request.user,
-                        ))
-
-                    Product.objects.bulk_update(products_to_update, ["quantity"])
-                    OrderItem.objects.bulk_create(order_items)
-
-                cart.clear()
-                order_created_email.delay(order.id)
-                order_created_telegram.delay(order.id)
-                request.session["order_id"] = order.id
-                return redirect(reverse("payment:select-payment"))
-
-            except ValueError:
-                return redirect("cart:cart_summary")
-            except Exception:
+                reservation = reserve_stock(lines)
+                order = atomic_with_retry(
+                    lambda: _save_order(request, form, cart, reservation, idempotency_key),
+                    metric="orders.create",
+                )
+            except InsufficientStock as exc:
+                if idempotency_key:
+                    release_idempotency_key(request.user.id, idempotency_key)
+                product = next(item["product"] for item in cart if item["product"].id == exc.product_id)
                 messages.error(
-                    request, _("An error occurred while processing your order.")
+                    request,
+                    _(
+                        "Sorry, only {0} units of {1} are available now. Please update your cart."
+                    ).format(exc.available, product.name),
                 )
                 return redirect("cart:cart_summary")
+            except IntegrityError:
+                if reservation:
+                    release_stock_reservation(reservation)
+                # A resubmit that outlived the Redis claim hits the unique key: the first order stands.
+                order_id = get_placed_order_id(request.user.id, idempotency_key) if idempotency_key else None
+                if order_id is None:
+                    logger.exception("Failed to create order for user %s", request.user.id)
+                    return _order_failed(request, idempotency_key)
+                complete_idempotency_key(request.user.id, idempotency_key, order_id)
+                request.session["order_id"] = order_id
+                return redirect(reverse("payment:select-payment"))
+            except Exception:
+                logger.exception("Failed to create order for user %s", request.user.id)
+                if reservation:
+                    release_stock_reservation(reservation)
+                return _order_failed(request, idempotency_key)
+
+            if idempotency_key:
+                complete_idempotency_key(request.user.id, idempotency_key, order.id)
+            apply_stock_reservation.delay(reservation)
+            cart.clear()
+            order_created_email.delay(order.id)
+            order_created_telegram.delay(order.id)
+            request.session["order_id"] = order.id
+            return redirect(reverse("payment:select-payment"))
     else:
         if shipping:
             form = OrderCreateForm(instance=shipping)
@@ -111,7 +160,14 @@ def order_create(request: HttpRequest):
             }
             form = OrderCreateForm(initial=initial)
 
-    return render(request, "orders/order/checkout.html", {"cart": cart, "form": form})
+    context = {
+        "cart": cart,
+        "form": form,
+        # A fresh key per rendered form; a redisplayed form keeps the key it was submitted with.
+        "idempotency_key": idempotency_key or uuid.uuid4().hex,
+        "idempotency_key_field": IDEMPOTENCY_KEY_FIELD,
+    }
+    return render(request, "orders/order/checkout.html", context)
 
 
 @login_required(login_url=reverse_lazy("user_account:login"))
@@ -145,16 +201,7 @@ def admin_order_pdf(request: HttpRequest, order_id: int):
 @login_required(login_url=reverse_lazy("user_account:login"))
 def orders(request: HttpRequest):
     """Display list of user orders sorted by date."""
-    orders_list = (
-        Order.objects
-        .filter(user=request.user)
-        .order_by("-created_at")
-        .prefetch_related("items__product")
-        .select_related("coupon")
-    )
-    paginator = Paginator(orders_list, 7)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    page_obj = get_order_history_page(request.user, request.GET.get("page"), request.LANGUAGE_CODE)
 
     return render(
         request, "orders/order/orders.html", {"orders": page_obj, "page_obj": page_obj, "title": "| Orders"}
@@ -179,12 +226,22 @@ def detail_order(request: HttpRequest, order_id: int):
         user=request.user,
     )
     detail_order = (
-        OrderItem.objects
-        .filter(user=request.user, order=order)
-        .select_related("product", "user")
+        order.items
+        .select_related("product")
+        .prefetch_related("product__translations")
     )
     return render(
         request,
         "orders/order/order-detail.html",
         {"detail_order": detail_order, "order": order},
     )
+
+
+@login_required(login_url=reverse_lazy("user_account:login"))
+@staff_member_required
+def admin_order_export(request: HttpRequest, filename: str):
+    """Download a finished background order export (staff only)."""
+    storage = get_export_storage()
+    if "/" in filename or not filename.endswith(".xlsx") or not storage.exists(filename):
+        raise Http404
+    return FileResponse(storage.open(filename, "rb"), as_attachment=True, filename=filename)
@@ -7,6 +7,8 @@ from django.conf import settings
 from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 from orders.models import Order
+from orders.tasks import confirm_order_stock_reservation
+from products.tasks import record_order_co_purchases, record_order_popularity
 
 
 @shared_task
@@ -32,5 +34,8 @@ def add_user_bonus_points(order_id: int) -> None:
 
 @shared_task
 def payment_completed(order_id: int) -> None:
+    confirm_order_stock_reservation.delay(order_id)
+    record_order_co_purchases.delay(order_id)
+    record_order_popularity.delay(order_id)
     send_order_invoice.delay(order_id)
     add_user_bonus_points.delay(order_id)
@@ -53,11 +53,17 @@ class ProductAdmin(SafeDeleteAdmin, TranslatableAdmin):
     list_editable = ["price", "available"]
     list_display_links = ("name", "thumbnail", "slug")
     inlines = [ProductImageInline]
-    readonly_fields = ["created_at", "updated_at"]
+    readonly_fields = ["effective_price", "rating_average", "rating_count", "created_at", "updated_at"]
 
     def get_prepopulated_fields(self, request, obj=None):
         return {"slug": ("name",)}
 
+    def save_model(self, request, obj, form, change):
+        if change:
+            obj.save_without_ratings()
+        else:
+            super().save_model(request, obj, form, change)
+
 
 @admin.register(ProductImage)
 class ProductImageAdmin(SafeDeleteAdmin):
@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from products.utils.similarity import (
+    SIMILARITY_METRICS, build_order_product_matrix, iter_item_neighbours, load_order_lines,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Hold out the most recent paid orders and compare how well raw co-purchase counts "
+        "(the live Recommender scoring) and normalized similarities predict them."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--holdout", type=float, default=0.1, help="Share of the newest orders held out")
+        parser.add_argument("--top-k", type=int, default=10)
+
+    def handle(self, *args, **options) -> None:
+        order_ids, product_ids = load_order_lines()
+        if not len(order_ids):
+            raise CommandError("No paid orders to benchmark on.")
+
+        cutoff = np.quantile(np.unique(order_ids), 1 - options["holdout"])
+        train = order_ids <= cutoff
+        data = build_order_product_matrix(order_ids[train], product_ids[train])
+        column_of = {int(product_id): column for column, product_id in enumerate(data.product_ids)}
+        popular = set(np.argsort(-np.asarray(data.matrix.sum(axis=0)).ravel())[:max(1, len(column_of) // 100)])
+
+        held_out = {}
+        for order_id, product_id in zip(order_ids[~train].tolist(), product_ids[~train].tolist()):
+            if product_id in column_of:
+                held_out.setdefault(order_id, set()).add(column_of[product_id])
+        queries = [(min(columns), columns - {min(columns)}) for columns in held_out.values() if len(columns) > 1]
+
+        self.stdout.write(
+            f"{len(column_of)} products, {data.matrix.shape[0]} training orders, {len(queries)} held-out queries"
+        )
+        self.stdout.write(f"{'metric':<10}{'build s':>9}{'hit@k':>8}{'coverage':>10}{'popular share':>15}")
+        for metric in SIMILARITY_METRICS:
+            started = time.perf_counter()
+            neighbours = {
+                column: columns
+                for column, columns, _ in iter_item_neighbours(data.matrix, options["top_k"], metric)
+            }
+            elapsed = time.perf_counter() - started
+
+            hits = sum(
+                not targets.isdisjoint(neighbours[query].tolist())
+                for query, targets in queries if query in neighbours
+            )
+            recommended = np.concatenate(list(neighbours.values())) if neighbours else np.empty(0, dtype=np.int64)
+            coverage = len(np.unique(recommended)) / len(column_of)
+            popular_share = np.isin(recommended, list(popular)).mean() if len(recommended) else 0
+            hit_rate = hits / len(queries) if queries else 0
+            label = f"{metric}{' (live)' if metric == 'count' else ''}"
+            self.stdout.write(f"{label:<10}{elapsed:>9.2f}{hit_rate:>8.3f}{coverage:>10.3f}{popular_share:>15.3f}")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from products.utils.content_similarity import CONTENT_CHUNK_SIZE, CONTENT_TOP_K, build_content_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the TF-IDF content-similarity index of the catalog from names, descriptions and tags."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--top-k", type=int, default=CONTENT_TOP_K)
+        parser.add_argument("--chunk-size", type=int, default=CONTENT_CHUNK_SIZE, help="Products per sparse block")
+
+    def handle(self, *args, **options) -> None:
+        indexed = build_content_index(options["top_k"], options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed the content of {indexed} products."))
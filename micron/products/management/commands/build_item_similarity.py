@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from products.utils.similarity import (
+    DEFAULT_TOP_K, SIMILARITY_CHUNK_SIZE, SIMILARITY_METRICS, build_item_similarity,
+)
+
+
+class Command(BaseCommand):
+    help = "Compute item-item similarity over paid orders and publish the top-K neighbours to the Recommender."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+        parser.add_argument("--metric", choices=SIMILARITY_METRICS, default="cosine")
+        parser.add_argument("--chunk-size", type=int, default=SIMILARITY_CHUNK_SIZE, help="Products per sparse block")
+        parser.add_argument("--min-support", type=int, default=1, help="Minimum orders shared by two products")
+
+    def handle(self, *args, **options) -> None:
+        published = build_item_similarity(
+            options["top_k"], options["metric"], options["chunk_size"], options["min_support"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Published similar products for {published} products."))
@@ -0,0 +1,30 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.models.order_item import OrderItem
+from products.utils.popularity import rebuild_rankings
+
+
+class Command(BaseCommand):
+    help = "Replay paid orders into the trending and bestseller rankings, replacing what Redis holds."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--days", type=int, default=365, help="Only orders of the last N days")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options) -> None:
+        since = timezone.now() - datetime.timedelta(days=options["days"])
+        lines = (
+            OrderItem.objects
+            .filter(order__paid="paid", order__deleted__isnull=True, order__created_at__gte=since)
+            .order_by()
+            .values_list("order_id", "product_id", "product__category_id", "quantity", "order__created_at")
+            .iterator(chunk_size=options["chunk_size"])
+        )
+        replayed = rebuild_rankings(
+            (order_id, product_id, category_id, quantity, created_at.timestamp())
+            for order_id, product_id, category_id, quantity, created_at in lines
+        )
+        self.stdout.write(self.style.SUCCESS(f"Replayed {replayed} orders into the popularity rankings."))
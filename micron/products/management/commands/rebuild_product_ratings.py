@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from products.utils.ratings import rebuild_product_ratings
+
+
+class Command(BaseCommand):
+    help = "Recompute rating sum, count, average and star histogram of every product from its reviews."
+
+    def handle(self, *args, **options) -> None:
+        updated = rebuild_product_ratings()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt ratings of {updated} products."))
@@ -1,7 +1,24 @@
+from django.db import transaction
+from django.db.models import Case, F, When
 from parler.managers import TranslatableManager, TranslatableQuerySet
 from safedelete.managers import SafeDeleteManager
 from safedelete.queryset import SafeDeleteQueryset
 
+PRICE_FIELDS = frozenset({"price", "price_with_discount", "discount"})
+
+
+def effective_price_expression() -> Case:
+    """SQL equivalent of Product.get_effective_price(), used to refresh the stored column."""
+
+    return Case(
+        When(
+            discount=True,
+            price_with_discount__isnull=False,
+            then=F("price_with_discount"),
+        ),
+        default=F("price"),
+    )
+
 
 class SafeDeleteTranslatableQuerySet(SafeDeleteQueryset, TranslatableQuerySet):
     """
@@ -17,3 +34,56 @@ class SafeDeleteTranslatableManager(SafeDeleteManager, TranslatableManager):
     Used for the Product and Category models.
     """
     _queryset_class = SafeDeleteTranslatableQuerySet
+
+
+class ProductQuerySet(SafeDeleteTranslatableQuerySet):
+    """
+    Product QuerySet that keeps the denormalized effective_price column
+    in sync when prices are changed in bulk, bypassing Product.save().
+    """
+
+    def update(self, **kwargs) -> int:
+        from products.utils.card_cache import CARD_FIELDS
+
+        refresh_price = bool(PRICE_FIELDS.intersection(kwargs)) and "effective_price" not in kwargs
+        if not refresh_price and not CARD_FIELDS.intersection(kwargs):
+            rows = super().update(**kwargs)
+            self._invalidate_caches(kwargs, [])
+            return rows
+
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list("pk", flat=True))
+            rows = super().update(**kwargs)
+            if refresh_price:
+                self.model.all_objects.filter(pk__in=pks).update(effective_price=effective_price_expression())
+        self._invalidate_caches(kwargs, pks)
+        return rows
+
+    def bulk_update(self, objs, fields, batch_size=None) -> int:
+        fields = list(fields)
+        objs = list(objs)
+        if PRICE_FIELDS.intersection(fields) and "effective_price" not in fields:
+            for obj in objs:
+                obj.effective_price = obj.get_effective_price()
+            fields.append("effective_price")
+        rows = super().bulk_update(objs, fields, batch_size=batch_size)
+        self._invalidate_caches(fields, [obj.pk for obj in objs])
+        return rows
+
+    @staticmethod
+    def _invalidate_caches(fields, pks) -> None:
+        """Bulk writes bypass model signals, so drop cached facets, product cards and pages here."""
+        from products.utils.card_cache import CARD_FIELDS, invalidate_product_cards
+        from products.utils.facets import FACET_FIELDS, invalidate_catalog_facets
+        from products.utils.page_cache import invalidate_product_pages
+
+        if FACET_FIELDS.intersection(fields):
+            invalidate_catalog_facets()
+        if pks and CARD_FIELDS.intersection(fields):
+            invalidate_product_cards(*pks)
+            invalidate_product_pages(*pks)
+
+
+class ProductManager(SafeDeleteTranslatableManager):
+    """SafeDelete + Parler manager for Product with price-aware bulk operations."""
+    _queryset_class = ProductQuerySet
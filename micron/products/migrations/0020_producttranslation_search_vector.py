@@ -0,0 +1,53 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:12
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+BACKFILL_SEARCH_VECTORS = """
+UPDATE products_product_translation AS t
+SET search_vector =
+    setweight(to_tsvector(src.config, coalesce(t.name, '')), 'A')
+    || setweight(to_tsvector(src.config, coalesce(src.tag_names, '')), 'B')
+    || setweight(
+        to_tsvector(src.config, regexp_replace(coalesce(t.description, ''), '<[^>]+>', ' ', 'g')),
+        'C'
+    )
+FROM (
+    SELECT
+        tr.id,
+        (CASE tr.language_code WHEN 'en' THEN 'english' ELSE 'simple' END)::regconfig AS config,
+        (
+            SELECT string_agg(tag.name, ' ')
+            FROM taggit_taggeditem AS item
+            JOIN taggit_tag AS tag ON tag.id = item.tag_id
+            JOIN django_content_type AS ct ON ct.id = item.content_type_id
+            WHERE ct.app_label = 'products'
+              AND ct.model = 'product'
+              AND item.object_id = tr.master_id
+        ) AS tag_names
+    FROM products_product_translation AS tr
+) AS src
+WHERE t.id = src.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0019_alter_review_product_alter_review_user'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producttranslation',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Weighted full-text document built from name, tags and description', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='producttranslation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='product_tr_search_gin'),
+        ),
+        migrations.RunSQL(BACKFILL_SEARCH_VECTORS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:14
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0020_producttranslation_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='categorytranslation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='category_tr_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='producttranslation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='product_tr_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
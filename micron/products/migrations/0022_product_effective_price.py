@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:15
+
+from django.db import migrations, models
+from django.db.models import Case, F, When
+
+
+def backfill_effective_price(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    Product.objects.update(
+        effective_price=Case(
+            When(discount=True, price_with_discount__isnull=False, then=F("price_with_discount")),
+            default=F("price"),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0021_trigram_name_indexes'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='effective_price',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, help_text='Price the customer pays: discounted price while on discount, otherwise the regular price', max_digits=10),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['available', 'effective_price'], name='product_avail_price_idx'),
+        ),
+        migrations.RunPython(backfill_effective_price, migrations.RunPython.noop),
+    ]
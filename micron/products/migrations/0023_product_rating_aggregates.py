@@ -0,0 +1,75 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:24
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_ratings(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    Review = apps.get_model("products", "Review")
+
+    rows = (
+        Review.objects.filter(deleted__isnull=True, product__isnull=False)
+        .values("product_id")
+        .annotate(
+            rating_sum=Sum("stars"),
+            rating_count=Count("id"),
+            **{f"rating_{star}": Count("id", filter=Q(stars=star)) for star in range(1, 6)},
+        )
+        .order_by()
+    )
+    for row in rows:
+        product_id = row.pop("product_id")
+        row["rating_average"] = round(row["rating_sum"] / row["rating_count"], 2)
+        Product.objects.filter(pk=product_id).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0022_product_effective_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 1-star reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 2-star reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 3-star reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 4-star reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 5-star reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_average',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, help_text='Average stars of active reviews, 0 without reviews', max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of active reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Sum of stars of all active reviews'),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.urls import reverse
 from django.core.exceptions import ValidationError
@@ -19,6 +20,11 @@ class Category(TimeStampedModel, TranslatableModel):
     translations = TranslatedFields(
         name=models.CharField(max_length=200, help_text="Category name"),
         slug=models.SlugField(max_length=200, help_text="Category slug"),
+        meta={
+            "indexes": [
+                GinIndex(fields=["name"], name="category_tr_name_trgm", opclasses=["gin_trgm_ops"]),
+            ],
+        },
     )
 
     class Meta:
@@ -1,5 +1,7 @@
 from decimal import Decimal
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.urls import reverse
 from django_ckeditor_5.fields import CKEditor5Field
@@ -9,15 +11,18 @@ from taggit.managers import TaggableManager
 
 from common.model import TimeStampedModel
 from products.models.category import Category
-from products.managers import SafeDeleteTranslatableManager
+from products.managers import PRICE_FIELDS, ProductManager
 from django.core.validators import MinValueValidator
 from django.utils.translation import gettext_lazy as _
 
+RATING_STAR_FIELDS = {star: f"rating_{star}" for star in range(1, 6)}
+RATING_FIELDS = frozenset({"rating_sum", "rating_count", "rating_average", *RATING_STAR_FIELDS.values()})
+
 
 class Product(TimeStampedModel, TranslatableModel):
     """Product model"""
 
-    objects = SafeDeleteTranslatableManager()
+    objects = ProductManager()
 
     translations = TranslatedFields(
         name=models.CharField(
@@ -34,6 +39,17 @@ class Product(TimeStampedModel, TranslatableModel):
             null=True,
             help_text=_("Detailed product description")
         ),
+        search_vector=SearchVectorField(
+            null=True,
+            editable=False,
+            help_text=_("Weighted full-text document built from name, tags and description")
+        ),
+        meta={
+            "indexes": [
+                GinIndex(fields=["search_vector"], name="product_tr_search_gin"),
+                GinIndex(fields=["name"], name="product_tr_name_trgm", opclasses=["gin_trgm_ops"]),
+            ],
+        },
     )
     category = models.ForeignKey(
         "Category",
@@ -59,6 +75,14 @@ class Product(TimeStampedModel, TranslatableModel):
         validators=[MinValueValidator(Decimal('0.01'))],
         help_text=_("Discounted price (minimum 0.01)")
     )
+    effective_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        db_index=True,
+        help_text=_("Price the customer pays: discounted price while on discount, otherwise the regular price")
+    )
     bonus_points = models.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -84,22 +108,72 @@ class Product(TimeStampedModel, TranslatableModel):
         blank=True,
         help_text=_("Product tags for categorization")
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text=_("Sum of stars of all active reviews")
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text=_("Number of active reviews")
+    )
+    rating_average = models.DecimalField(
+        max_digits=3,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        db_index=True,
+        help_text=_("Average stars of active reviews, 0 without reviews")
+    )
+    rating_1 = models.PositiveIntegerField(default=0, editable=False, help_text=_("Number of 1-star reviews"))
+    rating_2 = models.PositiveIntegerField(default=0, editable=False, help_text=_("Number of 2-star reviews"))
+    rating_3 = models.PositiveIntegerField(default=0, editable=False, help_text=_("Number of 3-star reviews"))
+    rating_4 = models.PositiveIntegerField(default=0, editable=False, help_text=_("Number of 4-star reviews"))
+    rating_5 = models.PositiveIntegerField(default=0, editable=False, help_text=_("Number of 5-star reviews"))
 
     class Meta:
         verbose_name = _("product")
         verbose_name_plural = _("products")
+        indexes = [
+            models.Index(fields=["available", "effective_price"], name="product_avail_price_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
     def save(self, *args, **kwargs) -> None:
         if self.price:
-            if self.discount and self.price_with_discount:
-                self.bonus_points = self.price_with_discount * Decimal(0.3)
-            else:
-                self.bonus_points = self.price * Decimal(0.3)
+            self.effective_price = self.get_effective_price()
+            self.bonus_points = self.effective_price * Decimal(0.3)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and PRICE_FIELDS.intersection(update_fields):
+            kwargs["update_fields"] = {*update_fields, "effective_price", "bonus_points"}
         super().save(*args, **kwargs)
 
+    def save_without_ratings(self) -> None:
+        """
+        Save an existing product without its rating aggregates. Review signals
+        maintain them in place, so forms and serializers must not write back
+        the values loaded with this instance.
+        """
+        self.save(update_fields=[
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key and field.name not in RATING_FIELDS
+        ])
+
+    def get_effective_price(self) -> Decimal:
+        """Discounted price while the product is on discount, otherwise the regular price."""
+        if self.discount and self.price_with_discount:
+            return self.price_with_discount
+        return self.price
+
+    @property
+    def rating_histogram(self) -> dict[int, int]:
+        """Number of active reviews per star, 1 to 5."""
+        return {star: getattr(self, field) for star, field in RATING_STAR_FIELDS.items()}
+
     def get_absolute_url(self) -> str:
         return reverse("products:product_detail", args=[self.slug])
 
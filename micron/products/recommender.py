@@ -1,14 +1,66 @@
+import hashlib
 import logging
+import uuid
+from typing import Iterable
 
+from django.core.cache import cache
+from django.utils.translation import get_language
 from django_redis import get_redis_connection
+
+from common.redis import INGESTED_ORDER_TTL
 from products.models.product import Product
 
 logger = logging.getLogger("main")
 
+TOP_K = 20
+SUGGESTION_CACHE_PREFIX = "recommender:suggestions"
+# Co-purchase lists drift slowly, so cached suggestion ids simply expire;
+# products are always loaded fresh and only while available.
+SUGGESTION_CACHE_TIMEOUT = 60 * 15
+# Share of a blended score that comes from content similarity.
+CONTENT_WEIGHT = 0.3
+CANDIDATES_PER_RESULT = 5
+
+# Count every ordered pair of an order's products once per order: the marker
+# key makes a retried payment webhook a no-op. Sorted-set keys are built from
+# ARGV[2], see common.redis.
+RECORD_ORDER_SCRIPT = """
+if redis.call('SET', KEYS[1], 1, 'NX', 'EX', ARGV[1]) == false then
+    return -1
+end
+local pairs = 0
+for i = 3, #ARGV do
+    local key = ARGV[2] .. ARGV[i] .. ':purchased_with'
+    for j = 3, #ARGV do
+        if i ~= j then
+            redis.call('ZINCRBY', key, 1, ARGV[j])
+            pairs = pairs + 1
+        end
+    end
+end
+return pairs
+"""
+
+# Copy the K best co-purchased products of each (sorted set, list) key pair
+# into the list, so single-product suggestions are one LRANGE.
+MATERIALIZE_TOP_SCRIPT = """
+local k = tonumber(ARGV[1])
+for i = 1, #KEYS, 2 do
+    local top = redis.call('ZREVRANGE', KEYS[i], 0, k - 1)
+    redis.call('DEL', KEYS[i + 1])
+    if #top > 0 then
+        redis.call('RPUSH', KEYS[i + 1], unpack(top))
+    end
+end
+return #KEYS / 2
+"""
+
 
 class Recommender:
     """Recommender system for products based on purchase history."""
 
+    KEY_PREFIX = "product:"
+
     def __init__(self):
         """Initialize Redis connection from django-redis pool."""
         try:
@@ -20,7 +72,24 @@ class Recommender:
     @staticmethod
     def get_product_key(product_id: int) -> str:
         """Generate Redis key for a product's purchased_with data."""
-        return f"product:{product_id}:purchased_with"
+        return f"{Recommender.KEY_PREFIX}{product_id}:purchased_with"
+
+    @staticmethod
+    def get_top_key(product_id: int) -> str:
+        return f"{Recommender.KEY_PREFIX}{product_id}:top"
+
+    @staticmethod
+    def get_similar_key(product_id: int | str) -> str:
+        return f"{Recommender.KEY_PREFIX}{product_id}:similar"
+
+    @staticmethod
+    def get_suggestion_cache_key(product_ids: list[int], max_results: int, kind: str = "bought") -> str:
+        ids = hashlib.md5(",".join(map(str, product_ids)).encode()).hexdigest()
+        return f"{SUGGESTION_CACHE_PREFIX}:{kind}:{get_language()}:{max_results}:{ids}"
+
+    @staticmethod
+    def get_order_marker_key(order_id: int) -> str:
+        return f"recommender:order:{order_id}"
 
     def products_bought(self, products: list[Product]) -> None:
         """Record products bought together in Redis sorted sets."""
@@ -28,44 +97,186 @@ class Recommender:
             return
 
         try:
-            product_ids = [p.id for p in products]
+            product_ids = list(dict.fromkeys(p.id for p in products))
+            pipeline = self.r.pipeline(transaction=False)
             for product_id in product_ids:
                 for with_id in product_ids:
                     if product_id != with_id:
-                        self.r.zincrby(self.get_product_key(product_id), 1, with_id)
+                        pipeline.zincrby(self.get_product_key(product_id), 1, with_id)
+            pipeline.execute()
         except Exception as e:
             logger.error(f"Failed to record products bought: {e}")
 
+    def record_order(self, order_id: int, product_ids: list[int]) -> int | None:
+        """
+        Record the products of one paid order in a single round trip.
+        Returns the number of pairs counted, or None when the order was
+        already recorded (or Redis is unavailable).
+        """
+        if not self.r:
+            return None
+
+        product_ids = sorted(set(product_ids))
+        pairs = self.r.register_script(RECORD_ORDER_SCRIPT)(
+            keys=[self.get_order_marker_key(order_id)],
+            args=[INGESTED_ORDER_TTL, self.KEY_PREFIX, *product_ids],
+        )
+        return None if pairs == -1 else pairs
+
+    def materialize_top_products(self, product_ids: list[int], top_k: int = TOP_K) -> None:
+        """Refresh the top-K lists of these products after their co-purchase counts changed."""
+        if not self.r or not product_ids:
+            return
+
+        keys = []
+        for product_id in sorted(set(product_ids)):
+            keys += [self.get_product_key(product_id), self.get_top_key(product_id)]
+        self.r.register_script(MATERIALIZE_TOP_SCRIPT)(keys=keys, args=[top_k])
+
+    def publish_similar_products(
+        self, neighbours: Iterable[tuple[int, dict[int, float]]], batch_size: int = 500
+    ) -> int:
+        """
+        Replace the normalized neighbour lists computed offline. Each batch is
+        swapped in a MULTI block, so readers see either the old or the new list.
+        Lists of products missing from `neighbours` are deleted afterwards, so
+        products that lost all their neighbours fall back to live counts.
+        """
+        if not self.r:
+            return 0
+
+        published = set()
+        pipeline = self.r.pipeline(transaction=True)
+        for product_id, scores in neighbours:
+            key = self.get_similar_key(product_id)
+            pipeline.delete(key)
+            pipeline.zadd(key, scores)
+            published.add(key)
+            if len(published) % batch_size == 0:
+                pipeline.execute()
+        pipeline.execute()
+
+        stale = []
+        for key in self.r.scan_iter(match=self.get_similar_key("*"), count=1000):
+            if key.decode() not in published:
+                stale.append(key)
+            if len(stale) == batch_size:
+                self.r.delete(*stale)
+                stale.clear()
+        if stale:
+            self.r.delete(*stale)
+        return len(published)
+
     def suggest_products_for(self, products: list[Product], max_results: int = 6) -> list[Product]:
-        """Suggest products based on products bought together."""
+        """
+        Suggest products based on products bought together. The ranked ids
+        are cached, so a warm call costs one cache round trip and one query.
+        """
 
         if not self.r:
             return []
 
         try:
-            product_ids = [p.id for p in products]
-
-            if len(products) == 1:
-                suggestions = self.r.zrange(
-                    self.get_product_key(product_ids[0]), 0, -1, desc=True
-                )[:max_results]
-            else:
-                tmp_key = f"tmp_{'_'.join(map(str, product_ids))}"
-                keys = [self.get_product_key(pid) for pid in product_ids]
-                self.r.zunionstore(tmp_key, keys)
-                self.r.zrem(tmp_key, *product_ids)
-                suggestions = self.r.zrange(tmp_key, 0, -1, desc=True)[:max_results]
-                self.r.delete(tmp_key)
-
-            suggested_product_ids = [int(pid) for pid in suggestions]
-            suggested_products = list(Product.objects.filter(id__in=suggested_product_ids))
-            suggested_products.sort(key=lambda x: suggested_product_ids.index(x.id))
-            return suggested_products
+            product_ids = sorted({p.id for p in products})
+            if not product_ids:
+                return []
+
+            cache_key = self.get_suggestion_cache_key(product_ids, max_results)
+            suggested_product_ids = cache.get(cache_key)
+            if suggested_product_ids is None:
+                # A few extra ids so unavailable products do not leave the block short.
+                suggested_product_ids = self.get_suggested_ids(product_ids, max_results * 2)
+                cache.set(cache_key, suggested_product_ids, SUGGESTION_CACHE_TIMEOUT)
+            return self.hydrate(suggested_product_ids, max_results)
 
         except Exception as e:
             logger.error(f"Failed to get suggestions: {e}")
             return []
 
+    def suggest_similar_products(self, product: Product, max_results: int = 6) -> list[Product]:
+        """
+        Suggestions for a product page: co-purchase scores blended with content
+        similarity, so new or rarely bought products still get suggestions.
+        """
+
+        try:
+            cache_key = self.get_suggestion_cache_key([product.id], max_results, "blended")
+            suggested_product_ids = cache.get(cache_key)
+            if suggested_product_ids is None:
+                candidates = max_results * CANDIDATES_PER_RESULT
+                from products.utils.content_similarity import get_content_neighbours
+
+                bought = self.get_co_purchase_scores(product.id, candidates) if self.r else {}
+                content = get_content_neighbours(product.id, candidates)
+                suggested_product_ids = self.blend_scores(bought, content, max_results * 2)
+                cache.set(cache_key, suggested_product_ids, SUGGESTION_CACHE_TIMEOUT)
+            return self.hydrate(suggested_product_ids, max_results)
+
+        except Exception as e:
+            logger.error(f"Failed to get similar products: {e}")
+            return []
+
+    def get_co_purchase_scores(self, product_id: int, limit: int) -> dict[int, float]:
+        """Scored neighbours of one product: offline similarity when published, raw counts otherwise."""
+
+        pipeline = self.r.pipeline(transaction=False)
+        pipeline.zrevrange(self.get_similar_key(product_id), 0, limit - 1, withscores=True)
+        pipeline.zrevrange(self.get_product_key(product_id), 0, limit - 1, withscores=True)
+        similar, ranked = pipeline.execute()
+        return {int(pid): score for pid, score in similar or ranked}
+
+    @staticmethod
+    def blend_scores(bought: dict[int, float], content: dict[int, float], max_results: int) -> list[int]:
+        """
+        Rank by CONTENT_WEIGHT × cosine + the rest × co-purchase score scaled
+        to the best one, so both sides range from 0 to 1.
+        """
+
+        blended = {product_id: CONTENT_WEIGHT * score for product_id, score in content.items()}
+        best = max(bought.values(), default=0) or 1
+        for product_id, score in bought.items():
+            blended[product_id] = blended.get(product_id, 0) + (1 - CONTENT_WEIGHT) * score / best
+        return sorted(blended, key=lambda product_id: (-blended[product_id], product_id))[:max_results]
+
+    def get_suggested_ids(self, product_ids: list[int], max_results: int) -> list[int]:
+        """
+        Best product ids to suggest, ranked and limited inside Redis: the
+        offline similarity lists when published, raw co-purchase counts otherwise.
+        """
+
+        if len(product_ids) == 1:
+            product_id = product_ids[0]
+            pipeline = self.r.pipeline(transaction=False)
+            pipeline.zrevrange(self.get_similar_key(product_id), 0, max_results - 1)
+            pipeline.lrange(self.get_top_key(product_id), 0, max_results - 1)
+            pipeline.zrevrange(self.get_product_key(product_id), 0, max_results - 1)
+            similar, top, ranked = pipeline.execute()
+            suggestions = similar or top or ranked
+        else:
+            # Keys of their own per call: concurrent requests never share or delete them.
+            similar_key, ranked_key = (f"recommender:tmp:{uuid.uuid4().hex}" for _ in range(2))
+            pipeline = self.r.pipeline(transaction=True)
+            pipeline.zunionstore(similar_key, [self.get_similar_key(pid) for pid in product_ids])
+            pipeline.zunionstore(ranked_key, [self.get_product_key(pid) for pid in product_ids])
+            pipeline.zrem(similar_key, *product_ids)
+            pipeline.zrem(ranked_key, *product_ids)
+            pipeline.zrevrange(similar_key, 0, max_results - 1)
+            pipeline.zrevrange(ranked_key, 0, max_results - 1)
+            pipeline.delete(similar_key, ranked_key)
+            similar, ranked = pipeline.execute()[4:6]
+            suggestions = similar or ranked
+
+        return [int(pid) for pid in suggestions]
+
+    @staticmethod
+    def hydrate(product_ids: list[int], limit: int | None = None) -> list[Product]:
+        """The first `limit` available products of `product_ids`, in that order, with their translations."""
+
+        rank = {product_id: position for position, product_id in enumerate(product_ids)}
+        products = list(Product.objects.filter(id__in=product_ids, available=True).prefetch_related("translations"))
+        products.sort(key=lambda product: rank[product.id])
+        return products[:limit]
+
     def clear_purchases(self) -> None:
         """Clear all purchase data from Redis."""
         if not self.r:
@@ -73,8 +284,9 @@ class Recommender:
 
         try:
             keys = [
-                self.get_product_key(pid)
+                key
                 for pid in Product.objects.values_list("id", flat=True)
+                for key in (self.get_product_key(pid), self.get_top_key(pid), self.get_similar_key(pid))
             ]
             if keys:
                 pipeline = self.r.pipeline()
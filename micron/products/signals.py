@@ -0,0 +1,136 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from products.models.category import Category
+from products.models.product import Product
+from products.models.product_image import ProductImage
+from products.models.review import Review
+from products.tasks import update_content_similarity
+from products.utils.card_cache import invalidate_product_cards
+from products.utils.facets import invalidate_catalog_facets
+from products.utils.page_cache import CATALOG_SCOPE, invalidate_page_scopes, invalidate_product_pages
+from products.utils.ratings import apply_rating_change
+from products.utils.search import update_product_search_vectors
+from products.utils.slug_resolver import invalidate_product_slugs
+
+ProductTranslation = Product._parler_meta.root_model
+CategoryTranslation = Category._parler_meta.root_model
+
+
+@receiver(pre_save, sender=ProductTranslation)
+def remember_translation_slug(sender, instance, **kwargs) -> None:
+    instance._previous_slug = None
+    if instance.pk:
+        instance._previous_slug = sender.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+
+
+@receiver(post_save, sender=ProductTranslation)
+def refresh_translation_search_vector(sender, instance, **kwargs) -> None:
+    update_product_search_vectors(instance.master_id)
+    invalidate_product_cards(instance.master_id)
+    previous_slug = getattr(instance, "_previous_slug", None)
+    invalidate_product_pages(instance.master_id, previous_slugs=[previous_slug])
+    invalidate_product_slugs(instance.slug, previous_slug)
+
+
+def queue_content_index_update(product_id: int) -> None:
+    """One index update per product however many rows an admin save touches."""
+    from products.utils.content_similarity import CONTENT_UPDATE_QUEUED_TIMEOUT, get_content_update_key
+
+    # Claimed once the save is committed, so a rolled back save can not hold
+    # the claim without an update behind it.
+    def queue() -> None:
+        if cache.add(get_content_update_key(product_id), True, CONTENT_UPDATE_QUEUED_TIMEOUT):
+            update_content_similarity.delay(product_id)
+
+    transaction.on_commit(queue)
+
+
+@receiver(post_save, sender=ProductTranslation)
+@receiver(post_delete, sender=ProductTranslation)
+def refresh_translation_content_index(sender, instance, **kwargs) -> None:
+    queue_content_index_update(instance.master_id)
+
+
+@receiver(post_delete, sender=ProductTranslation)
+def forget_translation_slug(sender, instance, **kwargs) -> None:
+    invalidate_product_slugs(instance.slug)
+
+
+@receiver(m2m_changed, sender=Product.tags.through)
+def refresh_product_tags(sender, instance, action, **kwargs) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if isinstance(instance, Product):
+        update_product_search_vectors(instance.pk)
+        invalidate_product_cards(instance.pk)
+        invalidate_product_pages(instance.pk)
+        queue_content_index_update(instance.pk)
+    else:
+        for product_id in kwargs.get("pk_set") or ():
+            queue_content_index_update(product_id)
+    invalidate_page_scopes(CATALOG_SCOPE)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=CategoryTranslation)
+def invalidate_catalog(sender, **kwargs) -> None:
+    invalidate_catalog_facets()
+    invalidate_page_scopes(CATALOG_SCOPE)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product(sender, instance, **kwargs) -> None:
+    invalidate_product_cards(instance.pk)
+    invalidate_product_pages(instance.pk)
+    queue_content_index_update(instance.pk)
+    # Hiding or restoring a product changes which product its slugs resolve to.
+    invalidate_product_slugs(*ProductTranslation.objects.filter(master_id=instance.pk).values_list("slug", flat=True))
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_related_product(sender, instance, **kwargs) -> None:
+    invalidate_product_cards(instance.product_id)
+    invalidate_product_pages(instance.product_id)
+
+
+def _review_contribution(product_id, stars, deleted) -> tuple[int | None, int | None]:
+    """(product, stars) a review adds to the rating aggregates, nothing while soft-deleted."""
+    if product_id is None or deleted is not None:
+        return None, None
+    return product_id, stars
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, **kwargs) -> None:
+    previous = None
+    if instance.pk:
+        previous = sender.all_objects.filter(pk=instance.pk).values_list("product_id", "stars", "deleted").first()
+    instance._previous_rating = _review_contribution(*previous) if previous else (None, None)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, **kwargs) -> None:
+    old_product_id, old_stars = getattr(instance, "_previous_rating", (None, None))
+    new_product_id, new_stars = _review_contribution(instance.product_id, instance.stars, instance.deleted)
+
+    if old_product_id == new_product_id:
+        apply_rating_change(new_product_id, added=new_stars, removed=old_stars)
+    else:
+        apply_rating_change(old_product_id, removed=old_stars)
+        apply_rating_change(new_product_id, added=new_stars)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs) -> None:
+    product_id, stars = _review_contribution(instance.product_id, instance.stars, instance.deleted)
+    apply_rating_change(product_id, removed=stars)
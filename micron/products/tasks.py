@@ -0,0 +1,93 @@
+import logging
+import time
+
+from celery import shared_task
+from django.core.cache import cache
+from redis.exceptions import RedisError
+
+from common.metrics import increment
+from orders.models.order_item import OrderItem
+from products.recommender import Recommender
+from products.utils.popularity import record_order_sales, rescale_rankings
+
+logger = logging.getLogger(__name__)
+
+INGESTED_ORDERS_METRIC = "recommender.ingest.orders"
+INGESTED_PAIRS_METRIC = "recommender.ingest.pairs"
+DUPLICATE_ORDERS_METRIC = "recommender.ingest.duplicates"
+INGEST_TIME_METRIC = "recommender.ingest.microseconds"
+POPULARITY_ORDERS_METRIC = "popularity.ingest.orders"
+POPULARITY_DUPLICATES_METRIC = "popularity.ingest.duplicates"
+
+
+@shared_task(autoretry_for=(RedisError,), retry_backoff=True, max_retries=5)
+def record_order_co_purchases(order_id: int) -> int:
+    """Feed the products of a paid order to the recommender, once per order."""
+    started = time.perf_counter()
+    product_ids = list(OrderItem.objects.filter(order_id=order_id).values_list("product_id", flat=True))
+    if len(set(product_ids)) < 2:
+        return 0
+
+    recommender = Recommender()
+    if recommender.r is None:
+        raise RedisError("Recommender has no Redis connection")
+
+    pairs = recommender.record_order(order_id, product_ids)
+    if pairs is None:
+        increment(DUPLICATE_ORDERS_METRIC)
+        return 0
+
+    recommender.materialize_top_products(product_ids)
+    increment(INGESTED_ORDERS_METRIC)
+    increment(INGESTED_PAIRS_METRIC, pairs)
+    increment(INGEST_TIME_METRIC, int((time.perf_counter() - started) * 1_000_000))
+    return pairs
+
+
+@shared_task
+def rebuild_item_similarity() -> int:
+    """Nightly: normalized item-item neighbours from the whole paid order history."""
+    from products.utils.similarity import build_item_similarity
+
+    published = build_item_similarity()
+    logger.info("Published similar products for %d products.", published)
+    return published
+
+
+@shared_task
+def rebuild_content_similarity() -> int:
+    """Nightly: TF-IDF vectors of the whole catalog with a fresh vocabulary."""
+    from products.utils.content_similarity import build_content_index
+
+    indexed = build_content_index()
+    logger.info("Indexed the content of %d products.", indexed)
+    return indexed
+
+
+@shared_task
+def update_content_similarity(product_id: int) -> int:
+    """Re-vectorize one changed product and repair the neighbour lists it affects."""
+    from products.utils.content_similarity import get_content_update_key, update_content_index
+
+    cache.delete(get_content_update_key(product_id))
+    return update_content_index([product_id])
+
+
+@shared_task(autoretry_for=(RedisError,), retry_backoff=True, max_retries=5)
+def record_order_popularity(order_id: int) -> bool:
+    """Add the units of a paid order to the trending and bestseller rankings, once per order."""
+    lines = list(
+        OrderItem.objects.filter(order_id=order_id).values_list("product_id", "product__category_id", "quantity")
+    )
+    if not lines:
+        return False
+
+    recorded = record_order_sales(order_id, lines)
+    increment(POPULARITY_ORDERS_METRIC if recorded else POPULARITY_DUPLICATES_METRIC)
+    return recorded
+
+
+@shared_task
+def rescale_popularity_rankings() -> int:
+    """Hourly: move the decay epoch forward and drop products that stopped selling."""
+    return rescale_rankings()
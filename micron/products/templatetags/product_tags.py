@@ -0,0 +1,21 @@
+from django import template
+
+from products.utils.card_cache import render_product_cards
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def product_cards(context, products):
+    """
+    Renders product cards from the fragment cache.
+
+    Usage: {% product_cards products %}
+    """
+    return render_product_cards(
+        products,
+        favorite_ids=context.get("favorite_ids") or set(),
+        language=context.get("current_language", "en"),
+        rate=context.get("usd_to_uah_rate"),
+        request=context.get("request"),
+    )
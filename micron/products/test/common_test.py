@@ -1,3 +1,4 @@
+import random
 from abc import ABC
 from decimal import Decimal
 
@@ -13,6 +14,11 @@ from products.models.review import Review
 User = get_user_model()
 
 
+def random_id() -> int:
+    """A large id, so Redis keys of a test do not meet those of real products or orders."""
+    return random.randint(10 ** 8, 10 ** 9)
+
+
 class BaseViewTestCase(ABC, TestCase):
     """Base test case for view tests"""
     path_name = None
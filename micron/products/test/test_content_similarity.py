@@ -0,0 +1,45 @@
+import tempfile
+from collections import Counter
+
+import numpy as np
+from django.test import TestCase, override_settings
+
+from products.utils.content_similarity import ContentIndex, rank_neighbours, vectorize
+
+
+class ContentSimilarityTestCase(TestCase):
+    """Tests for the TF-IDF content index"""
+
+    def setUp(self):
+        self.product_ids = np.array([1, 2, 3], dtype=np.int64)
+        documents = [
+            Counter({"gaming": 3, "laptop": 3}),
+            Counter({"office": 3, "laptop": 3}),
+            Counter({"coffee": 3, "mug": 1}),
+        ]
+        self.vocabulary = ["coffee", "gaming", "laptop", "mug", "office"]
+        self.idf = np.ones(len(self.vocabulary), dtype=np.float32)
+        self.vectors = vectorize(documents, {term: column for column, term in enumerate(self.vocabulary)}, self.idf)
+
+    def test_neighbours_share_terms(self):
+        """Test that products are ranked by shared terms and never list themselves"""
+        neighbours, scores = rank_neighbours(self.vectors, self.product_ids, self.vectors, self.product_ids, 2, 1)
+
+        self.assertEqual(neighbours.tolist(), [[2, -1], [1, -1], [-1, -1]])
+        self.assertAlmostEqual(float(scores[0, 0]), 0.5, places=5)
+
+    def test_index_is_memory_mapped_after_save(self):
+        """Test that a saved index loads back as read-only memory maps"""
+        neighbours, scores = rank_neighbours(self.vectors, self.product_ids, self.vectors, self.product_ids, 2)
+        index = ContentIndex(
+            self.product_ids, self.vectors, np.array(self.vocabulary), self.idf, neighbours, scores
+        )
+
+        with tempfile.TemporaryDirectory() as root, override_settings(PRODUCT_CONTENT_INDEX_DIR=root):
+            loaded = ContentIndex.load(index.save(root))
+
+            self.assertIsInstance(loaded.neighbours, np.memmap)
+            self.assertEqual(loaded.find(2), 1)
+            self.assertIsNone(loaded.find(4))
+            self.assertEqual((loaded.vectors @ loaded.vectors.T).toarray().round(5).tolist(),
+                             (self.vectors @ self.vectors.T).toarray().round(5).tolist())
@@ -1,8 +1,10 @@
 from decimal import Decimal
+from io import StringIO
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.urls import reverse
 
 from products.models.category import Category
@@ -112,6 +114,40 @@ class ProductModelTestCase(BaseProductTestCase):
         # Use quantize to handle floating point precision
         self.assertEqual(product.bonus_points.quantize(Decimal('0.01')), Decimal('24.00'))
 
+    def test_product_effective_price_on_save(self):
+        """Test effective price follows the discount flag"""
+        self.assertEqual(self.product.effective_price, Decimal('99.99'))
+
+        self.product.price_with_discount = Decimal('79.99')
+        self.product.discount = True
+        self.product.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, Decimal('79.99'))
+
+        self.product.discount = False
+        self.product.save(update_fields=['discount'])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, Decimal('99.99'))
+
+    def test_product_effective_price_on_queryset_update(self):
+        """Test bulk price updates keep effective price in sync"""
+        Product.objects.filter(pk=self.product.pk).update(
+            price_with_discount=Decimal('49.99'), discount=True
+        )
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, Decimal('49.99'))
+
+        Product.objects.filter(discount=True).update(discount=False)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, Decimal('99.99'))
+
+    def test_product_effective_price_on_bulk_update(self):
+        """Test bulk_update recomputes effective price"""
+        self.product.price = Decimal('120.00')
+        Product.objects.bulk_update([self.product], ['price'])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, Decimal('120.00'))
+
     def test_product_price_validation(self):
         """Test product price minimum validation"""
         with self.assertRaises(ValidationError):
@@ -321,3 +357,49 @@ class ReviewModelTestCase(BaseReviewTestCase):
         """Test that review has created_at and updated_at timestamps"""
         self.assertIsNotNone(self.review.created_at)
         self.assertIsNotNone(self.review.updated_at)
+
+    def test_review_updates_product_rating(self):
+        """Test that reviews keep the product rating aggregates in sync"""
+        Review.objects.create(user=self.user, product=self.product, stars=3, text='Average')
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_count, 2)
+        self.assertEqual(self.product.rating_sum, 8)
+        self.assertEqual(self.product.rating_average, Decimal('4.00'))
+        self.assertEqual(self.product.rating_histogram, {1: 0, 2: 0, 3: 1, 4: 0, 5: 1})
+
+    def test_review_stars_change_updates_product_rating(self):
+        """Test that changing stars moves the review between histogram buckets"""
+        self.review.stars = 2
+        self.review.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_count, 1)
+        self.assertEqual(self.product.rating_average, Decimal('2.00'))
+        self.assertEqual(self.product.rating_5, 0)
+        self.assertEqual(self.product.rating_2, 1)
+
+    def test_review_soft_delete_updates_product_rating(self):
+        """Test that soft deleted reviews leave the rating aggregates"""
+        self.review.delete()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_count, 0)
+        self.assertEqual(self.product.rating_average, Decimal('0'))
+
+    def test_product_save_without_ratings_keeps_rating(self):
+        """Test that saving a stale product instance without ratings does not overwrite its rating"""
+        stale_product = Product.objects.get(pk=self.product.pk)
+        Review.objects.create(user=self.user, product=self.product, stars=1, text='Broken')
+        stale_product.quantity = 3
+        stale_product.save_without_ratings()
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_count, 2)
+
+    def test_rebuild_product_ratings_command(self):
+        """Test that the rebuild command recomputes drifted aggregates"""
+        Product.objects.filter(pk=self.product.pk).update(rating_sum=0, rating_count=0, rating_5=0)
+        call_command('rebuild_product_ratings', stdout=StringIO())
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_count, 1)
+        self.assertEqual(self.product.rating_5, 1)
+        self.assertEqual(self.product.rating_average, Decimal('5.00'))
@@ -0,0 +1,58 @@
+import time
+
+from django.test import TestCase
+from django_redis import get_redis_connection
+
+from products.test.common_test import random_id
+from products.utils.popularity import (
+    BESTSELLERS, RANKING_HALF_LIVES, TRENDING, get_epoch_key, get_order_marker_key, get_popular_scores,
+    get_ranking_key, record_order_sales,
+)
+
+
+class PopularityTestCase(TestCase):
+    """Tests for the decayed popularity rankings"""
+
+    def setUp(self):
+        self.r = get_redis_connection("default")
+        base = random_id()
+        self.product_ids = [base, base + 1]
+        self.order_ids = [base, base + 1]
+        self.category_id = base
+        # Epochs set by the first recorded sale; ones that were already there are kept.
+        self.new_epoch_keys = [
+            get_epoch_key(ranking) for ranking in RANKING_HALF_LIVES if not self.r.exists(get_epoch_key(ranking))
+        ]
+
+    def tearDown(self):
+        for ranking in RANKING_HALF_LIVES:
+            self.r.zrem(get_ranking_key(ranking), *self.product_ids)
+            self.r.delete(get_ranking_key(ranking, self.category_id))
+        self.r.delete(
+            *(get_order_marker_key(order_id) for order_id in self.order_ids),
+            *self.new_epoch_keys,
+        )
+
+    def test_order_is_recorded_once(self):
+        """Test that a paid order counts once, globally and in its category"""
+        first, _ = self.product_ids
+        lines = [(first, self.category_id, 2)]
+
+        self.assertTrue(record_order_sales(self.order_ids[0], lines))
+        self.assertFalse(record_order_sales(self.order_ids[0], lines))
+
+        [(product_id, score)] = get_popular_scores(TRENDING, 5, self.category_id)
+        self.assertEqual(product_id, first)
+        self.assertEqual(self.r.zscore(get_ranking_key(TRENDING), first), score)
+
+    def test_recent_sales_weigh_more(self):
+        """Test that a sale one half-life later weighs twice as much"""
+        first, second = self.product_ids
+        now = time.time()
+        record_order_sales(self.order_ids[0], [(first, self.category_id, 1)], now)
+        record_order_sales(self.order_ids[1], [(second, self.category_id, 1)], now + RANKING_HALF_LIVES[TRENDING])
+
+        trending = dict(get_popular_scores(TRENDING, 5, self.category_id))
+        bestsellers = dict(get_popular_scores(BESTSELLERS, 5, self.category_id))
+        self.assertAlmostEqual(trending[second] / trending[first], 2)
+        self.assertAlmostEqual(bestsellers[second] / bestsellers[first], 2 ** (1 / 30))
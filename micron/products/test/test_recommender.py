@@ -0,0 +1,103 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from products.models.category import Category
+from products.models.product import Product
+from products.recommender import Recommender
+from products.test.common_test import random_id
+
+
+class RecommenderTestCase(TestCase):
+    """Tests for co-purchase ingestion"""
+
+    def setUp(self):
+        self.recommender = Recommender()
+        base = random_id()
+        self.product_ids = [base, base + 1, base + 2]
+        self.order_id = base
+
+    def tearDown(self):
+        self.recommender.r.delete(
+            self.recommender.get_order_marker_key(self.order_id),
+            *(self.recommender.get_product_key(product_id) for product_id in self.product_ids),
+            *(self.recommender.get_top_key(product_id) for product_id in self.product_ids),
+            *(self.recommender.get_similar_key(product_id) for product_id in self.product_ids),
+        )
+
+    def test_record_order_counts_each_pair_once(self):
+        """Test that an order is counted once even when recorded twice"""
+        first, second, third = self.product_ids
+
+        self.assertEqual(self.recommender.record_order(self.order_id, [first, second, third, first]), 6)
+        self.assertIsNone(self.recommender.record_order(self.order_id, [first, second, third]))
+
+        key = self.recommender.get_product_key(first)
+        self.assertEqual(self.recommender.r.zscore(key, second), 1)
+        self.assertEqual(self.recommender.r.zscore(key, third), 1)
+        self.assertIsNone(self.recommender.r.zscore(key, first))
+
+    def test_multi_product_suggestions_are_ranked_in_redis(self):
+        """Test that suggestions for several products exclude them and leave no temp keys"""
+        first, second, third = self.product_ids
+        self.recommender.record_order(self.order_id, [first, second, third])
+        self.recommender.r.zincrby(self.recommender.get_product_key(second), 5, third)
+        self.recommender.r.zincrby(self.recommender.get_product_key(first), 2, third)
+
+        self.assertEqual(self.recommender.get_suggested_ids([first, second], 5), [third])
+        self.assertEqual(self.recommender.get_suggested_ids([first], 1), [third])
+        self.assertFalse(self.recommender.r.keys('recommender:tmp:*'))
+
+    def test_top_products_are_materialized(self):
+        """Test that top-K lists are refreshed from the co-purchase counts"""
+        first, second, third = self.product_ids
+        self.recommender.record_order(self.order_id, [first, second, third])
+        self.recommender.r.zincrby(self.recommender.get_product_key(first), 3, third)
+        self.recommender.materialize_top_products([first], top_k=1)
+
+        top = self.recommender.r.lrange(self.recommender.get_top_key(first), 0, -1)
+        self.assertEqual([int(pid) for pid in top], [third])
+
+    def test_publish_similar_products_replaces_lists(self):
+        """Test that published lists replace the old ones and lists left out are deleted"""
+        first, second, third = self.product_ids
+        self.recommender.r.zadd(self.recommender.get_similar_key(first), {third: 0.9})
+        self.recommender.r.zadd(self.recommender.get_similar_key(third), {first: 0.9})
+
+        published = self.recommender.publish_similar_products(
+            [(first, {second: 0.5}), (second, {first: 0.5})], batch_size=1
+        )
+
+        self.assertEqual(published, 2)
+        similar = self.recommender.r.zrange(self.recommender.get_similar_key(first), 0, -1, withscores=True)
+        self.assertEqual([(int(pid), score) for pid, score in similar], [(second, 0.5)])
+        self.assertFalse(self.recommender.r.exists(self.recommender.get_similar_key(third)))
+
+    def test_blend_scores_falls_back_to_content(self):
+        """Test that co-purchase and content scores are blended and content alone still ranks"""
+        first, second, third = self.product_ids
+
+        self.assertEqual(Recommender.blend_scores({first: 10, second: 1}, {third: 0.9, second: 0.1}, 3),
+                         [first, third, second])
+        self.assertEqual(Recommender.blend_scores({}, {third: 0.4, second: 0.6}, 1), [second])
+
+    def test_cached_suggestions_are_hydrated_fresh(self):
+        """Test that only suggestion ids are cached and unavailable products are left out"""
+        category = Category.objects.create(name='Phones', slug='phones')
+        kept, hidden = (
+            Product.objects.create(
+                name=f'Phone {i}', slug=f'phone-{i}', description='Phone', category=category,
+                image=SimpleUploadedFile('phone.jpg', b'', 'image/jpeg'), price=Decimal('10.00'), quantity=1,
+            )
+            for i in range(2)
+        )
+        cache_key = self.recommender.get_suggestion_cache_key([self.product_ids[0]], 2, 'blended')
+        cache.set(cache_key, [hidden.id, kept.id])
+        Product.objects.filter(pk=hidden.pk).update(available=False)
+
+        try:
+            self.assertEqual(self.recommender.suggest_similar_products(Product(id=self.product_ids[0]), 2), [kept])
+        finally:
+            cache.delete(cache_key)
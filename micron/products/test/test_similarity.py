@@ -0,0 +1,66 @@
+import numpy as np
+from django.test import TestCase
+
+from products.utils.similarity import build_order_product_matrix, iter_item_neighbours
+
+# Product 10 is in 3 orders, 20 and 30 in 2 each; 10 shares 2 orders with 20 and
+# with 30, while 20 and 30 share 1. Product 40 was never bought with another.
+COSINE_STRONG = round(2 / np.sqrt(3 * 2), 5)
+COSINE_WEAK = round(1 / np.sqrt(2 * 2), 5)
+JACCARD_STRONG = round(2 / (3 + 2 - 2), 5)
+JACCARD_WEAK = round(1 / (2 + 2 - 1), 5)
+
+
+class ItemSimilarityTestCase(TestCase):
+    """Tests for the item-item similarity of the order history"""
+
+    def setUp(self):
+        # Products 10, 20, 30 and 40 become columns 0 to 3; order 1 lists product 20 twice.
+        order_ids = np.array([1, 1, 1, 2, 2, 2, 3, 3, 4], dtype=np.int64)
+        product_ids = np.array([10, 20, 20, 10, 20, 30, 10, 30, 40], dtype=np.int64)
+        self.data = build_order_product_matrix(order_ids, product_ids)
+
+    def neighbours(self, **kwargs) -> dict[int, dict[int, float]]:
+        """Neighbour columns of every column with scores rounded to 5 places, best first."""
+        return {
+            column: dict(zip(columns.tolist(), scores.astype(float).round(5).tolist()))
+            for column, columns, scores in iter_item_neighbours(self.data.matrix, chunk_size=1, **kwargs)
+        }
+
+    def test_duplicate_lines_count_once(self):
+        """Test that a product listed twice in one order is a single entry of the matrix"""
+        self.assertEqual(self.data.product_ids.tolist(), [10, 20, 30, 40])
+        self.assertEqual(
+            self.data.matrix.toarray().tolist(),
+            [[1, 1, 0, 0], [1, 1, 1, 0], [1, 0, 1, 0], [0, 0, 0, 1]],
+        )
+
+    def test_cosine_scores(self):
+        """Test cosine scores, without the product itself or products never bought with others"""
+        self.assertEqual(self.neighbours(), {
+            0: {1: COSINE_STRONG, 2: COSINE_STRONG},
+            1: {0: COSINE_STRONG, 2: COSINE_WEAK},
+            2: {0: COSINE_STRONG, 1: COSINE_WEAK},
+        })
+
+    def test_jaccard_scores(self):
+        """Test that Jaccard divides the shared orders by the orders of either product"""
+        self.assertEqual(self.neighbours(metric="jaccard"), {
+            0: {1: JACCARD_STRONG, 2: JACCARD_STRONG},
+            1: {0: JACCARD_STRONG, 2: JACCARD_WEAK},
+            2: {0: JACCARD_STRONG, 1: JACCARD_WEAK},
+        })
+
+    def test_min_support_drops_rare_pairs(self):
+        """Test that pairs bought together fewer than min_support times are left out"""
+        self.assertEqual(self.neighbours(min_support=2), {
+            0: {1: COSINE_STRONG, 2: COSINE_STRONG},
+            1: {0: COSINE_STRONG},
+            2: {0: COSINE_STRONG},
+        })
+
+    def test_top_k_keeps_the_best_first(self):
+        """Test that neighbours are ranked best first and cut at top_k"""
+        self.assertEqual(list(self.neighbours(top_k=2)[1]), [0, 2])
+        self.assertEqual(list(self.neighbours(top_k=1)[1]), [0])
+        self.assertEqual(list(self.neighbours(top_k=1)[2]), [0])
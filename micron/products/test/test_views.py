@@ -1,14 +1,24 @@
 from decimal import Decimal
 from http import HTTPStatus
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.db.backends.utils import CursorWrapper
 from django.test import TestCase
 from django.urls import reverse
 
+from common import metrics
+from common.pagination import estimate_count, paginate_keyset
 from products.models.category import Category
 from products.models.product import Product
 from products.models.review import Review
+from products.utils.card_cache import CSRF_MARKER, HIT_METRIC, MISS_METRIC
+from products.utils.page_cache import CATALOG_SCOPE, invalidate_page_scopes
+from products.utils.pagination import SEARCH_PRODUCT_ORDERING
+from products.utils.search import search_queryset
 from products.test.common_test import (
     BaseCategoryTestCase,
     BaseProductTestCase,
@@ -46,6 +56,7 @@ class ProductListViewTestCase(BaseViewTestCase):
             price=Decimal('99.99'),
             available=True
         )
+        cache.clear()
 
     def test_product_list_contains_products(self):
         """Test that product list contains created products"""
@@ -70,6 +81,111 @@ class ProductListViewTestCase(BaseViewTestCase):
         # Note: The view currently shows all products, not just available ones
         self.assertContains(response, 'Unavailable Product')
 
+    def test_product_list_cursor_pagination(self):
+        """Test that the listing pages by cursor in the selected order"""
+        for index in range(5):
+            Product.objects.create(
+                name=f'Paged Product {index}',
+                slug=f'paged-product-{index}',
+                description='Test',
+                category=self.category,
+                image=self.test_image,
+                price=Decimal('10.00') + index,
+                available=True
+            )
+
+        response = self.client.get(self.path, {'order': 'price'})
+        page = response.context['products']
+        self.assertEqual(len(page), 5)
+        self.assertEqual(page.object_list[0].name, 'Paged Product 0')
+        self.assertFalse(page.has_previous)
+
+        response = self.client.get(self.path, {'order': 'price', 'cursor': page.next_cursor})
+        page = response.context['products']
+        self.assertEqual([product.name for product in page], ['Test Product'])
+        self.assertFalse(page.has_next)
+        self.assertTrue(page.has_previous)
+
+    def test_product_list_popular_pages_by_offset(self):
+        """Test that the popular order pages the ranking, then the rest by id, without repeats"""
+        paged_ids = [
+            Product.objects.create(
+                name=f'Ranked Product {index}',
+                slug=f'ranked-product-{index}',
+                description='Test',
+                category=self.category,
+                image=self.test_image,
+                price=Decimal('10.00'),
+                available=True
+            ).id
+            for index in range(5)
+        ]
+        ranked = [paged_ids[3], self.product.id]
+
+        paged = []
+        with mock.patch('products.utils.popularity.get_popular_ids', return_value=ranked):
+            response = self.client.get(self.path, {'order': 'popular'})
+            page = response.context['products']
+            paged += [product.id for product in page]
+            self.assertFalse(page.has_previous)
+
+            response = self.client.get(self.path, {'order': 'popular', 'cursor': page.next_cursor})
+            page = response.context['products']
+            paged += [product.id for product in page]
+            self.assertFalse(page.has_next)
+            self.assertTrue(page.has_previous)
+
+        self.assertEqual(paged, ranked + sorted(set(paged_ids) - set(ranked), reverse=True))
+
+    def test_estimate_count_falls_back_inside_transaction(self):
+        """Test that a failed EXPLAIN leaves the transaction usable for the COUNT fallback"""
+        execute = CursorWrapper.execute
+
+        def failing_explain(cursor, sql, params=None):
+            if sql.startswith("EXPLAIN"):
+                sql, params = "EXPLAIN SELECT * FROM missing_table", None
+            return execute(cursor, sql, params)
+
+        with transaction.atomic(), mock.patch.object(CursorWrapper, "execute", failing_explain):
+            self.assertEqual(estimate_count(Product.objects.all()), 1)
+
+    def test_product_cards_served_from_cache(self):
+        """Test that repeated listings reuse card fragments until the product changes"""
+        self.client.get(self.path)
+        self.assertEqual(metrics.get_counters(MISS_METRIC, HIT_METRIC), {MISS_METRIC: 1, HIT_METRIC: 0})
+
+        # A new catalog page version renders the listing again, from the cached cards.
+        invalidate_page_scopes(CATALOG_SCOPE)
+        response = self.client.get(self.path)
+        self.assertEqual(metrics.get_counters(HIT_METRIC)[HIT_METRIC], 1)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertNotContains(response, CSRF_MARKER)
+
+        self.product.price = Decimal('59.99')
+        self.product.save()
+        response = self.client.get(self.path)
+        self.assertEqual(metrics.get_counters(MISS_METRIC)[MISS_METRIC], 2)
+        self.assertContains(response, '$59.99')
+
+    def test_product_list_facet_counts(self):
+        """Test that category and discount options carry product counts"""
+        response = self.client.get(self.path)
+        facets = response.context['facets']
+        self.assertEqual(facets['categories'][0]['count'], 1)
+        self.assertEqual(facets['discount'], {'true': 0, 'false': 1})
+        self.assertContains(response, 'Electronics (1)')
+
+    def test_product_save_invalidates_facets(self):
+        """Test that saving a product refreshes cached facets"""
+        self.client.get(self.path)
+        self.product.discount = True
+        self.product.price_with_discount = Decimal('79.99')
+        self.product.save()
+
+        response = self.client.get(self.path)
+        self.assertEqual(response.context['facets']['discount'], {'true': 1, 'false': 0})
+        self.assertEqual(response.context['min_price'], 79.99)
+
 
 class ProductDetailViewTestCase(BaseProductTestCase):
     """Tests for product detail view"""
@@ -103,6 +219,85 @@ class ProductDetailViewTestCase(BaseProductTestCase):
 
         self.assertContains(response, 'Excellent!')
 
+    def test_product_detail_follows_slug_change(self):
+        """Test that the cached slug mapping is dropped when a translation slug changes"""
+        old_path = reverse('products:product_detail', args=[self.product.slug])
+        self.assertEqual(self.client.get(old_path).status_code, HTTPStatus.OK)
+
+        self.product.slug = 'renamed-product'
+        self.product.save()
+
+        self.assertEqual(self.client.get(old_path).status_code, HTTPStatus.NOT_FOUND)
+        new_path = reverse('products:product_detail', args=['renamed-product'])
+        self.assertEqual(self.client.get(new_path).status_code, HTTPStatus.OK)
+
+    def test_product_detail_ignores_hidden_slug_duplicates(self):
+        """Test that an unavailable or deleted product with the same slug does not hide the live one"""
+        for index in range(2):
+            Product.objects.create(
+                name=f'Hidden Product {index}',
+                slug=self.product.slug,
+                description='Test',
+                category=self.category,
+                image=self.test_image,
+                price=Decimal('10.00'),
+                available=bool(index)
+            )
+        Product.objects.filter(available=True).exclude(pk=self.product.pk).get().delete()
+
+        response = self.client.get(reverse('products:product_detail', args=[self.product.slug]))
+        self.assertEqual(response.context['product'], self.product)
+
+    def test_product_detail_page_purged_on_translation_slug_change(self):
+        """Test that a translation renamed on its own purges the page cached under the old slug"""
+        old_path = reverse('products:product_detail', args=[self.product.slug])
+        self.assertEqual(self.client.get(old_path).status_code, HTTPStatus.OK)
+
+        translation = self.product.translations.get()
+        translation.slug = 'renamed-product'
+        translation.save()
+
+        self.assertEqual(self.client.get(old_path).status_code, HTTPStatus.NOT_FOUND)
+
+    def test_product_detail_review_aggregates(self):
+        """Test that average stars and review count come with the product"""
+        Review.objects.create(user=self.user, product=self.product, stars=5, text='Great')
+        Review.objects.create(user=self.user, product=self.product, stars=3, text='Fine')
+
+        response = self.client.get(reverse('products:product_detail', args=[self.product.slug]))
+        self.assertEqual(response.context['product'].rating_count, 2)
+        self.assertEqual(response.context['average_stars'], 4)
+
+    def test_product_detail_page_cache_etag(self):
+        """Test that anonymous detail pages are revalidated with ETag"""
+        path = reverse('products:product_detail', args=[self.product.slug])
+        response = self.client.get(path)
+        etag = response['ETag']
+
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_product_detail_page_cache_purged_on_review(self):
+        """Test that a new review purges the cached detail page"""
+        path = reverse('products:product_detail', args=[self.product.slug])
+        self.client.get(path)
+        Review.objects.create(user=self.user, product=self.product, stars=4, text='Solid choice')
+
+        response = self.client.get(path)
+        self.assertContains(response, 'Solid choice')
+
+    def test_product_detail_page_cache_bypassed_with_cart(self):
+        """Test that visitors with a cart always get a freshly rendered page"""
+        self.client.post(
+            reverse('cart:cart_add', args=[self.product.id]),
+            {'quantity': 1},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        path = reverse('products:product_detail', args=[self.product.slug])
+
+        response = self.client.get(path)
+        self.assertFalse(response.has_header('ETag'))
+
 
 class CategoryListViewTestCase(BaseCategoryTestCase):
     """Tests for category list view"""
@@ -216,6 +411,127 @@ class SearchViewTestCase(TestCase):
         response = self.client.get(reverse('products:products'), {'search_query': 'NonExistent'})
         self.assertEqual(response.status_code, HTTPStatus.OK)
 
+    def test_search_by_prefix(self):
+        """Test that an incomplete last word still matches"""
+        response = self.client.get(reverse('products:products'), {'search_query': 'Lapt'})
+
+        self.assertContains(response, 'Laptop Computer')
+        self.assertNotContains(response, 'Smartphone')
+
+    def test_search_by_description_and_tags(self):
+        """Test that description text and tags are part of the search document"""
+        self.product2.tags.add('android')
+
+        response = self.client.get(reverse('products:products'), {'search_query': 'powerful'})
+        self.assertContains(response, 'Laptop Computer')
+
+        response = self.client.get(reverse('products:products'), {'search_query': 'android'})
+        self.assertContains(response, 'Smartphone')
+        self.assertNotContains(response, 'Laptop Computer')
+
+    def test_search_uses_stemming(self):
+        """Test that english stemming matches plural forms"""
+        response = self.client.get(reverse('products:products'), {'search_query': 'laptops'})
+        self.assertContains(response, 'Laptop Computer')
+
+    def test_search_ranks_name_matches_first(self):
+        """Test that a name match outranks a description match"""
+        Product.objects.create(
+            name='Laptop Bag',
+            slug='laptop-bag',
+            description='Fits any smartphone',
+            category=self.category,
+            image=self.test_image,
+            price=Decimal('29.99'),
+            available=True
+        )
+
+        response = self.client.get(reverse('products:products'), {'search_query': 'smartphone'})
+        products = list(response.context['products'])
+        self.assertEqual(products[0], self.product2)
+
+    def test_search_cursor_pages_through_ranked_results(self):
+        """Test that ranked results page by cursor without repeating or skipping rows"""
+        for index in range(3):
+            Product.objects.create(
+                name=f'Laptop Stand {index}',
+                slug=f'laptop-stand-{index}',
+                description='Lifts any laptop ' * (index + 1),
+                category=self.category,
+                image=self.test_image,
+                price=Decimal('19.99'),
+                available=True
+            )
+        products = search_queryset(Product.objects.all(), 'laptop', 'en')
+
+        paged, cursor = [], None
+        while True:
+            page = paginate_keyset(products, SEARCH_PRODUCT_ORDERING, cursor, 1)
+            paged += page.object_list
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(paged, list(products))
+
+
+class AutocompleteViewTestCase(BaseProductTestCase):
+    """Tests for the search autocomplete endpoint"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.path = reverse('products:autocomplete')
+
+    def test_autocomplete_tolerates_typos(self):
+        """Test that a misspelled prefix still suggests the product"""
+        response = self.client.get(self.path, {'q': 'Test Prodct'})
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        names = [suggestion['name'] for suggestion in response.json()['results']]
+        self.assertIn('Test Product', names)
+
+    def test_autocomplete_includes_categories(self):
+        """Test that categories are suggested alongside products"""
+        response = self.client.get(self.path, {'q': 'electro'})
+
+        suggestions = response.json()['results']
+        self.assertIn(
+            {'type': 'category', 'name': 'Electronics'},
+            [{'type': s['type'], 'name': s['name']} for s in suggestions]
+        )
+
+    def test_autocomplete_excludes_unavailable_and_deleted(self):
+        """Test that unavailable and soft-deleted products are not suggested"""
+        Product.objects.create(
+            name='Test Gadget',
+            slug='test-gadget',
+            category=self.category,
+            image=self.test_image,
+            price=Decimal('10.00'),
+            available=False
+        )
+        deleted = Product.objects.create(
+            name='Test Widget',
+            slug='test-widget',
+            category=self.category,
+            image=self.test_image,
+            price=Decimal('10.00'),
+            available=True
+        )
+        deleted.delete()
+
+        response = self.client.get(self.path, {'q': 'test'})
+
+        names = [suggestion['name'] for suggestion in response.json()['results']]
+        self.assertIn('Test Product', names)
+        self.assertNotIn('Test Gadget', names)
+        self.assertNotIn('Test Widget', names)
+
+    def test_autocomplete_short_term(self):
+        """Test that one-character prefixes return nothing"""
+        response = self.client.get(self.path, {'q': 't'})
+        self.assertEqual(response.json()['results'], [])
+
 
 class ProductReviewViewTestCase(BaseProductTestCase):
     """Tests for product review creation"""
@@ -2,6 +2,7 @@ from django.urls import path
 from products.views import (
     add_review,
     add_to_favorite,
+    autocomplete,
     delete_from_favorites,
     delete_review,
     favorite_products,
@@ -21,6 +22,8 @@ urlpatterns = [
 
     # Products page
     path("products/", products, name="products"),
+    # Search autocomplete
+    path("products/autocomplete/", autocomplete, name="autocomplete"),
     # Detail product page
     path("product-detail/<slug:product_slug>/", product_detail, name="product_detail"),
 
@@ -0,0 +1,92 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.cache import cache
+from django.urls import reverse
+
+from products.models.category import Category
+from products.models.product import Product
+
+AUTOCOMPLETE_CACHE_PREFIX = "autocomplete"
+AUTOCOMPLETE_CACHE_TIMEOUT = 60 * 5
+AUTOCOMPLETE_MIN_LENGTH = 2
+AUTOCOMPLETE_MAX_LENGTH = 64
+AUTOCOMPLETE_DEFAULT_LIMIT = 8
+AUTOCOMPLETE_MAX_LIMIT = 20
+
+
+def normalize_term(term: str) -> str:
+    """Collapse whitespace and case so equivalent prefixes share a cache entry."""
+
+    return " ".join((term or "").split()).lower()[:AUTOCOMPLETE_MAX_LENGTH]
+
+
+def _product_suggestions(term: str, language_code: str, limit: int) -> list[dict]:
+    translation_model = Product._parler_meta.root_model
+    rows = (
+        translation_model.objects
+        .filter(
+            language_code=language_code,
+            master__deleted__isnull=True,
+            master__available=True,
+            name__trigram_word_similar=term,
+        )
+        .annotate(similarity=TrigramWordSimilarity(term, "name"))
+        .order_by("-similarity", "name")
+        .values_list("name", "slug", "similarity")[:limit]
+    )
+    return [
+        {
+            "type": "product",
+            "name": name,
+            "url": reverse("products:product_detail", args=[slug]),
+            "score": round(similarity, 3),
+        }
+        for name, slug, similarity in rows
+    ]
+
+
+def _category_suggestions(term: str, language_code: str, limit: int) -> list[dict]:
+    translation_model = Category._parler_meta.root_model
+    rows = (
+        translation_model.objects
+        .filter(
+            language_code=language_code,
+            master__deleted__isnull=True,
+            name__trigram_word_similar=term,
+        )
+        .annotate(similarity=TrigramWordSimilarity(term, "name"))
+        .order_by("-similarity", "name")
+        .values_list("name", "slug", "similarity")[:limit]
+    )
+    return [
+        {
+            "type": "category",
+            "name": name,
+            "url": reverse("products:products") + f"?category={slug}",
+            "score": round(similarity, 3),
+        }
+        for name, slug, similarity in rows
+    ]
+
+
+def get_suggestions(term: str, language_code: str, limit: int = AUTOCOMPLETE_DEFAULT_LIMIT) -> list[dict]:
+    """
+    Return typo-tolerant suggestions for a search prefix.
+    Products and categories are matched by trigram word similarity on their
+    translated name; hot prefixes are served from the cache.
+    """
+    term = normalize_term(term)
+    if len(term) < AUTOCOMPLETE_MIN_LENGTH:
+        return []
+    limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+
+    cache_key = f"{AUTOCOMPLETE_CACHE_PREFIX}:{language_code}:{limit}:{term}"
+    suggestions = cache.get(cache_key)
+    if suggestions is not None:
+        return suggestions
+
+    suggestions = _product_suggestions(term, language_code, limit) + _category_suggestions(term, language_code, limit)
+    suggestions.sort(key=lambda suggestion: suggestion["score"], reverse=True)
+    suggestions = suggestions[:limit]
+
+    cache.set(cache_key, suggestions, AUTOCOMPLETE_CACHE_TIMEOUT)
+    return suggestions
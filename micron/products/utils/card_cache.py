@@ -0,0 +1,111 @@
+import time
+
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from common import metrics
+
+CARD_CACHE_PREFIX = "product_card"
+CARD_VERSION_PREFIX = "product_card_version"
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+CARD_TEMPLATE = "products/product_card.html"
+
+CARD_FIELDS = frozenset({"price", "price_with_discount", "discount", "image", "slug"})
+
+# Cached fragments must not carry a per-session CSRF token, so the favorite
+# form holds this marker and the token input is spliced in on every render.
+CSRF_MARKER = "<!--csrf-token-->"
+
+HIT_METRIC = "product_card_cache.hit"
+MISS_METRIC = "product_card_cache.miss"
+
+
+def _version_key(product_id: int) -> str:
+    return f"{CARD_VERSION_PREFIX}:{product_id}"
+
+
+def get_card_versions(product_ids) -> dict[int, int]:
+    """Current fragment version of every product, starting a version for the ones without one."""
+
+    keys = {product_id: _version_key(product_id) for product_id in product_ids}
+    stored = cache.get_many(keys.values())
+
+    versions, missing = {}, {}
+    for product_id, key in keys.items():
+        if key in stored:
+            versions[product_id] = stored[key]
+        else:
+            versions[product_id] = missing[key] = time.time_ns()
+    if missing:
+        cache.set_many(missing, None)
+    return versions
+
+
+def invalidate_product_cards(*product_ids: int) -> None:
+    """Start a new fragment version so every cached card of these products is bypassed."""
+
+    version = time.time_ns()
+    cache.set_many({_version_key(product_id): version for product_id in product_ids}, None)
+
+
+def get_rate_bucket(language: str, rate) -> str:
+    """Only Ukrainian cards depend on the exchange rate."""
+
+    if language != "uk" or not rate:
+        return "usd"
+    return f"{float(rate):.4f}"
+
+
+def card_cache_key(product_id: int, version: int, language: str, rate_bucket: str, is_favorite: bool) -> str:
+    return f"{CARD_CACHE_PREFIX}:{product_id}:{version}:{language}:{rate_bucket}:{int(is_favorite)}"
+
+
+def render_product_cards(products, favorite_ids, language: str, rate, request=None) -> str:
+    """
+    Assemble product cards from cached fragments, rendering and storing only
+    the missing ones. Fragments are keyed by product version, language,
+    exchange rate bucket and favorite state.
+    """
+    products = list(products)
+    if not products:
+        return ""
+
+    rate_bucket = get_rate_bucket(language, rate)
+    versions = get_card_versions([product.pk for product in products])
+    keys = {
+        product.pk: card_cache_key(
+            product.pk, versions[product.pk], language, rate_bucket, product.pk in favorite_ids
+        )
+        for product in products
+    }
+    fragments = cache.get_many(keys.values())
+
+    rendered = {}
+    for product in products:
+        key = keys[product.pk]
+        if key in fragments or key in rendered:
+            continue
+        rendered[key] = render_to_string(CARD_TEMPLATE, {
+            "product": product,
+            "is_favorite": product.pk in favorite_ids,
+            "current_language": language,
+            "usd_to_uah_rate": rate,
+            "csrf_marker": mark_safe(CSRF_MARKER),
+        })
+    if rendered:
+        cache.set_many(rendered, CARD_CACHE_TIMEOUT)
+
+    metrics.increment(HIT_METRIC, len(products) - len(rendered))
+    metrics.increment(MISS_METRIC, len(rendered))
+
+    html = "".join(fragments.get(keys[product.pk]) or rendered[keys[product.pk]] for product in products)
+    if CSRF_MARKER in html:
+        csrf_input = format_html(
+            '<input type="hidden" name="csrfmiddlewaretoken" value="{}">',
+            get_token(request) if request is not None else "",
+        )
+        html = html.replace(CSRF_MARKER, csrf_input)
+    return mark_safe(html)
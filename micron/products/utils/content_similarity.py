@@ -0,0 +1,293 @@
+import os
+import re
+import shutil
+import tempfile
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.utils.html import strip_tags
+from django_redis import get_redis_connection
+from scipy import sparse
+from taggit.models import TaggedItem
+
+from products.models.product import Product
+from products.utils.similarity import iter_top_k
+
+CONTENT_TOP_K = 20
+CONTENT_CHUNK_SIZE = 1_000
+READ_CHUNK_SIZE = 2_000
+
+# A term found in a name counts three times, in a tag twice, in a description once.
+NAME_WEIGHT = 3
+TAG_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+MAX_TERM_LENGTH = 32
+
+CURRENT_LINK = "current"
+GENERATION_PREFIX = "index-"
+CONTENT_INDEX_LOCK = "content_index:lock"
+CONTENT_INDEX_LOCK_TIMEOUT = 60 * 30
+CONTENT_UPDATE_QUEUED_PREFIX = "content_index:queued"
+CONTENT_UPDATE_QUEUED_TIMEOUT = 60
+
+_TERM_RE = re.compile(r"\w{2,}", re.UNICODE)
+
+_loaded: dict[str, "ContentIndex"] = {}
+
+
+@dataclass(frozen=True)
+class ContentIndex:
+    """
+    L2-normalized TF-IDF vectors of the catalog and the precomputed cosine
+    top-K of every product. Rows follow the sorted `product_ids`;
+    `neighbours` holds product ids padded with -1.
+    """
+
+    product_ids: np.ndarray
+    vectors: sparse.csr_matrix
+    vocabulary: np.ndarray
+    idf: np.ndarray
+    neighbours: np.ndarray
+    scores: np.ndarray
+
+    def find(self, product_id: int) -> int | None:
+        row = int(np.searchsorted(self.product_ids, product_id))
+        if row < len(self.product_ids) and self.product_ids[row] == product_id:
+            return row
+        return None
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return {
+            "product_ids": self.product_ids,
+            "data": self.vectors.data,
+            "indices": self.vectors.indices,
+            "indptr": self.vectors.indptr,
+            "vocabulary": self.vocabulary,
+            "idf": self.idf,
+            "neighbours": self.neighbours,
+            "scores": self.scores,
+        }
+
+    def save(self, root: str) -> str:
+        """
+        Write a new generation of .npy files and point the "current" symlink at
+        it in one rename. Workers keep reading the arrays they have mapped, even
+        after the old generation is removed.
+        """
+        os.makedirs(root, exist_ok=True)
+        path = tempfile.mkdtemp(prefix=GENERATION_PREFIX, dir=root)
+        os.chmod(path, 0o755)
+        for name, array in self.arrays().items():
+            np.save(os.path.join(path, f"{name}.npy"), array)
+
+        link = os.path.join(root, CURRENT_LINK)
+        staged_link = f"{link}.{os.getpid()}"
+        os.symlink(os.path.basename(path), staged_link)
+        os.replace(staged_link, link)
+
+        for name in os.listdir(root):
+            if name.startswith(GENERATION_PREFIX) and name != os.path.basename(path):
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str | None = "r") -> "ContentIndex":
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ("product_ids", "data", "indices", "indptr", "vocabulary", "idf", "neighbours", "scores")
+        }
+        vectors = sparse.csr_matrix(
+            (arrays.pop("data"), arrays.pop("indices"), arrays.pop("indptr")),
+            shape=(len(arrays["product_ids"]), len(arrays["idf"])),
+        )
+        return cls(vectors=vectors, **arrays)
+
+
+def get_current_index_path() -> str | None:
+    root = settings.PRODUCT_CONTENT_INDEX_DIR
+    try:
+        return os.path.join(root, os.readlink(os.path.join(root, CURRENT_LINK)))
+    except OSError:
+        return None
+
+
+def get_content_index() -> ContentIndex | None:
+    """The published index, memory-mapped once per process and generation."""
+
+    path = get_current_index_path()
+    if path is None:
+        return None
+
+    index = _loaded.get(path)
+    if index is None:
+        _loaded.clear()
+        index = _loaded[path] = ContentIndex.load(path)
+    return index
+
+
+def get_content_neighbours(product_id: int, limit: int) -> dict[int, float]:
+    """Up to `limit` products most similar in content to this one, with their cosine scores."""
+
+    index = get_content_index()
+    row = index.find(product_id) if index is not None else None
+    if row is None:
+        return {}
+
+    neighbours, scores = index.neighbours[row, :limit], index.scores[row, :limit]
+    found = neighbours >= 0
+    return dict(zip(neighbours[found].tolist(), scores[found].tolist()))
+
+
+def get_content_update_key(product_id: int) -> str:
+    return f"{CONTENT_UPDATE_QUEUED_PREFIX}:{product_id}"
+
+
+def tokenize(text: str) -> list[str]:
+    return [term for term in _TERM_RE.findall(text.lower()) if len(term) <= MAX_TERM_LENGTH]
+
+
+def load_product_terms(product_ids: list[int] | None = None) -> dict[int, Counter]:
+    """Weighted term counts of every product over all its translations and tags."""
+
+    translation_model = Product._parler_meta.root_model
+    translations = translation_model.objects.filter(master_id__in=Product.objects.values("pk")).order_by()
+    tags = TaggedItem.objects.filter(content_type=ContentType.objects.get_for_model(Product)).order_by()
+    if product_ids is not None:
+        translations = translations.filter(master_id__in=product_ids)
+        tags = tags.filter(object_id__in=product_ids)
+
+    documents: dict[int, Counter] = {}
+    rows = translations.values_list("master_id", "name", "description").iterator(chunk_size=READ_CHUNK_SIZE)
+    for product_id, name, description in rows:
+        terms = documents.setdefault(product_id, Counter())
+        for term in tokenize(name or ""):
+            terms[term] += NAME_WEIGHT
+        for term in tokenize(strip_tags(description or "")):
+            terms[term] += DESCRIPTION_WEIGHT
+
+    for product_id, tag in tags.values_list("object_id", "tag__name").iterator(chunk_size=READ_CHUNK_SIZE):
+        if product_id in documents:
+            for term in tokenize(tag):
+                documents[product_id][term] += TAG_WEIGHT
+    return documents
+
+
+def vectorize(documents: list[Counter], vocabulary: dict[str, int], idf: np.ndarray) -> sparse.csr_matrix:
+    """Sublinear TF × IDF rows scaled to unit length; terms outside the vocabulary are dropped."""
+
+    rows, columns, counts = [], [], []
+    for row, terms in enumerate(documents):
+        for term, count in terms.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                rows.append(row)
+                columns.append(column)
+                counts.append(count)
+
+    columns = np.asarray(columns, dtype=np.int32)
+    weights = (1 + np.log(np.asarray(counts, dtype=np.float32))) * idf[columns]
+    matrix = sparse.csr_matrix(
+        (weights, (np.asarray(rows, dtype=np.int32), columns)),
+        shape=(len(documents), len(idf)),
+        dtype=np.float32,
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return (sparse.diags(1 / norms) @ matrix).astype(np.float32).tocsr()
+
+
+def rank_neighbours(
+    queries: sparse.csr_matrix,
+    query_ids: np.ndarray,
+    vectors: sparse.csr_matrix,
+    product_ids: np.ndarray,
+    top_k: int = CONTENT_TOP_K,
+    chunk_size: int = CONTENT_CHUNK_SIZE,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cosine top-K of each query row among `vectors`, the query product
+    itself excluded. Dot products are taken `chunk_size` rows at a time.
+    """
+    neighbours = np.full((queries.shape[0], top_k), -1, dtype=np.int64)
+    scores = np.zeros((queries.shape[0], top_k), dtype=np.float32)
+    candidates = vectors.T.tocsr()
+
+    for start in range(0, queries.shape[0], chunk_size):
+        dots = (queries[start:start + chunk_size] @ candidates).tocoo()
+        keep = product_ids[dots.col] != query_ids[start + dots.row]
+        chunk = sparse.csr_matrix((dots.data[keep], (dots.row[keep], dots.col[keep])), shape=dots.shape)
+        for offset, columns, values in iter_top_k(chunk, top_k):
+            neighbours[start + offset, :len(columns)] = product_ids[columns]
+            scores[start + offset, :len(values)] = values
+    return neighbours, scores
+
+
+def _index_lock():
+    return get_redis_connection("default").lock(CONTENT_INDEX_LOCK, timeout=CONTENT_INDEX_LOCK_TIMEOUT)
+
+
+def build_content_index(top_k: int = CONTENT_TOP_K, chunk_size: int = CONTENT_CHUNK_SIZE) -> int:
+    """Vectorize the whole catalog with a fresh vocabulary and IDF and publish it."""
+
+    with _index_lock():
+        documents = load_product_terms()
+        product_ids = np.array(sorted(documents), dtype=np.int64)
+        ordered = [documents[product_id] for product_id in product_ids.tolist()]
+
+        document_frequency = Counter(term for terms in ordered for term in terms)
+        terms = sorted(document_frequency)
+        frequencies = np.array([document_frequency[term] for term in terms], dtype=np.float32)
+        idf = (np.log((1 + len(ordered)) / (1 + frequencies)) + 1).astype(np.float32)
+
+        vectors = vectorize(ordered, {term: column for column, term in enumerate(terms)}, idf)
+        neighbours, scores = rank_neighbours(vectors, product_ids, vectors, product_ids, top_k, chunk_size)
+        vocabulary = np.array(terms, dtype=f"<U{MAX_TERM_LENGTH}")
+        ContentIndex(product_ids, vectors, vocabulary, idf, neighbours, scores).save(
+            settings.PRODUCT_CONTENT_INDEX_DIR
+        )
+    return len(product_ids)
+
+
+def update_content_index(product_ids: list[int], chunk_size: int = CONTENT_CHUNK_SIZE) -> int:
+    """
+    Re-vectorize the given products against the published vocabulary and IDF,
+    then re-rank only the lists they enter or leave. Terms the vocabulary does
+    not know yet count from the next full rebuild. Returns the re-ranked rows.
+    """
+    if get_current_index_path() is None:
+        return build_content_index(chunk_size=chunk_size)
+
+    with _index_lock():
+        index = ContentIndex.load(get_current_index_path())
+        changed = np.array(sorted(set(product_ids)), dtype=np.int64)
+        documents = load_product_terms(changed.tolist())
+        present = np.array(sorted(documents), dtype=np.int64)
+        vocabulary = {term: column for column, term in enumerate(index.vocabulary.tolist())}
+        fresh = vectorize([documents[product_id] for product_id in present.tolist()], vocabulary, index.idf)
+
+        top_k = index.neighbours.shape[1]
+        kept = ~np.isin(index.product_ids, changed)
+        ids = np.concatenate([index.product_ids[kept], present])
+        order = np.argsort(ids, kind="stable")
+        ids = ids[order]
+        vectors = sparse.vstack([index.vectors[kept], fresh]).tocsr()[order]
+        neighbours = np.concatenate([index.neighbours[kept], np.full((len(present), top_k), -1)])[order]
+        scores = np.concatenate([index.scores[kept], np.zeros((len(present), top_k), dtype=np.float32)])[order]
+
+        # Lists that held a changed product, and lists a changed product now beats the last entry of.
+        affected = np.isin(neighbours, changed).any(axis=1)
+        changed_rows = np.flatnonzero(np.isin(ids, changed))
+        if len(changed_rows):
+            incoming = (vectors @ vectors[changed_rows].T).max(axis=1).toarray().ravel()
+            affected |= incoming > scores[:, -1]
+            affected[changed_rows] = True
+
+        rows = np.flatnonzero(affected)
+        neighbours[rows], scores[rows] = rank_neighbours(vectors[rows], ids[rows], vectors, ids, top_k, chunk_size)
+        ContentIndex(ids, vectors, index.vocabulary, index.idf, neighbours, scores).save(
+            settings.PRODUCT_CONTENT_INDEX_DIR
+        )
+    return len(rows)
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from parler import appsettings
+
+from products.models.category import Category
+from products.models.product import Product
+from products.utils.filters import get_price_range
+
+FACETS_CACHE_PREFIX = "catalog_facets"
+FACETS_CACHE_TIMEOUT = 60 * 10
+
+FACET_FIELDS = frozenset({"price", "price_with_discount", "discount", "available", "category", "category_id"})
+
+
+def _facets_cache_key(language_code: str) -> str:
+    return f"{FACETS_CACHE_PREFIX}:{language_code}"
+
+
+def _category_names(category_ids, language_code: str) -> dict[int, tuple[str, str]]:
+    """Map category id to (name, slug) in the requested language, falling back to the default one."""
+
+    translation_model = Category._parler_meta.root_model
+    fallback = appsettings.PARLER_DEFAULT_LANGUAGE_CODE
+    rows = translation_model.objects.filter(
+        master_id__in=category_ids,
+        language_code__in={language_code, fallback},
+    ).values_list("master_id", "language_code", "name", "slug")
+
+    names = {}
+    for master_id, row_language, name, slug in rows:
+        if master_id not in names or row_language == language_code:
+            names[master_id] = (name, slug)
+    return names
+
+
+def compute_catalog_facets(language_code: str) -> dict:
+    """Aggregate price range and per-category and per-discount product counts."""
+
+    products = Product.objects.all()
+
+    category_counts = dict(
+        products.values_list("category").annotate(count=Count("id")).order_by()
+    )
+    names = _category_names(category_counts.keys(), language_code)
+    categories = sorted(
+        (
+            {"id": category_id, "name": names[category_id][0], "slug": names[category_id][1], "count": count}
+            for category_id, count in category_counts.items()
+            if category_id in names
+        ),
+        key=lambda category: category["name"].lower(),
+    )
+
+    discount_counts = dict(
+        products.values_list("discount").annotate(count=Count("id")).order_by()
+    )
+
+    return {
+        **get_price_range(),
+        "categories": categories,
+        "discount": {
+            "true": discount_counts.get(True, 0),
+            "false": discount_counts.get(False, 0),
+        },
+    }
+
+
+def get_catalog_facets(language_code: str) -> dict:
+    """Return catalog facets for a language, computing them only on a cache miss."""
+
+    cache_key = _facets_cache_key(language_code)
+    facets = cache.get(cache_key)
+    if facets is None:
+        facets = compute_catalog_facets(language_code)
+        cache.set(cache_key, facets, FACETS_CACHE_TIMEOUT)
+    return facets
+
+
+def invalidate_catalog_facets() -> None:
+    """Drop cached facets for every language; the next listing request recomputes them."""
+
+    cache.delete_many([_facets_cache_key(code) for code, _ in settings.LANGUAGES])
@@ -1,29 +1,15 @@
-from django.db.models import Case, DecimalField, F, Max, Min, QuerySet, When
+from django.db.models import Max, Min, QuerySet
 
 from products.models.product import Product
 from products.models.category import Category
 
 
-def get_effective_price_expr():
-    """Returns Case expression for effective price (with discount if applicable)."""
-
-    return Case(
-        When(
-            discount=True,
-            price_with_discount__isnull=False,
-            then=F('price_with_discount')
-        ),
-        default=F('price'),
-        output_field=DecimalField()
-    )
-
-
 def get_price_range() -> dict:
     """Get min and max prices from all available products."""
 
     result = Product.objects.filter(available=True).aggregate(
-        min_price=Min(get_effective_price_expr()),
-        max_price=Max(get_effective_price_expr())
+        min_price=Min('effective_price'),
+        max_price=Max('effective_price')
     )
 
     return {
@@ -40,20 +26,27 @@ def filter_by_discount(queryset: QuerySet, discount: str) -> QuerySet:
     return queryset
 
 
-def filter_by_category(queryset: QuerySet, category_slug: str, language_code: str) -> QuerySet:
-    """Filter products by category slug and language."""
+def get_category(category_slug: str, language_code: str) -> Category | None:
+    """Find the category with this slug in the language, if exactly one has it."""
 
     if not category_slug:
-        return queryset
+        return None
 
     try:
-        category = Category.objects.get(
+        return Category.objects.get(
             translations__slug=category_slug,
             translations__language_code=language_code,
         )
-        return queryset.filter(category=category)
     except (Category.DoesNotExist, Category.MultipleObjectsReturned):
+        return None
+
+
+def filter_by_category(queryset: QuerySet, category: Category | None) -> QuerySet:
+    """Filter products by category."""
+
+    if category is None:
         return queryset
+    return queryset.filter(category=category)
 
 
 def filter_by_price_range(queryset: QuerySet, min_price: str, max_price: str) -> QuerySet:
@@ -65,9 +58,7 @@ def filter_by_price_range(queryset: QuerySet, min_price: str, max_price: str) ->
     try:
         min_val = float(min_price)
         max_val = float(max_price)
-        return queryset.annotate(
-            effective_price=get_effective_price_expr()
-        ).filter(
+        return queryset.filter(
             effective_price__gte=min_val,
             effective_price__lte=max_val
         )
@@ -75,25 +66,6 @@ def filter_by_price_range(queryset: QuerySet, min_price: str, max_price: str) ->
         return queryset
 
 
-def apply_ordering(queryset: QuerySet, order: str) -> QuerySet:
-    """Apply ordering to products queryset."""
-
-    order_map = {
-        "price": "effective_price",
-        "-price": "-effective_price",
-        "date": "created_at",
-        "-date": "-created_at",
-    }
-
-    if order not in order_map:
-        return queryset
-
-    if order in ["price", "-price"] and "effective_price" not in queryset.query.annotations:
-        queryset = queryset.annotate(effective_price=get_effective_price_expr())
-
-    return queryset.order_by(order_map[order])
-
-
 def get_user_favorite_ids(user) -> set:
     """Get set of favorite product IDs for user."""
 
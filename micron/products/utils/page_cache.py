@@ -0,0 +1,141 @@
+import hashlib
+import re
+import time
+from functools import wraps
+from typing import Iterable
+
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_cache_control
+
+from cart.storage import get_cart_storage
+from products.utils.card_cache import get_rate_bucket
+from products.utils.currency import get_usd_to_uah_rate
+
+PAGE_CACHE_PREFIX = "page"
+PAGE_VERSION_PREFIX = "page_version"
+PAGE_CACHE_TIMEOUT = 60 * 5
+
+CATALOG_SCOPE = "catalog"
+
+# Cached pages are shared between visitors, so the per-visitor CSRF token is
+# swapped for this sentinel before storing and a fresh token on every hit.
+CSRF_SENTINEL = "__csrf_token__"
+_CSRF_INPUT_RE = re.compile(r'(name=\\?"csrfmiddlewaretoken\\?" value=\\?")[A-Za-z0-9]+(\\?")')
+
+
+def product_scope(slug: str) -> str:
+    return f"product:{slug}"
+
+
+def _version_key(scope: str) -> str:
+    return f"{PAGE_VERSION_PREFIX}:{scope}"
+
+
+def _get_versions(scopes: list[str]) -> list[int]:
+    keys = [_version_key(scope) for scope in scopes]
+    stored = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in stored}
+    if missing:
+        cache.set_many(missing, None)
+    return [stored.get(key) or missing[key] for key in keys]
+
+
+def invalidate_page_scopes(*scopes: str) -> None:
+    """Start new versions for the scopes; pages cached under the old ones are never served again."""
+
+    version = time.time_ns()
+    cache.set_many({_version_key(scope): version for scope in scopes}, None)
+
+
+def invalidate_product_pages(*product_ids: int, previous_slugs: Iterable[str | None] = ()) -> None:
+    """
+    Purge the catalog pages and the detail pages of the products in every
+    language, plus the pages still cached under slugs they no longer use.
+    """
+
+    from products.models.product import Product
+
+    translation_model = Product._parler_meta.root_model
+    slugs = set(translation_model.objects.filter(master_id__in=product_ids).values_list("slug", flat=True))
+    slugs.update(slug for slug in previous_slugs if slug)
+    invalidate_page_scopes(CATALOG_SCOPE, *(product_scope(slug) for slug in slugs))
+
+
+def is_page_cacheable(request: HttpRequest) -> bool:
+    """Only anonymous GETs without a cart, coupon or pending messages share a page."""
+
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if request.user.is_authenticated:
+        return False
+    if request.session.get("coupon_id") or not get_cart_storage(request).is_empty():
+        return False
+    return not len(get_messages(request))
+
+
+def is_response_storable(request: HttpRequest, response: HttpResponse) -> bool:
+    """Only complete 200 pages that set no cookies and leave no pending messages are shared."""
+
+    if response.status_code != 200 or response.streaming:
+        return False
+    if response.cookies or response.has_header("Set-Cookie"):
+        return False
+    return not len(get_messages(request))
+
+
+def _page_cache_key(request: HttpRequest, scopes: list[str]) -> str:
+    language = request.LANGUAGE_CODE
+    versions = ".".join(str(version) for version in _get_versions(scopes))
+    rate_bucket = get_rate_bucket(language, get_usd_to_uah_rate())
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    variant = "xhr" if request.headers.get("X-Requested-With") == "XMLHttpRequest" else "html"
+    return f"{PAGE_CACHE_PREFIX}:{language}:{rate_bucket}:{variant}:{versions}:{path}"
+
+
+def _build_response(request: HttpRequest, entry: dict) -> HttpResponse:
+    if entry["etag"] in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+    else:
+        content = entry["content"].replace(CSRF_SENTINEL.encode(), get_token(request).encode())
+        response = HttpResponse(content, content_type=entry["content_type"])
+    response["ETag"] = entry["etag"]
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def cache_anonymous_page(*scopes: str):
+    """
+    Serve a view from the page cache for anonymous visitors with an empty cart.
+    Pages vary by language, full query string and exchange rate bucket;
+    scopes may reference view kwargs, e.g. "product:{product_slug}".
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request: HttpRequest, *args, **kwargs):
+            if not is_page_cacheable(request):
+                return view_func(request, *args, **kwargs)
+
+            cache_key = _page_cache_key(request, [scope.format(**kwargs) for scope in scopes])
+            entry = cache.get(cache_key)
+            if entry is not None:
+                return _build_response(request, entry)
+
+            response = view_func(request, *args, **kwargs)
+            if not is_response_storable(request, response):
+                return response
+
+            content = _CSRF_INPUT_RE.sub(rf"\g<1>{CSRF_SENTINEL}\g<2>", response.content.decode())
+            entry = {
+                "content": content.encode(),
+                "content_type": response["Content-Type"],
+                "etag": f'"{hashlib.md5(content.encode()).hexdigest()}"',
+            }
+            cache.set(cache_key, entry, PAGE_CACHE_TIMEOUT)
+            response["ETag"] = entry["etag"]
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
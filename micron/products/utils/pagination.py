@@ -1,26 +1,52 @@
-from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator, Page
+from django.db.models import QuerySet
 from django.http import HttpRequest
-from products.models.product import Product
 
+from common.pagination import InvalidCursor, KeysetPage, paginate_keyset, paginate_offset
 
-def paginate_products(request: HttpRequest, products: Product, results) -> tuple[range, Page]:
-    """Paginate products queryset."""
+PRODUCT_CURSOR_ORDERINGS: dict[str, tuple[str, ...]] = {
+    "price": ("effective_price", "id"),
+    "-price": ("-effective_price", "-id"),
+    "date": ("created_at", "id"),
+    "-date": ("-created_at", "-id"),
+    "-rating": ("-rating_average", "-rating_count", "-id"),
+}
+# Live rankings are paged by offset. They need the `popularity` annotation,
+# see products.utils.popularity.annotate_popularity.
+PRODUCT_OFFSET_ORDERINGS: dict[str, tuple[str, ...]] = {
+    "popular": ("-popularity", "-id"),
+}
+DEFAULT_PRODUCT_ORDERING = ("-id",)
+SEARCH_PRODUCT_ORDERING = ("-search_rank", "-id")
 
-    page = request.GET.get("page")
-    paginator = Paginator(products, results)
+
+def get_product_cursor_ordering(products: QuerySet, order: str | None) -> tuple[str, ...]:
+    """Pick the keyset columns for a listing; ranked search results keep their relevance order."""
+
+    if order in PRODUCT_CURSOR_ORDERINGS:
+        return PRODUCT_CURSOR_ORDERINGS[order]
+    if "search_rank" in products.query.annotations:
+        return SEARCH_PRODUCT_ORDERING
+    return DEFAULT_PRODUCT_ORDERING
+
+
+def paginate_products(request: HttpRequest, products: QuerySet, results: int) -> KeysetPage:
+    """Paginate products queryset by cursor instead of page number."""
+
+    order = request.GET.get("order")
+    if order in PRODUCT_OFFSET_ORDERINGS:
+        paginate, ordering = paginate_offset, PRODUCT_OFFSET_ORDERINGS[order]
+    else:
+        paginate, ordering = paginate_keyset, get_product_cursor_ordering(products, order)
     try:
-        products = paginator.page(page)
-    except PageNotAnInteger:
-        page = 1
-        products = paginator.page(page)
-    except EmptyPage:
-        page = paginator.num_pages
-        products = paginator.page(page)
-    leftindex = int(page) - 4
-    if leftindex < 1:
-        leftindex = 1
-    rightindex = int(page) + 5
-    if rightindex > paginator.num_pages:
-        rightindex = paginator.num_pages + 1
-    custom_range = range(leftindex, rightindex)
-    return custom_range, products
+        return paginate(products, ordering, request.GET.get("cursor"), results)
+    except InvalidCursor:
+        return paginate(products, ordering, None, results)
+
+
+def get_pagination_query(request: HttpRequest) -> str:
+    """Current filters as a query string, without the cursor, for pagination links."""
+
+    query = request.GET.copy()
+    query.pop("cursor", None)
+    query.pop("page", None)
+    return query.urlencode()
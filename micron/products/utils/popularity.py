@@ -0,0 +1,219 @@
+import logging
+import time
+from collections import defaultdict
+from typing import Iterable
+
+from django.core.cache import cache
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import BigIntegerField, F, Func, IntegerField, QuerySet, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils.translation import get_language
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from common.redis import INGESTED_ORDER_TTL
+from products.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+TRENDING = "trending"
+BESTSELLERS = "bestsellers"
+# Seconds after which a sold unit weighs half as much in each ranking.
+RANKING_HALF_LIVES = {
+    TRENDING: 60 * 60 * 24,
+    BESTSELLERS: 60 * 60 * 24 * 30,
+}
+POPULARITY_PREFIX = "popularity:"
+# Products whose decayed units fall below this leave the rankings on rescale.
+MIN_SCORE = 0.01
+
+POPULAR_ORDER = "popular"
+POPULAR_ORDERING_SIZE = 500
+POPULAR_BLOCK_SIZE = 8
+POPULAR_CACHE_TIMEOUT = 60 * 5
+
+# Forward decay: a unit sold at `now` adds 2^((now - epoch) / half_life), so
+# older sales never have to be rewritten, and the order of a sorted set is the
+# order of the decayed sales. Keys are built from ARGV[3], see common.redis.
+# Lines are (product, category, quantity).
+RECORD_SALES_SCRIPT = """
+if redis.call('SET', KEYS[1], 1, 'NX', 'EX', ARGV[1]) == false then
+    return 0
+end
+local now = tonumber(ARGV[2])
+local prefix = ARGV[3]
+local rankings = tonumber(ARGV[4])
+local first_line = 5 + rankings * 2
+for r = 0, rankings - 1 do
+    local ranking = prefix .. ARGV[5 + r * 2]
+    local epoch = tonumber(redis.call('GET', ranking .. ':epoch'))
+    if not epoch then
+        epoch = now
+        redis.call('SET', ranking .. ':epoch', ARGV[2])
+    end
+    local weight = math.pow(2, (now - epoch) / tonumber(ARGV[6 + r * 2]))
+    for i = first_line, #ARGV, 3 do
+        local points = string.format('%.17g', weight * tonumber(ARGV[i + 2]))
+        redis.call('ZINCRBY', ranking .. ':all', points, ARGV[i])
+        redis.call('ZINCRBY', ranking .. ':category:' .. ARGV[i + 1], points, ARGV[i])
+    end
+end
+return 1
+"""
+
+# Move a ranking's epoch to `now`: every score is multiplied down in place so
+# they stay small, and products that stopped selling are dropped.
+RESCALE_SCRIPT = """
+local epoch = tonumber(redis.call('GET', KEYS[1]))
+if not epoch then
+    return 0
+end
+local factor = string.format('%.17g', math.pow(2, (epoch - tonumber(ARGV[1])) / tonumber(ARGV[2])))
+for i = 2, #KEYS do
+    redis.call('ZUNIONSTORE', KEYS[i], 1, KEYS[i], 'WEIGHTS', factor)
+    redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', '(' .. ARGV[3])
+end
+redis.call('SET', KEYS[1], ARGV[1])
+return #KEYS - 1
+"""
+
+
+def get_ranking_key(ranking: str, category_id: int | str | None = None) -> str:
+    if category_id is None:
+        return f"{POPULARITY_PREFIX}{ranking}:all"
+    return f"{POPULARITY_PREFIX}{ranking}:category:{category_id}"
+
+
+def get_epoch_key(ranking: str) -> str:
+    return f"{POPULARITY_PREFIX}{ranking}:epoch"
+
+
+def get_order_marker_key(order_id: int) -> str:
+    return f"{POPULARITY_PREFIX}order:{order_id}"
+
+
+def record_order_sales(order_id: int, lines: Iterable[tuple[int, int, int]], now: float | None = None) -> bool:
+    """
+    Add the (product, category, quantity) lines of a paid order to every
+    ranking, globally and per category, in one round trip. Returns False
+    when the order was already recorded.
+    """
+    args = [INGESTED_ORDER_TTL, now or time.time(), POPULARITY_PREFIX, len(RANKING_HALF_LIVES)]
+    for ranking, half_life in RANKING_HALF_LIVES.items():
+        args += [ranking, half_life]
+    for line in lines:
+        args += line
+
+    r = get_redis_connection("default")
+    return bool(r.register_script(RECORD_SALES_SCRIPT)(keys=[get_order_marker_key(order_id)], args=args))
+
+
+def rescale_rankings(now: float | None = None) -> int:
+    """Decay every ranking to the current time; returns the number of sorted sets rescaled."""
+
+    r = get_redis_connection("default")
+    rescale = r.register_script(RESCALE_SCRIPT)
+    rescaled = 0
+    for ranking, half_life in RANKING_HALF_LIVES.items():
+        categories = r.scan_iter(match=get_ranking_key(ranking, "*"), count=1000)
+        keys = [get_epoch_key(ranking), get_ranking_key(ranking), *categories]
+        rescaled += rescale(keys=keys, args=[now or time.time(), half_life, MIN_SCORE])
+    return rescaled
+
+
+def rebuild_rankings(lines: Iterable[tuple[int, int, int, int, float]], now: float | None = None) -> int:
+    """
+    Replace every ranking with the decayed sales of `lines`, (order, product,
+    category, quantity, sold at) rows of paid orders, and mark those orders
+    recorded so a late payment task does not count them twice.
+    """
+    now = now or time.time()
+    scores = {ranking: defaultdict(float) for ranking in RANKING_HALF_LIVES}
+    orders = set()
+    for order_id, product_id, category_id, quantity, sold_at in lines:
+        orders.add(order_id)
+        for ranking, half_life in RANKING_HALF_LIVES.items():
+            scores[ranking][category_id, product_id] += quantity * 2 ** ((sold_at - now) / half_life)
+
+    r = get_redis_connection("default")
+    pipeline = r.pipeline(transaction=True)
+    for ranking, ranked in scores.items():
+        pipeline.delete(get_ranking_key(ranking), *r.scan_iter(match=get_ranking_key(ranking, "*"), count=1000))
+        by_category, overall = defaultdict(dict), {}
+        for (category_id, product_id), score in ranked.items():
+            if score >= MIN_SCORE:
+                by_category[category_id][product_id] = score
+                overall[product_id] = score
+        if overall:
+            pipeline.zadd(get_ranking_key(ranking), overall)
+        for category_id, category_scores in by_category.items():
+            pipeline.zadd(get_ranking_key(ranking, category_id), category_scores)
+        pipeline.set(get_epoch_key(ranking), now)
+    for order_id in orders:
+        pipeline.set(get_order_marker_key(order_id), 1, ex=INGESTED_ORDER_TTL)
+    pipeline.execute()
+    return len(orders)
+
+
+def get_popular_scores(ranking: str, limit: int, category_id: int | None = None) -> list[tuple[int, float]]:
+    """The best `limit` (product id, score) pairs of a ranking; empty when Redis is unavailable."""
+
+    try:
+        ranked = get_redis_connection("default").zrevrange(
+            get_ranking_key(ranking, category_id), 0, limit - 1, withscores=True
+        )
+    except RedisError as e:
+        logger.warning("Could not read the %s ranking: %s", ranking, e)
+        return []
+    return [(int(product_id), score) for product_id, score in ranked]
+
+
+def get_popular_products(ranking: str, limit: int = POPULAR_BLOCK_SIZE) -> list[Product]:
+    """Available products of a ranking, best first, for homepage blocks."""
+
+    cache_key = f"{POPULARITY_PREFIX}products:{ranking}:{get_language()}:{limit}"
+    products = cache.get(cache_key)
+    if products is None:
+        # Read a few extra ids so unavailable products do not leave the block short.
+        ranked = [product_id for product_id, _ in get_popular_scores(ranking, limit * 2)]
+        rank = {product_id: position for position, product_id in enumerate(ranked)}
+        products = list(Product.objects.filter(id__in=ranked, available=True).prefetch_related("translations"))
+        products.sort(key=lambda product: rank[product.id])
+        products = products[:limit]
+        cache.set(cache_key, products, POPULAR_CACHE_TIMEOUT)
+    return products
+
+
+def get_popular_ids(ranking: str, category_id: int | None = None) -> list[int]:
+    """
+    The top POPULAR_ORDERING_SIZE product ids of a ranking, best first. Cached
+    briefly, so the pages of one listing are read from the same snapshot.
+    """
+    cache_key = f"{POPULARITY_PREFIX}ids:{ranking}:{category_id or 'all'}"
+    product_ids = cache.get(cache_key)
+    if product_ids is None:
+        product_ids = [product_id for product_id, _ in get_popular_scores(ranking, POPULAR_ORDERING_SIZE, category_id)]
+        cache.set(cache_key, product_ids, POPULAR_CACHE_TIMEOUT)
+    return product_ids
+
+
+def annotate_popularity(
+    queryset: QuerySet, category_id: int | None = None, ranking: str = BESTSELLERS
+) -> QuerySet:
+    """
+    Annotate `popularity` from the top of a ranking (the category's own when
+    given, so deep pages of one category stay ranked): the best product
+    scores POPULAR_ORDERING_SIZE, the next one less, and everything outside
+    the ranking 0, falling back to the id order.
+    """
+    product_ids = get_popular_ids(ranking, category_id)
+    if not product_ids:
+        return queryset.annotate(popularity=Value(0, output_field=IntegerField()))
+
+    # The ranking is passed as one array parameter, not a CASE branch per product.
+    position = Func(
+        Cast(Value(product_ids), ArrayField(BigIntegerField())), F("pk"),
+        function="array_position",
+        output_field=IntegerField(),
+    )
+    return queryset.annotate(popularity=Coalesce(Value(len(product_ids) + 1) - position, Value(0)))
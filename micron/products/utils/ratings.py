@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import Cast
+
+from products.models.product import RATING_FIELDS, RATING_STAR_FIELDS, Product
+from products.models.review import Review
+
+
+def apply_rating_change(product_id: int | None, added: int | None = None, removed: int | None = None) -> None:
+    """
+    Move a product's rating aggregates by one review: `added` stars enter,
+    `removed` stars leave. Runs as a single UPDATE with F() expressions, so
+    concurrent reviews of the same product never overwrite each other.
+    """
+    if product_id is None or added == removed:
+        return
+
+    sum_delta = (added or 0) - (removed or 0)
+    count_delta = (added is not None) - (removed is not None)
+    new_sum = Cast(F("rating_sum") + sum_delta, DecimalField(max_digits=12, decimal_places=2))
+
+    updates = {
+        "rating_sum": F("rating_sum") + sum_delta,
+        "rating_count": F("rating_count") + count_delta,
+        "rating_average": Case(
+            When(
+                rating_count__gt=-count_delta,
+                then=new_sum / (F("rating_count") + count_delta),
+            ),
+            default=Value(0),
+            output_field=DecimalField(max_digits=3, decimal_places=2),
+        ),
+    }
+    if added is not None:
+        updates[RATING_STAR_FIELDS[added]] = F(RATING_STAR_FIELDS[added]) + 1
+    if removed is not None:
+        updates[RATING_STAR_FIELDS[removed]] = F(RATING_STAR_FIELDS[removed]) - 1
+
+    Product.all_objects.filter(pk=product_id).update(**updates)
+
+
+def rebuild_product_ratings() -> int:
+    """Recompute the rating aggregates of every product from its active reviews."""
+
+    aggregates = {
+        row["product_id"]: row
+        for row in Review.objects.filter(product__isnull=False)
+        .values("product_id")
+        .annotate(
+            rating_sum=Sum("stars"),
+            rating_count=Count("id"),
+            **{field: Count("id", filter=Q(stars=star)) for star, field in RATING_STAR_FIELDS.items()},
+        )
+        .order_by()
+    }
+
+    products = list(Product.all_objects.only("pk", *RATING_FIELDS))
+    for product in products:
+        row = aggregates.get(product.pk, {})
+        product.rating_sum = row.get("rating_sum", 0)
+        product.rating_count = row.get("rating_count", 0)
+        product.rating_average = (
+            (Decimal(product.rating_sum) / product.rating_count).quantize(Decimal("0.01"))
+            if product.rating_count else Decimal(0)
+        )
+        for field in RATING_STAR_FIELDS.values():
+            setattr(product, field, row.get(field, 0))
+
+    with transaction.atomic():
+        Product.all_objects.bulk_update(products, list(RATING_FIELDS), batch_size=500)
+    return len(products)
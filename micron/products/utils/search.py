@@ -1,23 +1,105 @@
+import re
+
+from django.conf import settings
 from django.contrib import messages
-from django.db.models import Q
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, FloatField, QuerySet, Value
+from django.db.models.functions import Cast
 from django.http import HttpRequest
+from django.utils.html import strip_tags
 from django.utils.translation import gettext_lazy as _
+from taggit.models import TaggedItem
 
 from products.models.product import Product
 
+DEFAULT_SEARCH_CONFIG = "simple"
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def get_search_config(language_code: str) -> str:
+    """Return the PostgreSQL text search configuration used for a language."""
+
+    return settings.PRODUCT_SEARCH_CONFIGS.get(language_code, DEFAULT_SEARCH_CONFIG)
+
+
+def build_search_query(text: str, language_code: str) -> SearchQuery | None:
+    """
+    Build a prefix-matching tsquery from free text.
+    Every term must match, the last one typed may be incomplete ("lapt" → "laptop").
+    Returns None when the text holds no searchable terms.
+    """
+    terms = _TERM_RE.findall(text or "")
+    if not terms:
+        return None
+
+    raw_query = " & ".join(f"{term}:*" for term in terms)
+    return SearchQuery(raw_query, search_type="raw", config=get_search_config(language_code))
+
+
+def build_search_vector(name: str, tags: list[str], description: str, language_code: str) -> SearchVector:
+    """Weighted document for a product translation: name (A), tags (B), description (C)."""
+
+    config = get_search_config(language_code)
+    name_vector = SearchVector(Value(name or ""), weight="A", config=config)
+    tags_vector = SearchVector(Value(" ".join(tags)), weight="B", config=config)
+    description_vector = SearchVector(Value(strip_tags(description or "")), weight="C", config=config)
+    return name_vector + tags_vector + description_vector
+
+
+def update_product_search_vectors(product_id: int) -> None:
+    """Rebuild the search document of every translation of a product."""
+
+    translation_model = Product._parler_meta.root_model
+    tags = list(
+        TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(Product),
+            object_id=product_id,
+        ).values_list("tag__name", flat=True)
+    )
+    translations = translation_model.objects.filter(master_id=product_id).values_list(
+        "pk", "language_code", "name", "description"
+    )
+    for pk, language_code, name, description in translations:
+        translation_model.objects.filter(pk=pk).update(
+            search_vector=build_search_vector(name, tags, description, language_code)
+        )
+
+
+def search_queryset(queryset: QuerySet, text: str, language_code: str, ranked: bool = True) -> QuerySet:
+    """
+    Filter products by full-text match in the given language.
+    With ranked=True results are ordered best match first, otherwise the
+    queryset keeps its own ordering.
+    """
+    query = build_search_query(text, language_code)
+    if query is None:
+        return queryset.none()
+
+    queryset = queryset.filter(
+        translations__language_code=language_code,
+        translations__search_vector=query,
+    )
+    if not ranked:
+        return queryset
+    # ts_rank is a float4; as a double its text form round-trips exactly through
+    # Python and a JSON cursor, so `search_rank__lt` matches the row it came from.
+    return queryset.annotate(
+        search_rank=Cast(SearchRank(F("translations__search_vector"), query), FloatField())
+    ).order_by("-search_rank", "-id")
+
 
-def search_products(request: HttpRequest) -> tuple[Product, str]:
-    """Search products by name containing the search query."""
+def search_products(request: HttpRequest) -> tuple[QuerySet, str]:
+    """Search products by name, tags and description using the full-text index."""
 
-    search_query = ""
-    if request.GET.get("search_query"):
-        search_query = request.GET["search_query"]
+    search_query = request.GET.get("search_query", "").strip()
 
-    products = Product.objects.distinct().filter(
-        Q(translations__name__icontains=search_query)
-    ).order_by('-id')
+    products = Product.objects.order_by("-id")
+    if search_query:
+        products = search_queryset(products, search_query, request.LANGUAGE_CODE)
 
-    if search_query and not products.exists():
-        messages.error(request, _("No search results found. Please try again."))
+        if not products.exists():
+            messages.error(request, _("No search results found. Please try again."))
 
     return products, search_query
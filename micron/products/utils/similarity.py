@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
+from scipy import sparse
+
+from orders.models.order_item import OrderItem
+
+SIMILARITY_METRICS = ("cosine", "jaccard", "count")
+DEFAULT_TOP_K = 20
+READ_CHUNK_SIZE = 20_000
+SIMILARITY_CHUNK_SIZE = 1_000
+
+
+@dataclass(frozen=True)
+class OrderProductMatrix:
+    """Binary orders × products matrix and the product id of every column."""
+
+    matrix: sparse.csr_matrix
+    product_ids: np.ndarray
+
+
+def load_order_lines(chunk_size: int = READ_CHUNK_SIZE) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (order ids, product ids) of every line of a paid order. Rows are streamed
+    with .iterator() and packed into int64 arrays chunk by chunk, so no model
+    instances or Python tuples for the whole history are held at once.
+    """
+    lines = (
+        OrderItem.objects
+        .filter(order__paid="paid", order__deleted__isnull=True)
+        .order_by()
+        .values_list("order_id", "product_id")
+    )
+    chunks, buffer = [], []
+    for line in lines.iterator(chunk_size=chunk_size):
+        buffer.append(line)
+        if len(buffer) == chunk_size:
+            chunks.append(np.array(buffer, dtype=np.int64))
+            buffer.clear()
+    if buffer:
+        chunks.append(np.array(buffer, dtype=np.int64))
+
+    if not chunks:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    packed = np.concatenate(chunks)
+    return packed[:, 0], packed[:, 1]
+
+
+def build_order_product_matrix(order_ids: np.ndarray, product_ids: np.ndarray) -> OrderProductMatrix:
+    order_keys, rows = np.unique(order_ids, return_inverse=True)
+    product_keys, columns = np.unique(product_ids, return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+        shape=(len(order_keys), len(product_keys)),
+    )
+    # The same product twice in one order still counts once.
+    matrix.data[:] = 1
+    return OrderProductMatrix(matrix, product_keys)
+
+
+def iter_item_neighbours(
+    matrix: sparse.csr_matrix,
+    top_k: int = DEFAULT_TOP_K,
+    metric: str = "cosine",
+    chunk_size: int = SIMILARITY_CHUNK_SIZE,
+    min_support: int = 1,
+) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Yield (column, neighbour columns, scores) for every product with at
+    least one neighbour, best first. Co-occurrence counts are computed for
+    `chunk_size` products at a time as sparse products, so memory is bounded
+    by the chunk instead of the full products × products matrix.
+
+    "cosine" is count / sqrt(n_i * n_j), "jaccard" count / (n_i + n_j - count)
+    and "count" the raw co-occurrence count the live Recommender uses.
+    """
+    if metric not in SIMILARITY_METRICS:
+        raise ValueError(f"Unknown similarity metric {metric!r}")
+
+    items = matrix.T.tocsr()
+    support = np.asarray(items.sum(axis=1)).ravel()
+
+    for start in range(0, items.shape[0], chunk_size):
+        co = (items[start:start + chunk_size] @ matrix).tocoo()
+        rows = co.row + start
+        keep = (co.col != rows) & (co.data >= min_support)
+        rows, columns, counts = rows[keep], co.col[keep], co.data[keep]
+
+        if metric == "cosine":
+            scores = counts / np.sqrt(support[rows] * support[columns])
+        elif metric == "jaccard":
+            scores = counts / (support[rows] + support[columns] - counts)
+        else:
+            scores = counts
+        chunk = sparse.csr_matrix(
+            (scores.astype(np.float32), (rows - start, columns)), shape=(co.shape[0], items.shape[0])
+        )
+
+        for offset, neighbours, values in iter_top_k(chunk, top_k):
+            yield start + offset, neighbours, values
+
+
+def iter_top_k(chunk: sparse.csr_matrix, top_k: int) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    """Yield (row, columns, values) of the `top_k` largest entries of every non-empty row, best first."""
+
+    for row in range(chunk.shape[0]):
+        low, high = chunk.indptr[row], chunk.indptr[row + 1]
+        if low == high:
+            continue
+        values, columns = chunk.data[low:high], chunk.indices[low:high]
+        if len(values) > top_k:
+            best = np.argpartition(-values, top_k)[:top_k]
+            values, columns = values[best], columns[best]
+        ranked = np.argsort(-values, kind="stable")
+        yield row, columns[ranked], values[ranked]
+
+
+def build_item_similarity(
+    top_k: int = DEFAULT_TOP_K,
+    metric: str = "cosine",
+    chunk_size: int = SIMILARITY_CHUNK_SIZE,
+    min_support: int = 1,
+) -> int:
+    """Recompute item-item similarity over the paid order history and publish it to the Recommender."""
+
+    from products.recommender import Recommender
+
+    data = build_order_product_matrix(*load_order_lines())
+    product_ids = data.product_ids
+    neighbours = (
+        (
+            int(product_ids[column]),
+            dict(zip(product_ids[columns].tolist(), scores.tolist())),
+        )
+        for column, columns, scores in iter_item_neighbours(data.matrix, top_k, metric, chunk_size, min_support)
+    )
+    return Recommender().publish_similar_products(neighbours)
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from products.models.product import Product
+
+SLUG_CACHE_PREFIX = "product_slug"
+SLUG_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _slug_cache_key(language_code: str, slug: str) -> str:
+    return f"{SLUG_CACHE_PREFIX}:{language_code}:{slug}"
+
+
+def _lookup_product_id(slug: str, language_code: str) -> int | None:
+    """
+    Prefer the product whose translation in the current language has this slug,
+    otherwise accept a slug from another language as long as the product is
+    translated into the current one. Only live, available products count, so
+    a hidden duplicate neither shadows nor blocks the live one. Ambiguous
+    slugs resolve to nothing.
+    """
+    translation_model = Product._parler_meta.root_model
+    rows = set(
+        translation_model.objects.filter(
+            slug=slug,
+            master__available=True,
+            master__deleted__isnull=True,
+            master__translations__language_code=language_code,
+        ).values_list("master_id", "language_code")
+    )
+
+    exact = {master_id for master_id, row_language in rows if row_language == language_code}
+    candidates = exact or {master_id for master_id, _ in rows}
+    if len(candidates) != 1:
+        return None
+    return candidates.pop()
+
+
+def resolve_product_slug(slug: str, language_code: str) -> int | None:
+    """Map a (language, slug) pair to a product id, hitting the database only on a cache miss."""
+
+    cache_key = _slug_cache_key(language_code, slug)
+    product_id = cache.get(cache_key)
+    if product_id is None:
+        product_id = _lookup_product_id(slug, language_code)
+        if product_id is not None:
+            cache.set(cache_key, product_id, SLUG_CACHE_TIMEOUT)
+    return product_id
+
+
+def invalidate_product_slugs(*slugs: str) -> None:
+    """Forget the resolved ids of these slugs in every language."""
+
+    cache.delete_many([
+        _slug_cache_key(language_code, slug)
+        for slug in slugs if slug
+        for language_code, _ in settings.LANGUAGES
+    ])
@@ -1,12 +1,11 @@
 from django.http import Http404, HttpRequest, JsonResponse
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from http import HTTPStatus
 import logging
 
 from cart.forms import CartAddProductForm
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Avg
 from django.shortcuts import get_object_or_404, redirect, render
 from products.models.product import Product
 from products.models.review import Review
@@ -15,20 +14,25 @@ from taggit.models import Tag
 from django.utils.translation import gettext_lazy as _
 from .forms import ReviewForm
 from .recommender import Recommender
+from .utils.autocomplete import AUTOCOMPLETE_DEFAULT_LIMIT, get_suggestions
+from .utils.facets import get_catalog_facets
 from .utils.filters import (
-    apply_ordering,
     filter_by_category,
     filter_by_discount,
     filter_by_price_range,
-    get_price_range,
+    get_category,
     get_user_favorite_ids,
 )
-from .utils.pagination import paginate_products
+from .utils.page_cache import CATALOG_SCOPE, cache_anonymous_page
+from .utils.pagination import get_pagination_query, paginate_products
+from .utils.popularity import BESTSELLERS, POPULAR_ORDER, TRENDING, annotate_popularity, get_popular_products
 from .utils.search import search_products
+from .utils.slug_resolver import resolve_product_slug
 
 logger = logging.getLogger(__name__)
 
 
+@cache_anonymous_page(CATALOG_SCOPE)
 def index(request: HttpRequest):
     """Render homepage with featured products and reviews."""
 
@@ -39,10 +43,13 @@ def index(request: HttpRequest):
         "products": products,
         "search_query": search_query,
         "reviews": reviews,
+        "trending_products": get_popular_products(TRENDING),
+        "bestseller_products": get_popular_products(BESTSELLERS),
     }
     return render(request, "index.html", context)
 
 
+@cache_anonymous_page(CATALOG_SCOPE)
 def products(request: HttpRequest):
     """Display product listing with filters, sorting and pagination."""
 
@@ -50,25 +57,27 @@ def products(request: HttpRequest):
 
     try:
         discount = request.GET.get("discount")
-        order = request.GET.get("order")
         min_price = request.GET.get("min_price")
         max_price = request.GET.get("max_price")
         category_slug = request.GET.get("category")
 
         products_qs, search_query = search_products(request)
 
-        products_qs = filter_by_category(products_qs, category_slug, request.LANGUAGE_CODE)
+        category = get_category(category_slug, request.LANGUAGE_CODE)
+        products_qs = filter_by_category(products_qs, category)
         products_qs = filter_by_discount(products_qs, discount)
         products_qs = filter_by_price_range(products_qs, min_price, max_price)
-        products_qs = apply_ordering(products_qs, order)
+        if request.GET.get("order") == POPULAR_ORDER:
+            products_qs = annotate_popularity(products_qs, category.pk if category else None)
 
-        custom_range, products_qs = paginate_products(request, products_qs, 5)
+        products_qs = paginate_products(request, products_qs, 5)
+        pagination_query = get_pagination_query(request)
         favorite_ids = get_user_favorite_ids(request.user)
 
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             html = render(request, "products/ajax/products_list.html", {
                 "products": products_qs,
-                "custom_range": custom_range,
+                "pagination_query": pagination_query,
                 "favorite_ids": favorite_ids,
             }).content.decode('utf-8')
             return JsonResponse({"success": True, "html": html})
@@ -77,63 +86,63 @@ def products(request: HttpRequest):
             return JsonResponse({"success": False, "error": str(e)}, status=HTTPStatus.BAD_REQUEST)
         raise
 
-    price_range = get_price_range()
+    facets = get_catalog_facets(request.LANGUAGE_CODE)
     context = {
         "title": "| Products",
         "products": products_qs,
         "search_query": search_query,
-        "custom_range": custom_range,
+        "pagination_query": pagination_query,
         "favorite_ids": favorite_ids,
-        **price_range,
+        "facets": facets,
+        "min_price": facets["min_price"],
+        "max_price": facets["max_price"],
     }
     return render(request, "products/products.html", context)
 
 
+@require_GET
+def autocomplete(request: HttpRequest):
+    """Return typo-tolerant search suggestions for the navbar search box."""
+
+    try:
+        limit = int(request.GET.get("limit", AUTOCOMPLETE_DEFAULT_LIMIT))
+    except ValueError:
+        limit = AUTOCOMPLETE_DEFAULT_LIMIT
+
+    suggestions = get_suggestions(request.GET.get("q", ""), request.LANGUAGE_CODE, limit)
+    return JsonResponse({"results": suggestions})
+
+
+@cache_anonymous_page("product:{product_slug}")
 def product_detail(request: HttpRequest, product_slug: str):
     """Display single product details with reviews and recommendations."""
 
-    language = request.LANGUAGE_CODE
-    try:
-        product = Product.objects.get(
-            translations__language_code=language,
-            translations__slug=product_slug,
-            available=True,
-        )
-    except (Product.DoesNotExist, Product.MultipleObjectsReturned):
-        try:
-            product_in_other_language = Product.objects.get(
-                translations__slug=product_slug,
-                available=True,
-            )
-            translation_in_current_language = product_in_other_language.translations.filter(
-                language_code=language
-            ).first()
-            if not translation_in_current_language:
-                raise Http404
-            product = product_in_other_language
-        except (Product.DoesNotExist, Product.MultipleObjectsReturned):
-            raise Http404
+    product_id = resolve_product_slug(product_slug, request.LANGUAGE_CODE)
+    if product_id is None:
+        raise Http404
+
+    product = get_object_or_404(
+        Product.objects.filter(available=True).prefetch_related("tags", "additional_images"),
+        pk=product_id,
+    )
 
     cart_product_form = CartAddProductForm(product=product)
 
     r = Recommender()
-    recommended_products = r.suggest_products_for([product], 4)
-    reviews = Review.objects.filter(product=product).select_related("user")
-    if reviews:
-        average_stars = reviews.aggregate(Avg("stars"))["stars__avg"]
-    else:
-        average_stars = None
+    recommended_products = r.suggest_similar_products(product, 4)
+    reviews = list(Review.objects.filter(product=product).select_related("user"))
     context = {
         "product": product,
         "title": "| Product detail page",
         "cart_product_form": cart_product_form,
         "recommended_products": recommended_products,
         "reviews": reviews,
-        "average_stars": average_stars,
+        "average_stars": product.rating_average if product.rating_count else None,
     }
     return render(request, "products/single_product.html", context)
 
 
+@cache_anonymous_page(CATALOG_SCOPE)
 def tag_list(request: HttpRequest, tag_slug=None):
     """Filter and display products by tag."""
 
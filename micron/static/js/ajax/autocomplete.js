@@ -0,0 +1,77 @@
+$(document).ready(function() {
+    const AUTOCOMPLETE_DELAY = 150;
+    const MIN_LENGTH = 2;
+
+    const $input = $('#searchform');
+    const $list = $('#search-suggestions');
+
+    if (!$input.length || !$list.length) {
+        return;
+    }
+
+    const autocompleteUrl = $input.data('autocomplete-url');
+    let autocompleteTimeout = null;
+    let lastTerm = '';
+
+    function clearSuggestions() {
+        $list.empty().hide();
+    }
+
+    function renderSuggestions(results) {
+        $list.empty();
+        if (!results.length) {
+            $list.hide();
+            return;
+        }
+
+        results.forEach(function(suggestion) {
+            const $link = $('<a>')
+                .attr('href', suggestion.url)
+                .addClass('search-suggestion-link')
+                .text(suggestion.name);
+            const $item = $('<li>')
+                .addClass('search-suggestion search-suggestion-' + suggestion.type)
+                .append($link);
+            $list.append($item);
+        });
+        $list.show();
+    }
+
+    function fetchSuggestions(term) {
+        $.ajax({
+            type: 'GET',
+            url: autocompleteUrl,
+            data: {q: term},
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest'
+            },
+            success: function(response) {
+                if (term === lastTerm) {
+                    renderSuggestions(response.results || []);
+                }
+            },
+            error: function() {
+                clearSuggestions();
+            }
+        });
+    }
+
+    $input.on('input', function() {
+        const term = $(this).val().trim();
+        lastTerm = term;
+        clearTimeout(autocompleteTimeout);
+
+        if (term.length < MIN_LENGTH) {
+            clearSuggestions();
+            return;
+        }
+
+        autocompleteTimeout = setTimeout(function() {
+            fetchSuggestions(term);
+        }, AUTOCOMPLETE_DELAY);
+    });
+
+    $input.on('blur', function() {
+        setTimeout(clearSuggestions, 200);
+    });
+});
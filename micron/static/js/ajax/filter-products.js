@@ -52,7 +52,7 @@ $(document).ready(function() {
         );
     }
 
-    function filterProducts(page = 1) {
+    function filterProducts(cursor = null) {
         const minPrice = parseFloat(minRange.value);
         const maxPrice = parseFloat(maxRange.value);
         const discount = discountSelect.value;
@@ -62,7 +62,9 @@ $(document).ready(function() {
         const params = new URLSearchParams();
         params.append('min_price', minPrice);
         params.append('max_price', maxPrice);
-        params.append('page', page);
+        if (cursor) {
+            params.append('cursor', cursor);
+        }
 
         if (discount) {
             params.append('discount', discount);
@@ -126,19 +128,19 @@ $(document).ready(function() {
         });
     }
 
-    function filterWithDebounce(page = 1) {
+    function filterWithDebounce() {
         clearTimeout(filterTimeout);
         filterTimeout = setTimeout(function() {
-            filterProducts(page);
+            filterProducts();
         }, 300);
     }
 
     function bindPaginationEvents() {
         $('.pagination a.page-link').off('click').on('click', function(e) {
             e.preventDefault();
-            const page = $(this).data('page');
-            if (page) {
-                filterProducts(page);
+            const cursor = $(this).data('cursor');
+            if (cursor) {
+                filterProducts(cursor);
                 $('html, body').animate({
                     scrollTop: $('#product-grid').offset().top - 100
                 }, 300);
@@ -187,7 +189,7 @@ $(document).ready(function() {
             this.value = maxValue;
         }
         updatePriceLabels();
-        filterWithDebounce(1);
+        filterWithDebounce();
     });
 
     maxRange.addEventListener('input', function() {
@@ -198,7 +200,7 @@ $(document).ready(function() {
             this.value = minValue;
         }
         updatePriceLabels();
-        filterWithDebounce(1);
+        filterWithDebounce();
     });
 
     // Reset button
@@ -208,22 +210,22 @@ $(document).ready(function() {
         discountSelect.value = '';
         categorySelect.value = '';
         orderSelect.value = 'price';
-        filterProducts(1);
+        filterProducts();
 
         const newUrl = window.location.pathname;
         window.history.pushState({}, '', newUrl);
     });
 
     discountSelect.addEventListener('change', function() {
-        filterProducts(1);
+        filterProducts();
     });
 
     categorySelect.addEventListener('change', function() {
-        filterProducts(1);
+        filterProducts();
     });
 
     orderSelect.addEventListener('change', function() {
-        filterProducts(1);
+        filterProducts();
     });
 
     const urlParams = new URLSearchParams(window.location.search);